@@ -0,0 +1,128 @@
+"""
+Latency of the dashboard drill-down queries against a latency budget, on a
+SQLite database seeded with synthetic evaluations.
+
+    python -m benchmarks.bench_dashboard_queries --tickers 500 --models 4 --days 750 --budget-ms 250
+
+Pass --db to keep the seeded file between runs, or set DATABASE_URL to
+measure an existing database (seeding is then skipped).
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def seed(path: str, tickers: int, models: int, days: int):
+    rng = np.random.default_rng(0)
+    names = np.array([f"T{i:04d}" for i in range(tickers)])
+    model_names = np.array([f"Model{i}" for i in range(models)])
+    dates = pd.bdate_range(end="2024-12-31", periods=days).strftime("%Y-%m-%d").to_numpy()
+
+    n = tickers * models * days
+    ticker_col = np.repeat(names, models * days)
+    model_col = np.tile(np.repeat(model_names, days), tickers)
+    date_col = np.tile(dates, tickers * models)
+    ids = np.arange(1, n + 1)
+    correct = rng.random(n) < 0.52
+    actual = rng.normal(0, 0.015, n)
+    error = rng.normal(0, 0.015, n)
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO evaluations_classification (id, prediction_id, ticker, model, evaluation_date, "
+        "predicted_class, actual_class, correct, actual_return) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)",
+        zip(ids.tolist(), ids.tolist(), ticker_col, model_col, date_col,
+            correct.astype(int).tolist(), correct.tolist(), actual.tolist()),
+    )
+    conn.executemany(
+        "INSERT INTO evaluations_regression (id, prediction_id, ticker, model, evaluation_date, "
+        "predicted_return, actual_return, error, abs_error, squared_error) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        zip(ids.tolist(), ids.tolist(), ticker_col, model_col, date_col,
+            (actual + error).tolist(), actual.tolist(), error.tolist(),
+            np.abs(error).tolist(), (error**2).tolist()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(fn, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(1000 * (time.perf_counter() - start))
+    return float(np.median(timings)), float(np.max(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--days", type=int, default=750)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", default=None, help="SQLite file to seed (default: a temp file)")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        path = args.db or os.path.join(tempfile.mkdtemp(), "dashboard.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        if not os.path.exists(path):
+            from src.utils.db_init import initialize_database
+
+            initialize_database()
+            start = time.perf_counter()
+            seed(path, args.tickers, args.models, args.days)
+            print(f"seeded {args.tickers * args.models * args.days:,} evaluations per type "
+                  f"in {time.perf_counter() - start:.1f}s")
+
+    from src.pipeline.database import DatabaseService
+
+    db = DatabaseService()
+    for model_type in ("classification", "regression"):
+        start = time.perf_counter()
+        folded = db.refresh_evaluation_aggregates(model_type)
+        if folded:
+            print(f"folded {folded:,} {model_type} evaluations in {time.perf_counter() - start:.1f}s")
+
+    tickers = db.fetch_ticker_ranking("classification", limit=1)["ticker"].tolist()
+    models = db.fetch_model_ranking("classification")["model"].tolist()
+    if not tickers or not models:
+        raise SystemExit("No evaluations to query.")
+    ticker, model = tickers[0], models[0]
+    oldest_page = db.fetch_rolling_metrics("classification", ticker, model, limit=250)
+    before = oldest_page["evaluation_date"].iloc[-1]
+
+    views = {
+        "rolling winrate, first page": lambda: db.fetch_rolling_metrics("classification", ticker, model),
+        "rolling winrate, next page": lambda: db.fetch_rolling_metrics(
+            "classification", ticker, model, before=before
+        ),
+        "rolling MAE, first page": lambda: db.fetch_rolling_metrics("regression", ticker, model),
+        "model ranking": lambda: db.fetch_model_ranking("classification"),
+        "best tickers": lambda: db.fetch_ticker_ranking("classification", model=model),
+        "worst tickers, page 5": lambda: db.fetch_ticker_ranking(
+            "classification", worst=True, offset=40
+        ),
+        "daily aggregates": lambda: db.fetch_daily_aggregates("classification"),
+    }
+
+    print(f"{'view':32s}{'p50 ms':>10s}{'max ms':>10s}  budget {args.budget_ms:.0f} ms")
+    over = 0
+    for name, fn in views.items():
+        p50, worst = measure(fn, args.repeat)
+        flag = "" if p50 <= args.budget_ms else "  OVER"
+        over += bool(flag)
+        print(f"{name:32s}{p50:10.1f}{worst:10.1f}{flag}")
+    raise SystemExit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
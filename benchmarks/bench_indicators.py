@@ -0,0 +1,74 @@
+"""
+Indicator engine benchmark: NumPy kernel vs the pandas_ta path.
+
+    python -m benchmarks.bench_indicators --tickers 50 --bars 2500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.pipeline.collector import add_features, add_features_pandas_ta
+from src.pipeline.indicators import FEATURE_COLUMNS, compute_features_many
+from src.pipeline.data_sources import make_ohlcv
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=2500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = {
+        f"T{i:04d}": make_ohlcv(args.bars, seed=i) for i in range(args.tickers)
+    }
+
+    results = {
+        "numpy, per ticker": lambda: [add_features(df.copy()) for df in frames.values()],
+        "numpy, batched 2-D": lambda: compute_features_many(frames),
+    }
+
+    start = time.perf_counter()
+    try:
+        import pandas_ta  # noqa: F401
+    except ImportError:
+        pandas_ta = None
+        print("pandas_ta not installed, benchmarking the NumPy kernel only.")
+    else:
+        print(f"{'import pandas_ta':25s}{time.perf_counter() - start:8.3f}s")
+        results = {
+            "pandas_ta, per ticker": lambda: [
+                add_features_pandas_ta(df.copy()) for df in frames.values()
+            ],
+            **results,
+        }
+
+    baseline = None
+    for name, fn in results.items():
+        seconds = _best_of(fn, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:25s}{seconds:8.3f}s  x{baseline / seconds:6.1f}")
+
+    if pandas_ta is None:
+        return
+
+    # Parity on the first ticker
+    df = next(iter(frames.values()))
+    expected = add_features_pandas_ta(df.copy())[FEATURE_COLUMNS].to_numpy()
+    actual = add_features(df.copy())[FEATURE_COLUMNS].to_numpy()
+    print(f"max abs diff vs pandas_ta {np.max(np.abs(actual - expected)):.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Memory of the dtype policy (src/pipeline/dtypes.py) and parity of the
+model outputs it produces.
+
+    python -m benchmarks.bench_memory --tickers 100 --years 10
+
+1. Working frames: bytes of every ticker's prepared feature frame, float64
+   vs the compact policy.
+2. Full runs: main.py over a synthetic universe on a fresh SQLite database,
+   once with PIPELINE_COMPACT_DTYPES=0 and once with 1, comparing the peak
+   RSS reported in the run metrics.
+3. Parity: predictions of the daily classifiers (seeded) on compact vs
+   float64 frames. Exits with 1 if any predicted class differs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+
+from src.pipeline.backtest import build_models
+from src.pipeline.collector import add_features
+from src.pipeline.data_sources import make_ohlcv
+from src.pipeline import dtypes
+from src.pipeline.dtypes import frame_memory
+from src.pipeline.runner import predict_ticker, prepare_ticker_frame
+
+MB = 1 << 20
+
+
+def prepared(ticker: str, features, compact: bool):
+    """prepare_ticker_frame of the kernel output with the policy on or off."""
+    previous = dtypes.COMPACT_DTYPES
+    dtypes.COMPACT_DTYPES = compact
+    try:
+        return prepare_ticker_frame(ticker, features)
+    finally:
+        dtypes.COMPACT_DTYPES = previous
+
+
+def frame_report(tickers: int, bars: int):
+    features = [add_features(make_ohlcv(bars, seed=i)) for i in range(tickers)]
+    compact = frame_memory(prepared(f"T{i}", df, True) for i, df in enumerate(features))
+    wide = frame_memory(prepared(f"T{i}", df, False) for i, df in enumerate(features))
+    print(f"working frames, {tickers} tickers x {bars} bars: "
+          f"float64 {wide / MB:.1f} MB, compact {compact / MB:.1f} MB ({compact / wide:.0%})")
+
+
+def full_run(compact: bool, tickers: int, years: int, cpu_workers: int) -> dict:
+    directory = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'pipeline.db')}",
+        "PIPELINE_DATA_SOURCE": f"synthetic:{tickers}:{years}",
+        "PIPELINE_CPU_WORKERS": str(cpu_workers),
+        "PIPELINE_METRICS_JSON": os.path.join(directory, "metrics.json"),
+        "PIPELINE_COMPACT_DTYPES": "1" if compact else "0",
+        "MODEL_CACHE_DIR": os.path.join(directory, "models"),
+    }
+    for code in ("from src.utils.db_init import initialize_database; initialize_database()", "import main; main.main()"):
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True)
+    with open(env["PIPELINE_METRICS_JSON"]) as f:
+        return json.load(f)
+
+
+def run_report(tickers: int, years: int, cpu_workers: int):
+    print(f"\nfull run, synthetic:{tickers}:{years}, {cpu_workers} CPU workers")
+    print(f"{'policy':10s}{'peak RSS MB':>14s}{'workers MB':>12s}{'wall s':>10s}")
+    for compact in (False, True):
+        summary = full_run(compact, tickers, years, cpu_workers)
+        peak = summary["peak_memory_bytes"]
+        print(f"{'compact' if compact else 'float64':10s}{peak['self'] / MB:14.1f}"
+              f"{peak['children'] / MB:12.1f}{summary['wall_s']:10.1f}")
+
+
+def parity_report(tickers: int, bars: int) -> bool:
+    models = list(build_models().values())
+    for model in models:
+        model.params["random_state"] = 0
+    deltas: dict[str, list[float]] = {}
+    agree: dict[str, list[bool]] = {}
+    for i in range(tickers):
+        features = add_features(make_ohlcv(bars, seed=i))
+        compact, wide = prepared(f"T{i}", features, True), prepared(f"T{i}", features, False)
+        for (_, a), (_, b) in zip(predict_ticker(f"T{i}", compact, models), predict_ticker(f"T{i}", wide, models)):
+            deltas.setdefault(a["model"], []).append(abs(a["probability"] - b["probability"]))
+            agree.setdefault(a["model"], []).append(a["predicted_class"] == b["predicted_class"])
+
+    print(f"\nparity over {tickers} tickers x {bars} bars")
+    print(f"{'model':26s}{'max |dp|':>12s}{'same class':>12s}")
+    for name in deltas:
+        print(f"{name:26s}{max(deltas[name]):12.2e}{np.mean(agree[name]):12.0%}")
+    return all(all(values) for values in agree.values())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--cpu-workers", type=int, default=0, help="0 measures everything in one process")
+    parser.add_argument("--parity-tickers", type=int, default=10)
+    parser.add_argument("--skip-runs", action="store_true", help="Only the frame and parity reports")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    bars = args.years * 252
+    frame_report(args.tickers, bars)
+    if not args.skip_runs:
+        run_report(args.tickers, args.years, args.cpu_workers)
+    raise SystemExit(0 if parity_report(args.parity_tickers, bars) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Import time of the entry points and cold start of a fresh process up to its
+first query, each in new interpreters (as CI jobs, dashboard and tuning
+workers start).
+
+    python -m benchmarks.bench_startup --repeat 5 --budget-ms 2000
+
+Import times come from `python -X importtime`; the heaviest direct
+imports of each entry point are listed to show where the time goes.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ENTRY_POINTS = [
+    "main",
+    "src.pipeline.scheduler",
+    "frontend.scripts.data",
+    "frontend.scripts.plots",
+    "src.models.optuna_optimization",
+    "src.pipeline.backtest",
+]
+
+# Fresh process -> first answered query. Each prints its elapsed milliseconds.
+COLD_STARTS = {
+    "pipeline: import + first query": (
+        "import main\n"
+        "from src.pipeline.database import DatabaseService\n"
+        "DatabaseService().get_latest_date('AAA')\n"
+    ),
+    "dashboard: import + first aggregates": (
+        "from frontend.scripts.data import DashboardData\n"
+        "from src.pipeline.database import DatabaseService\n"
+        "DashboardData(DatabaseService()).get('daily', 'classification')\n"
+    ),
+}
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str) -> tuple[float, list[tuple[str, float]]]:
+    """(cumulative ms of `module`, [(direct import, cumulative ms)]) from one fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    total, children = 0.0, []
+    for match in _IMPORTTIME.finditer(out.stderr):
+        cumulative, depth, name = int(match[2]) / 1000, len(match[3]), match[4]
+        if depth == 1 and name == module:
+            total = cumulative
+        elif depth == 3:
+            children.append((name, cumulative))
+    return total, children
+
+
+def cold_start(code: str, env: dict) -> float:
+    timed = f"import time\n_start = time.perf_counter()\n{code}print(1000 * (time.perf_counter() - _start))\n"
+    out = subprocess.run(
+        [sys.executable, "-c", timed], capture_output=True, text=True, check=True, env=env
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--top", type=int, default=3, help="Heaviest direct imports shown per entry point")
+    args = parser.parse_args()
+
+    print(f"{'import':40s}{'p50 ms':>10s}  heaviest direct imports")
+    over = 0
+    for module in ENTRY_POINTS:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        p50 = statistics.median(total for total, _ in runs)
+        heaviest = sorted(runs[-1][1], key=lambda item: item[1], reverse=True)[: args.top]
+        flag = "" if p50 <= args.budget_ms else "  OVER"
+        over += bool(flag)
+        details = ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest)
+        print(f"{module:40s}{p50:10.1f}  {details}{flag}")
+
+    env = dict(os.environ)
+    if not env.get("DATABASE_URL"):
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+        subprocess.run(
+            [sys.executable, "-c", "from src.utils.db_init import initialize_database; initialize_database()"],
+            check=True, env=env, capture_output=True,
+        )
+
+    print(f"\n{'cold start':40s}{'p50 ms':>10s}")
+    for name, code in COLD_STARTS.items():
+        p50 = statistics.median(cold_start(code, env) for _ in range(args.repeat))
+        flag = "" if p50 <= args.budget_ms else "  OVER"
+        over += bool(flag)
+        print(f"{name:40s}{p50:10.1f}{flag}")
+    raise SystemExit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
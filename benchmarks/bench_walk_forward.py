@@ -0,0 +1,93 @@
+"""
+Walk-forward trial time breakdown by fold preparation:
+
+    create_lags  per trial, in pandas, as before LagMatrix and FoldCache
+    LagMatrix    per trial, a fresh LagMatrix (build_folds)
+    FoldCache    once per study, shared by every trial
+
+    python -m benchmarks.bench_walk_forward --trials 50 --bars 2500
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.metrics import f1_score
+
+from src.models.optuna_optimization import MODELS, THRESHOLD
+from src.models.walk_forward import FoldCache, WalkForwardFolds, build_folds
+from src.pipeline.collector import add_features
+from src.pipeline.data_sources import make_ohlcv
+
+
+def _create_lags_folds(df, model, threshold: float) -> WalkForwardFolds:
+    """The former per-trial preparation: create_lags, target column, dropna."""
+    df_lags = df.copy()
+    for lag in range(1, model.lags + 1):
+        for col in model.features:
+            if col in df_lags.columns:
+                df_lags[f"{col}_lag{lag}"] = df_lags[col].shift(lag)
+    df_lags.dropna(inplace=True)
+    feature_cols = [
+        c for c in df_lags.columns if c in model.features and c not in ["log_return", "target"]
+    ] + [c for c in df_lags.columns if "_lag" in c]
+
+    df_lags["target"] = (df_lags["log_return"].shift(-1) > threshold).astype(int)
+    df_lags = df_lags.dropna(subset=["target"] + feature_cols)
+    return WalkForwardFolds(
+        df_lags[feature_cols].values, df_lags["target"].values.astype(np.int8)
+    )
+
+
+def _run_trials(df, factory, trials: int, prepare) -> dict[str, float]:
+    timings = {"prepare": 0.0, "fit": 0.0, "predict": 0.0}
+    for _ in range(trials):
+        model = factory()
+
+        start = time.perf_counter()
+        folds = prepare(df, model)
+        timings["prepare"] += time.perf_counter() - start
+
+        for X_train, y_train, X_test, y_test in folds.splits():
+            start = time.perf_counter()
+            clf = model.get_clf(y_train)
+            clf.fit(X_train, y_train)
+            timings["fit"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            f1_score(y_test, clf.predict(X_test), zero_division=0)
+            timings["predict"] += time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=2500)
+    parser.add_argument("--model", default="DecisionTreeClassModel", choices=list(MODELS))
+    args = parser.parse_args()
+
+    df = add_features(make_ohlcv(args.bars).set_index("date")).dropna()
+    factory = MODELS[args.model]
+
+    print(f"{args.model}, {args.trials} trials, {len(df)} rows, per trial in ms")
+    print(f"{'':12s}{'prepare':>10s}{'fit':>10s}{'predict':>10s}{'total':>10s}{'prepare %':>11s}")
+    cache = FoldCache()
+    preparations = {
+        "create_lags": lambda df, model: _create_lags_folds(df, model, THRESHOLD),
+        "LagMatrix": lambda df, model: build_folds(df, model, THRESHOLD),
+        "FoldCache": lambda df, model: cache.get("BENCH", df, model, THRESHOLD),
+    }
+    for name, prepare in preparations.items():
+        timings = _run_trials(df, factory, args.trials, prepare)
+        total = sum(timings.values())
+        per_trial = {k: 1000 * v / args.trials for k, v in timings.items()}
+        print(
+            f"{name:12s}{per_trial['prepare']:10.2f}{per_trial['fit']:10.2f}"
+            f"{per_trial['predict']:10.2f}{1000 * total / args.trials:10.2f}"
+            f"{100 * timings['prepare'] / total:10.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
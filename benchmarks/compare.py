@@ -0,0 +1,89 @@
+"""
+Compares a pytest-benchmark JSON run against a baseline of median times
+and fails on regressions beyond a threshold.
+
+    python -m pytest benchmarks --benchmark-json=bench.json
+    python -m benchmarks.compare benchmarks/baseline.json bench.json --threshold 0.25
+    python -m benchmarks.compare benchmarks/baseline.json bench.json --update
+
+The baseline only keeps the median per benchmark, plus the machine it was
+recorded on: compare runs from the same kind of machine.
+"""
+
+import argparse
+import json
+import os
+
+
+def medians(run: dict) -> dict[str, float]:
+    return {bench["fullname"]: bench["stats"]["median"] for bench in run["benchmarks"]}
+
+
+def load_baseline(path: str) -> dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["medians"]
+
+
+def write_baseline(path: str, run: dict):
+    machine = run.get("machine_info", {})
+    baseline = {
+        "machine": {k: machine.get(k) for k in ("node", "processor", "python_version")},
+        "commit": run.get("commit_info", {}).get("id"),
+        "medians": dict(sorted(medians(run).items())),
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def compare(baseline: dict[str, float], current: dict[str, float], threshold: float) -> list[dict]:
+    """One row per benchmark in either run; status is ok, regression, faster, new or missing."""
+    rows = []
+    for name in sorted(baseline.keys() | current.keys()):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            status, ratio = ("new" if before is None else "missing"), None
+        else:
+            ratio = after / before
+            status = (
+                "regression" if ratio > 1 + threshold
+                else "faster" if ratio < 1 / (1 + threshold)
+                else "ok"
+            )
+        rows.append({"name": name, "baseline": before, "current": after, "ratio": ratio, "status": status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline", help="Baseline file, e.g. benchmarks/baseline.json")
+    parser.add_argument("current", help="Output of pytest --benchmark-json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = +25%%)")
+    parser.add_argument("--update", action="store_true", help="Replace the baseline with the current run")
+    args = parser.parse_args()
+
+    with open(args.current) as f:
+        run = json.load(f)
+    if args.update:
+        write_baseline(args.baseline, run)
+        print(f"baseline written to {args.baseline} ({len(run['benchmarks'])} benchmarks)")
+        return
+
+    rows = compare(load_baseline(args.baseline), medians(run), args.threshold)
+    print(f"{'benchmark':64s}{'base ms':>10s}{'now ms':>10s}{'ratio':>8s}  status")
+    for row in rows:
+        base = f"{1000 * row['baseline']:10.2f}" if row["baseline"] is not None else f"{'-':>10s}"
+        now = f"{1000 * row['current']:10.2f}" if row["current"] is not None else f"{'-':>10s}"
+        ratio = f"{row['ratio']:8.2f}" if row["ratio"] is not None else f"{'-':>8s}"
+        print(f"{row['name'].split('::')[-1]:64s}{base}{now}{ratio}  {row['status']}")
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
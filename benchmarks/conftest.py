@@ -0,0 +1,80 @@
+"""
+Fixtures of the pytest-benchmark suite (benchmarks/test_*.py). Run it
+explicitly, it is not part of the default test run:
+
+    python -m pytest benchmarks --benchmark-json=bench.json [--bench-scale full]
+    python -m benchmarks.compare benchmarks/baseline.json bench.json
+"""
+
+import itertools
+import os
+
+import pytest
+from sqlalchemy import text
+
+from src.pipeline.data_sources import make_ohlcv
+from src.utils.db_init import initialize_database
+
+# Parametrized sizes per scale: the small scale keeps the suite to minutes.
+SIZES = {
+    "small": {"n_bars": [1000, 10000], "n_tickers": [1, 50], "fit_bars": [1000]},
+    "full": {"n_bars": [1000, 10000], "n_tickers": [1, 50, 500], "fit_bars": [1000, 10000]},
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scale",
+        choices=list(SIZES),
+        default="small",
+        help="Benchmark sizes: small (CI) or full (adds 500 tickers and 10k-bar fits).",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    sizes = SIZES[metafunc.config.getoption("bench_scale")]
+    for name, values in sizes.items():
+        if name in metafunc.fixturenames:
+            metafunc.parametrize(name, values)
+
+
+@pytest.fixture(scope="session")
+def universe():
+    """universe(n_tickers, n_bars) -> {ticker: OHLCV frame}, generated once per size."""
+    cache: dict[tuple[int, int], dict] = {}
+
+    def make(n_tickers: int, n_bars: int) -> dict:
+        if (n_tickers, n_bars) not in cache:
+            cache[(n_tickers, n_bars)] = {
+                f"T{i:04d}": make_ohlcv(n_bars, seed=i) for i in range(n_tickers)
+            }
+        return cache[(n_tickers, n_bars)]
+
+    return make
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """
+    fresh_db(tables) -> DatabaseService on an empty schema: a new SQLite file
+    per call, or BENCH_DATABASE_URL (e.g. a local Postgres container) with
+    `tables` truncated.
+    """
+    from src.pipeline.database import DatabaseService
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    counter = itertools.count()
+
+    def make(tables=()) -> DatabaseService:
+        monkeypatch.setenv(
+            "DATABASE_URL", url or f"sqlite:///{tmp_path / f'bench{next(counter)}.db'}"
+        )
+        initialize_database()
+        db = DatabaseService()
+        if url:
+            with db.engine.begin() as conn:  # type: ignore[union-attr]
+                for table in tables:
+                    conn.execute(text(f"TRUNCATE {table} CASCADE"))
+        return db
+
+    return make
@@ -0,0 +1,166 @@
+"""
+Hot paths of the pipeline and the dashboard: feature kernels, lagged
+design matrices, the daily classifiers, walk-forward scoring, the DB
+writers and the dashboard aggregations. See conftest.py for how to run.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from frontend.scripts.plots import classification_winrate_frame, regression_error_frame
+from src.models.base import LagMatrix
+from src.models.optuna_optimization import MODELS, walk_forward_score
+from src.pipeline.backtest import FEATURES, build_models
+from src.pipeline.collector import add_features
+from src.pipeline.indicators import compute_features_many
+from src.pipeline.writer import BatchWriter
+
+EVALUATION_DAYS = 250
+
+
+def features_of(universe, n_tickers, n_bars):
+    return {t: add_features(df.set_index("date")) for t, df in universe(n_tickers, n_bars).items()}
+
+
+@pytest.mark.benchmark(group="features")
+def test_add_features(benchmark, universe, n_bars):
+    df = universe(1, n_bars)["T0000"].set_index("date")
+    result = benchmark(lambda: add_features(df.copy()))
+    assert len(result) > 0
+
+
+@pytest.mark.benchmark(group="features")
+def test_compute_features_many(benchmark, universe, n_tickers):
+    frames = {t: df.set_index("date") for t, df in universe(n_tickers, 1000).items()}
+    result = benchmark(compute_features_many, frames)
+    assert len(result) == n_tickers
+
+
+@pytest.mark.benchmark(group="design_matrix")
+def test_design_matrix(benchmark, universe, n_bars):
+    df = features_of(universe, 1, n_bars)["T0000"]
+    model = build_models()["DecisionTree"]
+    # A fresh LagMatrix per call, as for each new ticker frame.
+    X, y, _, _ = benchmark(lambda: model._design_matrix(df, LagMatrix(df, lags=model.lags)))
+    assert len(X) == len(y) and X.shape[1] > len(FEATURES)
+
+
+@pytest.mark.benchmark(group="train_predict")
+@pytest.mark.parametrize("name", list(build_models()))
+def test_train_predict_next(benchmark, universe, fit_bars, name):
+    df = features_of(universe, 1, fit_bars)["T0000"]
+    model = build_models()[name]
+    result = benchmark(model.train_predict_next, df)
+    assert result["prediction"] in (0, 1)
+
+
+@pytest.mark.benchmark(group="walk_forward")
+def test_walk_forward_score(benchmark, universe, fit_bars):
+    df = features_of(universe, 1, fit_bars)["T0000"]
+    score = benchmark(walk_forward_score, df, MODELS["DecisionTreeClassModel"])
+    assert 0.0 <= score <= 1.0
+
+
+@pytest.mark.benchmark(group="db_write")
+def test_write_market_data(benchmark, universe, fresh_db, n_tickers):
+    frames = universe(n_tickers, 1000)
+
+    def setup():
+        writer = BatchWriter(fresh_db(["market_data"]), flush_size=10**9)
+        return (writer,), {}
+
+    def write(writer):
+        for ticker, df in frames.items():
+            writer.save_market_data(df, ticker)
+        writer.flush()
+        return writer
+
+    writer = benchmark.pedantic(write, setup=setup, rounds=3)
+    assert writer.summary()["market_data"]["written"] == n_tickers * 1000
+
+
+def evaluations(n_tickers: int, days: int = EVALUATION_DAYS) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Classification predictions and their evaluations, 4 models per ticker."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end="2024-12-31", periods=days + 1).date
+    keys = pd.MultiIndex.from_product(
+        [[f"T{i:04d}" for i in range(n_tickers)], list(build_models()), range(days)],
+        names=["ticker", "model", "day"],
+    ).to_frame(index=False)
+    ids = np.arange(1, len(keys) + 1)
+    correct = rng.random(len(keys)) < 0.52
+    predictions = pd.DataFrame(
+        {
+            "id": ids,
+            "ticker": keys["ticker"],
+            "model": keys["model"],
+            "prediction_date": dates[keys["day"]],
+            "target_date": dates[keys["day"] + 1],
+            "predicted_class": 1,
+            "probability": 0.6,
+        }
+    )
+    evals = pd.DataFrame(
+        {
+            "id": ids,
+            "prediction_id": ids,
+            "ticker": keys["ticker"],
+            "model": keys["model"],
+            "evaluation_date": dates[keys["day"] + 1],
+            "predicted_class": 1,
+            "actual_class": correct.astype(int),
+            "correct": correct,
+            "actual_return": rng.normal(0, 0.015, len(keys)),
+        }
+    )
+    return predictions, evals
+
+
+@pytest.mark.benchmark(group="db_aggregate")
+def test_refresh_evaluation_aggregates(benchmark, fresh_db, n_tickers):
+    predictions, evals = evaluations(n_tickers)
+    tables = [
+        "predictions_classification",
+        "evaluation_daily_classification",
+        "evaluation_ticker_classification",
+        "aggregate_watermarks",
+    ]
+
+    def setup():
+        db = fresh_db(tables)
+        predictions.to_sql("predictions_classification", db.engine, if_exists="append", index=False)
+        evals.to_sql("evaluations_classification", db.engine, if_exists="append", index=False)
+        return (db,), {}
+
+    folded = benchmark.pedantic(
+        lambda db: db.refresh_evaluation_aggregates("classification"), setup=setup, rounds=3
+    )
+    assert folded == len(evals)
+
+
+def daily_aggregates(days: int = 750) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    models = list(build_models())
+    n = rng.integers(100, 500, len(models) * days)
+    return pd.DataFrame(
+        {
+            "model": np.repeat(models, days),
+            "evaluation_date": np.tile(pd.bdate_range(end="2024-12-31", periods=days), len(models)),
+            "n": n,
+            "wins": (n * 0.52).astype(int),
+            "sum_abs_error": n * 0.012,
+        }
+    ).sample(frac=1, random_state=0)
+
+
+@pytest.mark.benchmark(group="dashboard")
+def test_classification_winrate_frame(benchmark):
+    result = benchmark(classification_winrate_frame, daily_aggregates())
+    assert result["winrate"].between(0, 100).all()
+
+
+@pytest.mark.benchmark(group="dashboard")
+def test_regression_error_frame(benchmark):
+    result = benchmark(regression_error_frame, daily_aggregates())
+    assert result["cumulative_error"].notna().all()
@@ -6,39 +6,118 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 from frontend.scripts.plots import (
     plot_classification_overall_winrate,
     plot_regression_overall_error,
+    plot_rolling_metric,
+    table_ranking,
 )
 
+import os
+
 import streamlit as st
+from frontend.scripts.data import DashboardData
 from src.pipeline.database import DatabaseService
 import pandas as pd
 
 db_service = DatabaseService()
+# Seconds between delta reads of the aggregates; reads in between hit memory.
+DASHBOARD_REFRESH_SECONDS = float(os.getenv("DASHBOARD_REFRESH_SECONDS", "60"))
+
 
+@st.cache_resource
+def get_dashboard_data() -> DashboardData:
+    return DashboardData(db_service, refresh_seconds=DASHBOARD_REFRESH_SECONDS)
 
-@st.cache_data(ttl=3600)
-def get_eval_data(model_type: str) -> pd.DataFrame:
-    df = db_service.fetch_evaluations_for_type(model_type)
-    if not df.empty:
-        df["evaluation_date"] = pd.to_datetime(df["evaluation_date"])
-        df = df.sort_values("evaluation_date")
-    return df
+
+def get_daily_aggregates(model_type: str) -> pd.DataFrame:
+    return get_dashboard_data().get("daily", model_type)
 
 
-@st.cache_data
 def get_tickers():
-    return db_service.fetch_available_tickers()
+    return get_dashboard_data().tickers()
+
+
+@st.cache_data(ttl=DASHBOARD_REFRESH_SECONDS)
+def get_model_ranking(model_type: str, recent_days: int) -> pd.DataFrame:
+    return db_service.fetch_model_ranking(model_type, recent_days=recent_days)
+
+
+def keyset_page(key: str, fetch, limit: int) -> pd.DataFrame:
+    """
+    Pages of newest-first rows; session_state[key] holds the evaluation_date
+    cursors of the pages above the current one.
+    """
+    cursors = st.session_state.setdefault(key, [None])
+    page = fetch(cursors[-1])
+
+    newer, older = st.columns(2)
+    if newer.button("Newer", key=f"{key}_newer", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if older.button("Older", key=f"{key}_older", disabled=len(page) < limit):
+        cursors.append(page["evaluation_date"].iloc[-1])
+        st.rerun()
+    return page
+
+
+def offset_page(key: str, fetch, limit: int) -> pd.DataFrame:
+    page_number = st.session_state.setdefault(key, 0)
+    page = fetch(page_number * limit)
+
+    previous, following = st.columns(2)
+    if previous.button("Previous", key=f"{key}_previous", disabled=page_number == 0):
+        st.session_state[key] -= 1
+        st.rerun()
+    if following.button("Next", key=f"{key}_next", disabled=len(page) < limit):
+        st.session_state[key] += 1
+        st.rerun()
+    return page
+
+
+def rolling_view(model_type: str, ticker: str, model: str, window: int, limit: int):
+    page = keyset_page(
+        f"rolling_{model_type}_{ticker}_{model}_{window}_{limit}",
+        lambda before: db_service.fetch_rolling_metrics(
+            model_type, ticker, model, window=window, limit=limit, before=before
+        ),
+        limit,
+    )
+    if model_type == "classification":
+        plot_rolling_metric(page, "rolling_winrate", f"Rolling Win Rate ({window})", percent=True)
+    else:
+        plot_rolling_metric(page, "rolling_mae", f"Rolling MAE ({window})")
+
+
+def ticker_ranking_view(model_type: str, model, worst: bool, limit: int):
+    metric = "winrate" if model_type == "classification" else "mae"
+    page = offset_page(
+        f"tickers_{model_type}_{model}_{worst}_{limit}",
+        lambda offset: db_service.fetch_ticker_ranking(
+            model_type, model=model, worst=worst, limit=limit, offset=offset
+        ),
+        limit,
+    )
+    table_ranking(page, [metric], percent=model_type == "classification")
 
 
 def main():
     st.set_page_config(page_title="Bot Evaluace", layout="wide")
 
-    class_eval_df = get_eval_data("classification")
-    reg_eval_df = get_eval_data("regression")
+    class_eval_df = get_daily_aggregates("classification")
+    reg_eval_df = get_daily_aggregates("regression")
 
     if class_eval_df.empty:
         st.warning("No classification evaluation data available.")
         return
 
+    st.sidebar.header("Drill-down")
+    ticker = st.sidebar.selectbox("Ticker", get_tickers())
+    class_model = st.sidebar.selectbox(
+        "Classification model", sorted(class_eval_df["model"].unique())
+    )
+    reg_models = sorted(reg_eval_df["model"].unique()) if not reg_eval_df.empty else []
+    reg_model = st.sidebar.selectbox("Regression model", reg_models)
+    window = st.sidebar.slider("Rolling window (evaluations)", 5, 120, 20)
+    page_size = st.sidebar.select_slider("Rows per page", [50, 100, 250, 500], 250)
+
     st.title("Model Performance Dashboard")
     row1_col1, row1_col2 = st.columns(2)
 
@@ -57,11 +136,14 @@ def main():
 
     # CLASS METRICS
     with row2_col1:
-        pass
+        st.subheader(f"{ticker} · {class_model}")
+        rolling_view("classification", ticker, class_model, window, page_size)
 
     # REG METRICS
     with row2_col2:
-        pass
+        if reg_model is not None:
+            st.subheader(f"{ticker} · {reg_model}")
+            rolling_view("regression", ticker, reg_model, window, page_size)
 
     st.divider()
 
@@ -69,11 +151,27 @@ def main():
 
     # BEST/WORST MODELS (CLASS & REG)
     with row_3_col1:
-        pass
+        st.subheader("Models")
+        table_ranking(
+            get_model_ranking("classification", window),
+            ["winrate", "recent_winrate"],
+            percent=True,
+        )
+        table_ranking(get_model_ranking("regression", window), ["mae", "recent_mae"])
 
     # BEST/WORST TICKERS OVERALL
     with row_3_col2:
-        pass
+        st.subheader(f"Tickers · {class_model}")
+        best, worst = st.columns(2)
+        with best:
+            st.caption("Best")
+            ticker_ranking_view("classification", class_model, False, 10)
+        with worst:
+            st.caption("Worst")
+            ticker_ranking_view("classification", class_model, True, 10)
+
+    with st.sidebar.expander("Data cache"):
+        st.json(get_dashboard_data().stats())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.database import DatabaseService
+from src.utils.profiling import StageTimings
+
+# Aggregate kind -> (DatabaseService fetch method, key columns)
+AGGREGATES = {
+    "daily": ("fetch_daily_aggregates", ["model", "evaluation_date"]),
+    "ticker": ("fetch_ticker_aggregates", ["model", "ticker"]),
+}
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Categoricals for model/ticker, 32-bit counts, datetime64 dates."""
+    df = df.copy()
+    for column in ("model", "ticker"):
+        if column in df.columns:
+            df[column] = df[column].astype(str).astype("category")
+    for column in ("n", "wins"):
+        if column in df.columns:
+            df[column] = df[column].astype(np.int32)
+    for column in ("evaluation_date", "first_date", "last_date"):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    if "last_id" in df.columns:
+        df["last_id"] = df["last_id"].astype(np.int64)
+    return df
+
+
+class DashboardData:
+    """
+    In-memory copy of the dashboard aggregates shared by all sessions.
+
+    A frame is loaded once and then kept up to date by delta reads: every
+    `refresh_seconds` only the aggregate rows changed since the highest
+    last_id already held are fetched and upserted by key. Between
+    refreshes reads are served from memory. Hits, refreshes and their
+    timings are available from stats().
+    """
+
+    def __init__(self, db_service: DatabaseService, refresh_seconds: float = 60.0):
+        self.db_service = db_service
+        self.refresh_seconds = refresh_seconds
+        self.timings = StageTimings()
+        self.hits = 0
+        self.rows_fetched = 0
+        self._frames: dict[tuple[str, str], pd.DataFrame] = {}
+        self._refreshed_at: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, model_type: str) -> pd.DataFrame:
+        """Aggregates of `kind` ("daily" or "ticker") for a model type."""
+        key = (kind, model_type)
+        with self._lock:
+            if time.monotonic() - self._refreshed_at.get(key, -np.inf) < self.refresh_seconds:
+                self.hits += 1
+                return self._frames[key]
+
+            stage = "refresh" if key in self._frames else "load"
+            with self.timings.track(stage):
+                self._frames[key] = self._refresh(kind, model_type, self._frames.get(key))
+            self._refreshed_at[key] = time.monotonic()
+            return self._frames[key]
+
+    def _refresh(self, kind: str, model_type: str, frame) -> pd.DataFrame:
+        fetch_name, keys = AGGREGATES[kind]
+        after_id = int(frame["last_id"].max()) if frame is not None and not frame.empty else 0
+        delta = getattr(self.db_service, fetch_name)(model_type, after_id=after_id)
+        self.rows_fetched += len(delta)
+        if frame is None:
+            return compact(delta)
+        if delta.empty:
+            return frame
+
+        delta = compact(delta)
+        if frame.empty:
+            return delta
+        # Differing categories fall back to object here; compact() restores them.
+        merged = pd.concat([frame, delta], ignore_index=True)
+        merged = merged.drop_duplicates(keys, keep="last").sort_values(keys)
+        return compact(merged.reset_index(drop=True))
+
+    def tickers(self) -> list[str]:
+        """Tickers with classification evaluations, without scanning market_data."""
+        frame = self.get("ticker", "classification")
+        return sorted(frame["ticker"].unique().tolist()) if not frame.empty else []
+
+    def stats(self) -> dict:
+        with self._lock:
+            memory = sum(int(df.memory_usage(deep=True).sum()) for df in self._frames.values())
+            return {
+                "hits": self.hits,
+                "rows_fetched": self.rows_fetched,
+                "rows_held": sum(len(df) for df in self._frames.values()),
+                "memory_bytes": memory,
+                "stages": self.timings.summary(),
+            }
@@ -4,26 +4,38 @@ import pandas as pd
 import plotly.express as px
 
 
+def classification_winrate_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Cumulative win rate per model and day from evaluation_daily_classification rows."""
+    df_plot = df.rename(columns={"wins": "daily_wins", "n": "daily_total"})
+    df_plot["evaluation_date"] = pd.to_datetime(df_plot["evaluation_date"])
+    df_plot = df_plot.sort_values(["model", "evaluation_date"])
+
+    df_plot["cumulative_wins"] = df_plot.groupby("model", observed=True)["daily_wins"].cumsum()
+    df_plot["cumulative_total"] = df_plot.groupby("model", observed=True)["daily_total"].cumsum()
+    df_plot["winrate"] = (
+        df_plot["cumulative_wins"] / df_plot["cumulative_total"] * 100
+    ).round(2)
+    return df_plot
+
+
+def regression_error_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Running mean of the daily MAE per model from evaluation_daily_regression rows."""
+    df_plot = df.assign(daily_error=df["sum_abs_error"] / df["n"])
+    df_plot["evaluation_date"] = pd.to_datetime(df_plot["evaluation_date"])
+    df_plot = df_plot.sort_values(["model", "evaluation_date"])
+
+    df_plot["cumulative_error"] = df_plot.groupby("model", observed=True)["daily_error"].cumsum() / (
+        df_plot.groupby("model", observed=True).cumcount() + 1
+    )
+    return df_plot
+
+
 def plot_classification_overall_winrate(df: pd.DataFrame):
     if df.empty:
         st.warning("No evaluation data to plot.")
         return
 
-    df = df.copy()
-    df["evaluation_date"] = pd.to_datetime(df["evaluation_date"]).dt.normalize()
-
-    df_plot = (
-        df.groupby(["model", "evaluation_date"])["correct"]
-        .agg(daily_wins="sum", daily_total="count")
-        .reset_index()
-        .sort_values(["model", "evaluation_date"])
-    )
-
-    df_plot["cumulative_wins"] = df_plot.groupby("model")["daily_wins"].cumsum()
-    df_plot["cumulative_total"] = df_plot.groupby("model")["daily_total"].cumsum()
-    df_plot["winrate"] = (
-        df_plot["cumulative_wins"] / df_plot["cumulative_total"] * 100
-    ).round(2)
+    df_plot = classification_winrate_frame(df)
 
     fig = px.line(
         df_plot,
@@ -60,9 +72,8 @@ def plot_classification_overall_winrate(df: pd.DataFrame):
 
     st.plotly_chart(fig, use_container_width=True)
 
-    summary = (
-        df.groupby("model")["correct"].agg(total="count", wins="sum").reset_index()
-    )
+    summary = df.groupby("model", observed=True)[["n", "wins"]].sum().reset_index()
+    summary = summary.rename(columns={"n": "total"})
     summary["winrate"] = (summary["wins"] / summary["total"] * 100).round(2)
     summary = summary.sort_values("winrate", ascending=False)
 
@@ -81,19 +92,7 @@ def plot_regression_overall_error(df: pd.DataFrame):
         st.warning("No evaluation data to plot.")
         return
 
-    df = df.copy()
-    df["evaluation_date"] = pd.to_datetime(df["evaluation_date"]).dt.normalize()
-
-    df_plot = (
-        df.groupby(["model", "evaluation_date"])["abs_error"]
-        .agg(daily_error="mean")
-        .reset_index()
-        .sort_values(["model", "evaluation_date"])
-    )
-
-    df_plot["cumulative_error"] = df_plot.groupby("model")["daily_error"].cumsum() / (
-        df_plot.groupby("model").cumcount() + 1
-    )
+    df_plot = regression_error_frame(df)
 
     fig = px.line(
         df_plot,
@@ -116,7 +115,8 @@ def plot_regression_overall_error(df: pd.DataFrame):
 
     st.plotly_chart(fig, use_container_width=True)
 
-    summary = df.groupby("model")["abs_error"].agg(mean_error="mean").reset_index()
+    summary = df.groupby("model", observed=True)[["n", "sum_abs_error"]].sum().reset_index()
+    summary["mean_error"] = summary["sum_abs_error"] / summary["n"]
     summary = summary.sort_values("mean_error")
 
     cols = st.columns(len(summary))
@@ -127,3 +127,53 @@ def plot_regression_overall_error(df: pd.DataFrame):
             delta=None,
             delta_color="normal",
         )
+
+
+def plot_rolling_metric(df: pd.DataFrame, metric: str, label: str, percent: bool = False):
+    if df.empty:
+        st.warning("No evaluations for this selection.")
+        return
+
+    # df: one page of fetch_rolling_metrics, newest first.
+    df_plot = df.sort_values("evaluation_date")
+    if percent:
+        df_plot = df_plot.assign(**{metric: df_plot[metric] * 100})
+
+    fig = px.line(
+        df_plot,
+        x="evaluation_date",
+        y=metric,
+        markers=True,
+        hover_data={"evaluation_date": "|%Y-%m-%d", metric: ":.4f", "window_n": True},
+        template="plotly_dark",
+        labels={metric: label, "evaluation_date": "Date"},
+    )
+    if percent:
+        fig.add_hline(
+            y=50,
+            line_dash="dash",
+            line_color="rgba(255,255,255,0.35)",
+            annotation_text="50% baseline",
+        )
+        fig.update_yaxes(ticksuffix="%")
+
+    fig.update_layout(
+        plot_bgcolor="#0f172a",
+        paper_bgcolor="#0f172a",
+        hovermode="x unified",
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def table_ranking(df: pd.DataFrame, columns: list[str], percent: bool = False):
+    if df.empty:
+        st.warning("Not enough evaluations to rank.")
+        return
+
+    df = df.copy()
+    if percent:
+        df[columns] = (df[columns] * 100).round(2)
+    else:
+        df[columns] = df[columns].round(5)
+    st.dataframe(df, hide_index=True, use_container_width=True)
@@ -1,74 +1,146 @@
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
-from sklearn.svm import SVC
-from sklearn.linear_model import LinearRegression
-
-from src.pipeline.collector import get_sp500_tickers, fetch_ticker_data, add_features
+from src.pipeline.constituents import ConstituentsCache
+from src.pipeline.data_sources import DataSource, create_data_source
 from src.pipeline.runner import TradingPipeline
+from src.pipeline.scheduler import PipelineScheduler
 from src.pipeline.database import DatabaseService
+from src.pipeline.feature_store import FeatureStore
+from src.pipeline.writer import BatchWriter
 from src.models.classifiers import ClassificationModel
+from src.models.pooled import PooledClassificationModel
+from src.models.registry import ModelRegistry
+from src.models.training import TrainingPolicy
 from src.utils.logging_config import setup_logger
+from src.utils.profiling import write_json, write_prometheus
 from src.models.base import BaseModel
 
-import pandas as pd
+import os
+from typing import Optional
 
 logger = setup_logger("main")
 
+# Concurrent tickers (network + DB) and worker processes for features/model fits.
+# CPU_WORKERS=0 runs the CPU stages inline in the I/O threads.
+IO_WORKERS = int(os.getenv("PIPELINE_IO_WORKERS", "8"))
+CPU_WORKERS = int(os.getenv("PIPELINE_CPU_WORKERS", str(os.cpu_count() or 1)))
+# "per_ticker" (one fit per ticker and model), "pooled" (one fit per model
+# across all tickers) or "both" to compare the two.
+MODEL_MODE = os.getenv("PIPELINE_MODEL_MODE", "per_ticker")
+# Buffered rows per table before a COPY flush.
+WRITE_FLUSH_SIZE = int(os.getenv("PIPELINE_WRITE_FLUSH_SIZE", "5000"))
+# "live", "snapshot:<directory>" or "synthetic:<n_tickers>:<years>".
+DATA_SOURCE = os.getenv("PIPELINE_DATA_SOURCE", "live")
+# "sp500" limits snapshot replays to the index members of each day.
+UNIVERSE = os.getenv("PIPELINE_UNIVERSE", "all")
+# Set to run the pipeline once per trading day of an offline data source.
+REPLAY_START = os.getenv("PIPELINE_REPLAY_START")
+REPLAY_END = os.getenv("PIPELINE_REPLAY_END")
+# End-of-run summary as JSON and/or as a Prometheus textfile.
+METRICS_JSON = os.getenv("PIPELINE_METRICS_JSON")
+METRICS_PROM = os.getenv("PIPELINE_METRICS_PROM")
+# Comma-separated tickers whose features and model fits are profiled
+# ("cprofile" or "pyinstrument") into PIPELINE_PROFILE_DIR.
+PROFILE_TICKERS = {t for t in os.getenv("PIPELINE_PROFILE_TICKERS", "").split(",") if t}
+PROFILE_DIR = os.getenv("PIPELINE_PROFILE_DIR", ".profiles")
+PROFILER = os.getenv("PIPELINE_PROFILER", "cprofile")
+# Set to "1" to bring the local market data cache up to date after a run.
+MARKET_CACHE_SYNC = os.getenv("MARKET_CACHE_SYNC", "0") == "1"
+
+
+def default_data_source() -> DataSource:
+    universe = ConstituentsCache() if UNIVERSE == "sp500" else None
+    return create_data_source(DATA_SOURCE, universe=universe)
 
-def main():
+
+def main(data_source: Optional[DataSource] = None):
     logger.info("Starting pipeline execution.")
+    if data_source is None:
+        data_source = default_data_source()
 
     db_service = DatabaseService()
     if db_service.engine is None:
         logger.error("Database connection is required. Check DATABASE_URL.")
         return
 
-    pipeline = TradingPipeline(db_service=db_service)
+    writer = BatchWriter(db_service, flush_size=WRITE_FLUSH_SIZE)
+    pipeline = TradingPipeline(db_service=db_service, writer=writer)
     features = ["close", "rsi_14", "roc_10", "volume", "macd_hist", "bb_percent", "dist_ema_200", "volume_rolling_mean_20", "atr_14", "mfi_14"]
+    # Fitted estimators keyed by the exact training window: re-runs of the same
+    # day, retries and backfills skip training.
+    registry = ModelRegistry()
+
+    # Full refit every N new bars; in between cached models are reused, or
+    # continued on recent data where the estimator supports warm starts.
     models: list[BaseModel] = [
-        ClassificationModel(DecisionTreeClassifier, features=features, max_depth=5, criterion="gini"),
-        ClassificationModel(RandomForestClassifier, features=features, n_estimators=200, max_depth=5, criterion="gini"),
-        ClassificationModel(XGBClassifier, features=features, n_estimators=200, max_depth=5, learning_rate=0.1),
-        ClassificationModel(SVC, features=features, kernel="rbf", C=1.0, gamma="scale"),
+        ClassificationModel("DecisionTreeClassifier", features=features, registry=registry, max_depth=5, criterion="gini"),
+        ClassificationModel("RandomForestClassifier", features=features, registry=registry, training_policy=TrainingPolicy(refit_every=5, warm_start=True), n_estimators=200, max_depth=5, criterion="gini"),
+        ClassificationModel("XGBClassifier", features=features, registry=registry, training_policy=TrainingPolicy(refit_every=5, warm_start=True), n_estimators=200, max_depth=5, learning_rate=0.1),
+        ClassificationModel("SVC", features=features, registry=registry, training_policy=TrainingPolicy(refit_every=5), kernel="rbf", C=1.0, gamma="scale"),
         #ClassificationModel(LinearRegressionModel, features=["open", "high", "low", "close", "volume"]),
     ]
 
-    logger.info("Fetching S&P 500 tickers...")
+    if MODEL_MODE in ("pooled", "both"):
+        # RBF SVC does not scale to the stacked universe, it stays per ticker.
+        pooled = [PooledClassificationModel(m) for m in models if m.name != "SVC"]
+        if MODEL_MODE == "pooled":
+            models = [m for m in models if m.name == "SVC"]
+        models = models + pooled
+
+    logger.info("Fetching tickers...")
     try:
-        tickers = get_sp500_tickers()
+        tickers = data_source.get_tickers()
     except Exception as e:
         logger.critical(f"Critical error fetching tickers: {e}")
         return
 
-    for ticker in tickers:
-        logger.info(f"Processing ticker: {ticker}")
-        new_df = fetch_ticker_data(ticker)
-        if new_df is None or new_df.empty:
-            logger.warning(f"[{ticker}] No data fetched. Skipping.")
-            continue
-        db_df = db_service.fetch_market_data(ticker)
-
-        if not db_df.empty:
-            db_df = db_df[["date", "open", "high", "low", "close", "volume"]]
-            combined_df = (
-                pd.concat([db_df, new_df])
-                .drop_duplicates(subset="date")
-                .sort_values("date")
-                .reset_index(drop=True)
+    scheduler = PipelineScheduler(
+        pipeline,
+        models,
+        io_workers=IO_WORKERS,
+        cpu_workers=CPU_WORKERS,
+        feature_store=FeatureStore(db_service, writer=writer),
+        data_source=data_source,
+        profile_tickers=PROFILE_TICKERS,
+        profile_dir=PROFILE_DIR,
+        profiler=PROFILER,
+    )
+    try:
+        summary = scheduler.run(tickers)
+    finally:
+        writer.flush()
+        for table, stats in writer.summary().items():
+            logger.info(
+                f"{table}: {stats['written']} written, {stats['skipped']} skipped "
+                f"as conflicts, {stats['failed']} failed."
             )
-        else:
-            combined_df = new_df
 
-        combined_df = add_features(combined_df)
+    summary["writes"] = writer.summary()
+    if MARKET_CACHE_SYNC:
+        # Imported here: pyarrow is not needed by the daily run otherwise.
+        from src.pipeline.market_cache import MarketDataCache
 
-        if not combined_df.empty:
-            pipeline.process_ticker(ticker, combined_df, models)
-        else:
-            logger.warning(
-                f"[{ticker}] No valid data after feature engineering. Skipping."
-            )
+        MarketDataCache().sync(db_service, tickers)
+    if METRICS_JSON:
+        write_json(summary, METRICS_JSON)
+    if METRICS_PROM:
+        write_prometheus(summary, METRICS_PROM)
+
+
+def replay(start: str, end: str, data_source: Optional[DataSource] = None):
+    """
+    Runs main() once per trading day between start and end, with the data
+    source cut off at that day. The first day backfills the full history.
+    """
+    if data_source is None:
+        data_source = default_data_source()
+
+    for day in data_source.trading_days(start, end):
+        logger.info(f"Replaying {day:%Y-%m-%d}.")
+        data_source.as_of = day
+        main(data_source)
 
 
 if __name__ == "__main__":
-    main()
+    if REPLAY_START:
+        replay(REPLAY_START, REPLAY_END or REPLAY_START)
+    else:
+        main()
@@ -1,19 +1,82 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Optional
 from src.utils.logging_config import setup_logger
 
 logger = setup_logger(__name__)
 
 
-def create_lags(features: list, df: pd.DataFrame, lags: int = 3) -> pd.DataFrame:
-    df_lags = df.copy()
-    for lag in range(1, lags + 1):
-        for col in features:
-            if col in df_lags.columns:
-                df_lags[f"{col}_lag{lag}"] = df_lags[col].shift(lag)
-    df_lags.dropna(inplace=True)
-    return df_lags
+class LagMatrix:
+    """
+    Lagged design matrices for one ticker frame, built once and shared by
+    every model trained on it.
+
+    The numeric columns are converted to a float64 array once and the lags
+    are read from a sliding_window_view over it. design() materialises a
+    feature list into a single preallocated array and caches it, so models
+    with the same features reuse it. Rows and column order are the ones of
+    the former create_lags + dropna: current features, then lag 1..lags.
+    """
+
+    def __init__(self, df: pd.DataFrame, lags: int = 3):
+        self.lags = lags
+        self.index = df.index
+        numeric = df.select_dtypes("number")
+        self.columns = list(numeric.columns)
+        self._positions = {col: i for i, col in enumerate(self.columns)}
+        self.values = numeric.to_numpy(dtype="float64")
+        self._row_ok = df.notna().all(axis=1).to_numpy()
+        self._designs: dict[tuple, tuple[np.ndarray, list, np.ndarray]] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self._positions[name]]
+
+    def design(self, features: list) -> tuple[np.ndarray, list, np.ndarray]:
+        """
+        Returns (X, feature_cols, rows): rows are the frame positions of the
+        complete rows in X.
+        """
+        key = tuple(features)
+        if key in self._designs:
+            return self._designs[key]
+
+        current = [
+            c for c in self.columns if c in features and c not in ["log_return", "target"]
+        ]
+        lagged = [c for c in features if c in self._positions]
+        feature_cols = current + [
+            f"{col}_lag{lag}" for lag in range(1, self.lags + 1) for col in lagged
+        ]
+
+        n_rows = len(self.values)
+        if n_rows <= self.lags:
+            design = (np.empty((0, len(feature_cols))), feature_cols, np.empty(0, dtype=int))
+            self._designs[key] = design
+            return design
+
+        # windows[i, j, w] == values[i + w, j]: frame row i + lags, lag lags - w.
+        windows = sliding_window_view(self.values, self.lags + 1, axis=0)
+        current_idx = [self._positions[c] for c in current]
+        lagged_idx = [self._positions[c] for c in lagged]
+
+        valid = self._row_ok[self.lags :].copy()
+        if lagged_idx:
+            valid &= ~np.isnan(windows[:, lagged_idx, : self.lags]).any(axis=(1, 2))
+        window_rows = np.flatnonzero(valid)[:, np.newaxis]
+
+        X = np.empty((len(window_rows), len(feature_cols)))
+        X[:, : len(current)] = windows[window_rows, current_idx, self.lags]
+        for lag in range(1, self.lags + 1):
+            start = len(current) + (lag - 1) * len(lagged)
+            X[:, start : start + len(lagged)] = windows[
+                window_rows, lagged_idx, self.lags - lag
+            ]
+
+        design = (X, feature_cols, window_rows[:, 0] + self.lags)
+        self._designs[key] = design
+        return design
 
 
 class BaseModel(ABC):
@@ -34,5 +97,10 @@ class BaseModel(ABC):
         logger.debug(f"Initialized model: {self.name} of type {self.model_type}")
 
     @abstractmethod
-    def train_predict_next(self, df: pd.DataFrame) -> dict:
+    def train_predict_next(
+        self,
+        df: pd.DataFrame,
+        ticker: Optional[str] = None,
+        lag_matrix: Optional[LagMatrix] = None,
+    ) -> dict:
         pass
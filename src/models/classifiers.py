@@ -1,12 +1,12 @@
 import pandas as pd
 import numpy as np
-from sklearn.tree import DecisionTreeClassifier
-from src.models.base import BaseModel, create_lags
-from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
-from sklearn.svm import SVC
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
+from typing import Optional, Union
+from src.models.base import BaseModel, LagMatrix
+from src.models.estimators import estimator_name, resolve_estimator
+from src.models.registry import ModelRegistry, data_fingerprint, params_fingerprint
+from src.models.training import TrainingPolicy
+from src.pipeline.dtypes import TARGET_DTYPE
+from src.utils.profiling import stage
 
 from src.utils.logging_config import setup_logger
 
@@ -15,21 +15,34 @@ logger = setup_logger(__name__)
 
 
 class ClassificationModel(BaseModel):
+    lags = 3
+
     def __init__(
         self,
-        clf_class,
+        clf_class: Union[str, type],
         features: list,
         classification_threshold: float = 0.005,
+        training_policy: Optional[TrainingPolicy] = None,
+        registry: Optional[ModelRegistry] = None,
         **clf_params,
     ):
         super().__init__(
-            name=clf_class.__name__,
+            name=estimator_name(clf_class),
             model_type="classification",
             features=features,
             params=clf_params,
             classification_threshold=classification_threshold,
         )
-        self.clf_class = clf_class
+        # A registered name (see src.models.estimators) is imported on first fit.
+        self._clf_class = None if isinstance(clf_class, str) else clf_class
+        self.training_policy = training_policy
+        self.registry = registry
+
+    @property
+    def clf_class(self) -> type:
+        if self._clf_class is None:
+            self._clf_class = resolve_estimator(self.name)
+        return self._clf_class
     
     def get_clf(self, y_train=None):
         params = self.params.copy()
@@ -46,41 +59,92 @@ class ClassificationModel(BaseModel):
         clf = self.clf_class(**params)
         
         if self.clf_class.__name__ in ["SVC", "LogisticRegression"]:
+            from sklearn.pipeline import Pipeline
+            from sklearn.preprocessing import StandardScaler
+
             return Pipeline([("scaler", StandardScaler()), ("clf", clf)])
         return clf
         
-    def _prepare_features(self, df: pd.DataFrame):
-            df_work = df.copy()
-            lags = 3
-            df_features = create_lags(self.features, df_work, lags=lags)
-            
-            feature_cols_lag = [c for c in df_features.columns if "_lag" in c]
-            feature_cols_current = [
-                c for c in df_features.columns 
-                if c in self.features and c not in ["log_return", "target"]
-            ]
-            feature_cols = feature_cols_current + feature_cols_lag
-            return df_features, feature_cols
-
-    def train_predict_next(self, df: pd.DataFrame) -> dict:
-        df_prep, feature_cols = self._prepare_features(df)
-        
-        df_prep["target"] = (
-            df_prep["log_return"].shift(-1) > self.classification_threshold
-        ).astype(int)
+    def _design_matrix(
+        self,
+        df: pd.DataFrame,
+        lag_matrix: Optional[LagMatrix] = None,
+        threshold: Optional[float] = None,
+    ):
+        """
+        Returns (X, y, feature_cols, rows) over the complete lagged rows of df.
+        y is 1 where the next row's log return exceeds the threshold (the
+        model's unless given); the last row has no next row and is labelled 0.
+        """
+        if threshold is None:
+            threshold = self.classification_threshold
+        if lag_matrix is None or lag_matrix.lags != self.lags:
+            lag_matrix = LagMatrix(df, lags=self.lags)
+        X, feature_cols, rows = lag_matrix.design(self.features)
 
-        train_df = df_prep.iloc[:-1].dropna(subset=["target"] + feature_cols)
+        log_return = lag_matrix.column("log_return")[rows]
+        y = np.zeros(len(rows), dtype=TARGET_DTYPE)
+        y[:-1] = log_return[1:] > threshold
+        return X, y, feature_cols, rows
 
-        X_train = train_df[feature_cols].values
-        y_train = train_df["target"].values
-        
-        X_next = df_prep[feature_cols].iloc[[-1]].values
+    def _fitted_estimator(
+        self,
+        ticker: Optional[str],
+        X_train,
+        y_train,
+        dates: Optional[np.ndarray] = None,
+        encoding: Optional[dict] = None,
+    ):
+        """
+        `dates` (the bar date of each row) marks a matrix stacked across
+        tickers, which the training policy refits by trading day. `encoding`
+        is the vocabulary of its ticker / sector columns.
+        """
+        key = None
+        if self.registry is not None and ticker is not None:
+            key = (
+                ticker,
+                self.name,
+                params_fingerprint(self, X_train.shape[1], encoding),
+                data_fingerprint(X_train, y_train),
+            )
+            clf = self.registry.get(*key)
+            if clf is not None:
+                return clf
 
-        
-        clf = self.get_clf(y_train)
-        clf.fit(X_train, y_train)
-        
-        prob = clf.predict_proba(X_next)[0][1]
+        if self.training_policy is not None and ticker is not None and dates is not None:
+            clf = self.training_policy.fitted_pooled_estimator(
+                self, ticker, X_train, y_train, dates, encoding
+            )
+        elif self.training_policy is not None and ticker is not None:
+            clf = self.training_policy.fitted_estimator(self, ticker, X_train, y_train)
+        else:
+            clf = self.get_clf(y_train)
+            clf.fit(X_train, y_train)
+
+        if key is not None:
+            self.registry.put(*key, clf)  # type: ignore[union-attr]
+        return clf
+
+    def train_predict_next(
+        self,
+        df: pd.DataFrame,
+        ticker: Optional[str] = None,
+        lag_matrix: Optional[LagMatrix] = None,
+    ) -> dict:
+        with stage("design_matrix"):
+            X, y, _, _ = self._design_matrix(df, lag_matrix)
+
+        X_train = X[:-1]
+        y_train = y[:-1]
+
+        X_next = X[-1:]
+
+        with stage("fit"):
+            clf = self._fitted_estimator(ticker, X_train, y_train)
+
+        with stage("predict_next"):
+            prob = clf.predict_proba(X_next)[0][1]
         return {
             "prediction": int(prob > 0.5),
             "probability": prob,
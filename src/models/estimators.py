@@ -0,0 +1,27 @@
+import importlib
+from functools import lru_cache
+from typing import Union
+
+# Estimator name -> "module:attribute". The module is imported on first
+# resolve, so processes that never fit a model don't pay for sklearn/xgboost.
+ESTIMATORS = {
+    "DecisionTreeClassifier": "sklearn.tree:DecisionTreeClassifier",
+    "RandomForestClassifier": "sklearn.ensemble:RandomForestClassifier",
+    "XGBClassifier": "xgboost:XGBClassifier",
+    "SVC": "sklearn.svm:SVC",
+    "LogisticRegression": "sklearn.linear_model:LogisticRegression",
+    "Ridge": "sklearn.linear_model:Ridge",
+}
+
+
+def estimator_name(estimator: Union[str, type]) -> str:
+    return estimator if isinstance(estimator, str) else estimator.__name__
+
+
+@lru_cache(maxsize=None)
+def resolve_estimator(name: str) -> type:
+    """The estimator class registered under `name`, imported on first use."""
+    if name not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator {name!r}, expected one of {sorted(ESTIMATORS)}.")
+    module, attribute = ESTIMATORS[name].split(":")
+    return getattr(importlib.import_module(module), attribute)
@@ -3,16 +3,22 @@ import os
 import numpy as np
 import pandas as pd
 import optuna
+from optuna.storages import JournalStorage
+from optuna.storages.journal import JournalFileBackend
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
 from dotenv import load_dotenv
-from typing import Callable
+from typing import Callable, Optional
 from sklearn.metrics import f1_score
-from functools import partial
+from functools import lru_cache, partial
 from joblib import Parallel, delayed
 
 from src.pipeline.collector import get_sp500_tickers, add_features
 from src.pipeline.database import DatabaseService
+from src.pipeline.feature_store import FeatureStore
+from src.pipeline.market_cache import MarketDataCache
 from src.models.classifiers import ClassificationModel
-from src.models.base import create_lags
+from src.models.walk_forward import FoldCache, WalkForwardFolds, build_folds
 
 from src.utils.logging_config import setup_logger
 
@@ -21,27 +27,25 @@ logger = setup_logger(__name__)
 load_dotenv()
 
 db_url = os.getenv("OPTUNA_DB")
-
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
-from sklearn.svm import SVC
+N_TRIALS = int(os.getenv("OPTUNA_N_TRIALS", "50"))
+N_WORKERS = int(os.getenv("OPTUNA_WORKERS", "1"))
+PRUNER = os.getenv("OPTUNA_PRUNER", "median")
 
 features = ["close", "rsi_14", "roc_10", "volume", "macd_hist", "bb_percent", "dist_ema_200", "volume_rolling_mean_20", "atr_14", "mfi_14"]
 
 THRESHOLD = 0.005
 
 def DecisionTreeClassModel(**params):
-    return ClassificationModel(DecisionTreeClassifier, features, THRESHOLD, **params)
+    return ClassificationModel("DecisionTreeClassifier", features, THRESHOLD, **params)
 
 def RandomForestClassModel(**params):
-    return ClassificationModel(RandomForestClassifier, features, THRESHOLD, **params)
+    return ClassificationModel("RandomForestClassifier", features, THRESHOLD, **params)
 
 def XGBoostClassModel(**params):
-    return ClassificationModel(XGBClassifier, features, THRESHOLD, **params)
+    return ClassificationModel("XGBClassifier", features, THRESHOLD, **params)
 
 def SupportVectorClassModel(**params):
-    return ClassificationModel(SVC, features, THRESHOLD, **params)
+    return ClassificationModel("SVC", features, THRESHOLD, **params)
 
 MODELS = {
     "DecisionTreeClassModel": DecisionTreeClassModel,
@@ -88,39 +92,26 @@ def walk_forward_score(
     threshold: float = 0.005,
     train_window: int = 252,
     n_splits: int = 5,
+    trial: Optional[optuna.Trial] = None,
+    folds: Optional[WalkForwardFolds] = None,
 ) -> float:
+    """
+    Mean F1 over expanding walk-forward splits. With a trial, the running
+    mean is reported after every split so the study's pruner can stop
+    trials that are already behind. Precomputed `folds` (see FoldCache)
+    skip the feature and fold preparation.
+    """
     model = model_factory()
 
-    df_prep, feature_cols = model._prepare_features(df)
-
-    
-    df_prep["target"] = (df_prep["log_return"].shift(-1) > threshold).astype(int)
-    df_prep = df_prep.dropna(subset=["target"] + feature_cols)
+    if folds is None:
+        folds = build_folds(df, model, threshold, train_window, n_splits)
 
-    n = len(df_prep)
-    test_size = (n - train_window) // n_splits
-
-    if test_size < 20:
+    if not folds.usable:
         return -999.0
 
     scores = []
 
-    for i in range(n_splits):
-        train_end = train_window + i * test_size
-        test_end = min(train_end + test_size, n)
-
-        train_slice = df_prep.iloc[:train_end]
-        test_slice = df_prep.iloc[train_end:test_end]
-
-        if len(test_slice) == 0:
-            break
-
-
-        X_train = train_slice[feature_cols].values
-        y_train = train_slice["target"].values
-        
-        X_test = test_slice[feature_cols].values
-        y_test = test_slice["target"].values
+    for i, (X_train, y_train, X_test, y_test) in enumerate(folds.splits()):
         clf = model.get_clf(y_train)
         
         try:
@@ -132,6 +123,11 @@ def walk_forward_score(
             logger.error(f"Training failed on split {i}: {e}")
             return -999.0
 
+        if trial is not None:
+            trial.report(float(np.mean(scores)), step=i)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
     return float(np.mean(scores)) if scores else -999.0
 
 def objective(
@@ -141,49 +137,122 @@ def objective(
     df: pd.DataFrame,
     model_factory: Callable,
     threshold: float,
+    folds: Optional[WalkForwardFolds] = None,
 ) -> float:
     params = get_search_space(trial, model_name)
     factory = partial(model_factory, **params)
-    return walk_forward_score(df, factory, threshold)
+    return walk_forward_score(df, factory, threshold, trial=trial, folds=folds)
+
+
+_db_service = None
+# Folds are identical across the trials of a study and across models with
+# the same features, so each worker prepares them once per ticker.
+FOLD_CACHE = FoldCache()
+
+
+def get_db_service() -> DatabaseService:
+    """One DatabaseService (and engine) per worker process."""
+    global _db_service
+    if _db_service is None:
+        _db_service = DatabaseService()
+    return _db_service
+
+
+@lru_cache(maxsize=None)
+def get_storage(url: Optional[str] = db_url) -> Optional[optuna.storages.BaseStorage]:
+    """
+    Optuna storage shared by all workers, opened once per process.
+    "journal:<path>" selects a journal file, which is safe for concurrent
+    local processes; anything else is an RDB URL. None keeps studies in memory.
+    """
+    if not url:
+        return None
+    if url.startswith("journal:"):
+        return JournalStorage(JournalFileBackend(url[len("journal:") :]))
+    return optuna.storages.RDBStorage(url)
+
+
+def get_pruner(name: str = PRUNER) -> optuna.pruners.BasePruner:
+    if name == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner()
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
 
 
 def load_data(ticker: str) -> pd.DataFrame:
-    db = DatabaseService()
-    df = db.fetch_market_data(ticker)
-    df_work = df.copy()
+    # The local cache, synced once by main(), spares workers the database.
+    cached = MarketDataCache().features(ticker)
+    if cached is not None:
+        return cached
+
+    db = get_db_service()
+    df = FeatureStore(db).load(ticker)
+    from_store = not df.empty
+    if not from_store:
+        # Not in the feature store for the current definitions: compute here.
+        df = db.fetch_market_data(ticker)
+    df_work = df.drop(columns=["ticker"], errors="ignore")
     if "date" in df_work.columns:
-        df_work.set_index("date", inplace=True)
-    if "ticker" in df_work.columns:
-        df_work.drop(columns=["ticker"], inplace=True)
+        df_work = df_work.set_index("date")
 
     df_work.index = pd.to_datetime(df_work.index)
-    df = add_features(df_work)
+    df = df_work if from_store else add_features(df_work)
     return df.dropna()
 
 
-
-def optimize_ticker(ticker, model_name, factory_fn):
-    df = load_data(ticker)
+def tune_model(
+    df: pd.DataFrame,
+    ticker: str,
+    model_name: str,
+    factory_fn: Callable,
+    storage=None,
+    n_trials: int = N_TRIALS,
+) -> optuna.Study:
+    """
+    Runs trials for one (ticker, model) study until it holds `n_trials`
+    finished trials in total, so several workers on the same storage share
+    the budget instead of each running `n_trials`.
+    """
     study = optuna.create_study(
         direction="maximize",
-        storage=db_url,
+        storage=storage,
         study_name=f"v2_{ticker}_{model_name}",
         load_if_exists=True,
+        pruner=get_pruner(),
     )
+    folds = FOLD_CACHE.get(ticker, df, factory_fn(), THRESHOLD)
     study.optimize(
         partial(objective, model_name=model_name, df=df,
-                model_factory=factory_fn, threshold=THRESHOLD),
-        n_trials=50,
+                model_factory=factory_fn, threshold=THRESHOLD, folds=folds),
+        n_trials=n_trials,
         n_jobs=1,
+        callbacks=[
+            MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))
+        ],
     )
+    return study
+
+
+def optimize_ticker(ticker: str, models: Optional[dict] = None):
+    """Loads the ticker's data once and tunes every model on it."""
+    df = load_data(ticker)
+    for model_name, factory_fn in (models or MODELS).items():
+        tune_model(df, ticker, model_name, factory_fn, storage=get_storage())
+
 
-def main():
+def main(n_workers: int = N_WORKERS):
+    """
+    Tickers are spread over `n_workers` processes. Further machines (or
+    invocations) pointed at the same OPTUNA_DB join the same studies.
+    """
     tickers = get_sp500_tickers()
-    for model_name, factory_fn in MODELS.items():
-        Parallel(n_jobs=1)(
-            delayed(optimize_ticker)(ticker, model_name, factory_fn)
-            for ticker in tickers
-        )
+    db = get_db_service()
+    if db.engine is not None:
+        MarketDataCache().sync(db, tickers)
+    Parallel(n_jobs=n_workers)(
+        delayed(optimize_ticker)(ticker) for ticker in tickers
+    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,158 @@
+import zlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.models.base import BaseModel, LagMatrix
+from src.models.classifiers import ClassificationModel
+from src.pipeline.runner import build_prediction_record
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# Registry / training policy key for estimators fitted across all tickers.
+POOLED_KEY = "_POOLED_"
+# Ticker codes are hashed into this many buckets, so a ticker keeps its code
+# whichever other tickers are in the universe on a given day.
+TICKER_BUCKETS = 1 << 16
+
+
+class PooledClassificationModel(BaseModel):
+    """
+    Cross-sectional variant of a ClassificationModel: the lagged features of
+    all tickers are stacked into one training matrix, the estimator is fitted
+    once and every ticker's latest row is scored in one predict_proba call.
+
+    `train_window` keeps only the most recent rows per ticker. Optional
+    encodings append a hashed ticker code and/or one-hot sector columns over
+    the sectors of the `sectors` mapping, both independent of the tickers
+    present on the day. Predictions are stored under "<name>_Pooled", next to the per-ticker model.
+    """
+
+    def __init__(
+        self,
+        model: ClassificationModel,
+        train_window: Optional[int] = 252,
+        encode_ticker: bool = False,
+        sectors: Optional[dict[str, str]] = None,
+    ):
+        super().__init__(
+            name=f"{model.name}_Pooled",
+            model_type=model.model_type,
+            features=model.features,
+            params=model.params,
+            classification_threshold=model.classification_threshold,
+        )
+        self.model = model
+        self.train_window = train_window
+        self.encode_ticker = encode_ticker
+        self.sectors = sectors
+        self.sector_vocabulary = (
+            sorted(set(sectors.values()) | {"Unknown"}) if sectors is not None else None
+        )
+
+    @property
+    def encoding(self) -> dict:
+        """Encoding vocabulary, part of the fingerprint of the fitted estimator."""
+        return {
+            "ticker_buckets": TICKER_BUCKETS if self.encode_ticker else None,
+            "sectors": self.sector_vocabulary,
+        }
+
+    def train_predict_next(
+        self,
+        df: pd.DataFrame,
+        ticker: Optional[str] = None,
+        lag_matrix: Optional[LagMatrix] = None,
+    ) -> dict:
+        """A pool of one ticker, cached apart from the cross-ticker estimator."""
+        key = f"{POOLED_KEY}{ticker}" if ticker is not None else None
+        outputs = self.predict_many({ticker or "": df}, key=key)
+        if not outputs:
+            raise ValueError(f"Not enough rows to train {self.name}.")
+        return next(iter(outputs.values()))
+
+    def _encodings(self, tickers: list[str]) -> np.ndarray:
+        columns = []
+        if self.encode_ticker:
+            codes = [zlib.crc32(t.encode()) % TICKER_BUCKETS for t in tickers]
+            columns.append(np.array(codes, dtype="float64")[:, np.newaxis])
+        if self.sector_vocabulary is not None:
+            positions = {sector: i for i, sector in enumerate(self.sector_vocabulary)}
+            labels = [self.sectors.get(t, "Unknown") for t in tickers]  # type: ignore[union-attr]
+            one_hot = np.zeros((len(tickers), len(self.sector_vocabulary)))
+            one_hot[np.arange(len(tickers)), [positions[x] for x in labels]] = 1
+            columns.append(one_hot)
+        if not columns:
+            return np.empty((len(tickers), 0))
+        return np.hstack(columns)
+
+    def predict_many(
+        self, frames: dict[str, pd.DataFrame], key: Optional[str] = POOLED_KEY
+    ) -> dict[str, dict]:
+        tickers = sorted(frames)
+        encodings = self._encodings(tickers)
+
+        X_parts, y_parts, date_parts, X_next, scored = [], [], [], [], []
+        for i, ticker in enumerate(tickers):
+            X, y, _, rows = self.model._design_matrix(frames[ticker])
+            X_train, y_train = X[:-1], y[:-1]
+            dates = pd.DatetimeIndex(frames[ticker].index[rows[:-1]]).to_numpy()
+            if self.train_window:
+                X_train = X_train[-self.train_window :]
+                y_train = y_train[-self.train_window :]
+                dates = dates[-self.train_window :]
+            if len(X_train) == 0:
+                continue
+
+            encoding = encodings[i]
+            X_parts.append(
+                np.hstack(
+                    [X_train, np.broadcast_to(encoding, (len(X_train), len(encoding)))]
+                )
+            )
+            y_parts.append(y_train)
+            date_parts.append(dates)
+            X_next.append(np.concatenate([X[-1], encoding]))
+            scored.append(ticker)
+
+        if not scored:
+            return {}
+
+        X_train = np.vstack(X_parts)
+        y_train = np.concatenate(y_parts)
+        logger.info(
+            f"Fitting {self.name} on {len(X_train)} rows from {len(scored)} tickers..."
+        )
+        clf = self.model._fitted_estimator(
+            key, X_train, y_train, dates=np.concatenate(date_parts), encoding=self.encoding
+        )
+
+        probs = clf.predict_proba(np.vstack(X_next))[:, 1]
+        return {
+            ticker: {"prediction": int(prob > 0.5), "probability": float(prob)}
+            for ticker, prob in zip(scored, probs)
+        }
+
+
+def predict_pooled(
+    model: PooledClassificationModel, frames: dict[str, pd.DataFrame]
+) -> list[tuple[str, dict]]:
+    """
+    Pooled counterpart of runner.predict_ticker for one model across tickers.
+    Module level so it can run in a worker process.
+    """
+    try:
+        outputs = model.predict_many(frames)
+    except Exception as e:
+        logger.error(f"Error processing pooled {model.name}: {e}")
+        return []
+
+    return [
+        (
+            model.model_type,
+            build_prediction_record(ticker, model, frames[ticker].index[-1], output),
+        )
+        for ticker, output in outputs.items()
+    ]
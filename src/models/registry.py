@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", ".model_cache")
+MODEL_REGISTRY_MAX_BYTES = int(os.getenv("MODEL_REGISTRY_MAX_BYTES", str(1 << 30)))
+# Puts between rescans of the registry directory, which pick up the entries
+# written or removed by other processes.
+MODEL_REGISTRY_RESCAN_EVERY = int(os.getenv("MODEL_REGISTRY_RESCAN_EVERY", "200"))
+
+
+def params_fingerprint(model, n_features: int, encoding: Optional[dict] = None) -> str:
+    fields = {
+        "clf": model.name,
+        "params": model.params,
+        "threshold": model.classification_threshold,
+        "n_features": n_features,
+    }
+    if encoding is not None:
+        # Ticker / sector columns of a pooled matrix.
+        fields["encoding"] = encoding
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def data_fingerprint(X_train: np.ndarray, y_train: np.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for array in (X_train, y_train):
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.shape).encode())
+        digest.update(array.view(np.uint8).ravel())
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    On-disk store of fitted estimators keyed by
+    (ticker, model name, params hash, training data hash).
+
+    Only file names are listed up front; estimators are unpickled on get().
+    A hit refreshes the file's mtime, and after every put the least recently
+    used files are removed until the registry fits `max_bytes` / `max_entries`.
+    Sizes and access times are kept in an index of this process, so a put
+    does not list the directory; it is rescanned every `rescan_every` puts.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = MODEL_REGISTRY_MAX_BYTES,
+        max_entries: Optional[int] = None,
+        rescan_every: int = MODEL_REGISTRY_RESCAN_EVERY,
+    ):
+        self.directory = directory or os.path.join(MODEL_CACHE_DIR, "registry")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.rescan_every = max(1, rescan_every)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        # path -> (last access, size); None until the first scan.
+        self._index: Optional[dict[str, tuple[float, int]]] = None
+        self._total_bytes = 0
+        self._puts_since_scan = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        # Worker processes build their own index.
+        state.update({"_index": None, "_total_bytes": 0, "_puts_since_scan": 0})
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str, model_name: str, params_hash: str, data_hash: str) -> str:
+        return os.path.join(
+            self.directory, ticker, model_name, f"{params_hash}-{data_hash}.joblib"
+        )
+
+    def _count(self, stat: str, n: int = 1):
+        with self._lock:
+            self.stats[stat] += n
+
+    def _record(self, path: str, size: int):
+        # Called with the lock held.
+        if self._index is None:
+            return
+        _, previous = self._index.get(path, (0.0, 0))
+        self._index[path] = (time.time(), size)
+        self._total_bytes += size - previous
+
+    def get(
+        self, ticker: str, model_name: str, params_hash: str, data_hash: str
+    ) -> Optional[Any]:
+        path = self._path(ticker, model_name, params_hash, data_hash)
+        try:
+            estimator = joblib.load(path)
+            os.utime(path)
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception as e:
+            logger.warning(f"[{ticker}] Unreadable registry entry {path}: {e}")
+            self._count("misses")
+            return None
+
+        with self._lock:
+            self.stats["hits"] += 1
+            self._record(path, size)
+        return estimator
+
+    def put(
+        self,
+        ticker: str,
+        model_name: str,
+        params_hash: str,
+        data_hash: str,
+        estimator: Any,
+    ):
+        path = self._path(ticker, model_name, params_hash, data_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(estimator, tmp_path)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            logger.warning(f"[{ticker}] Could not store {model_name} in registry: {e}")
+            return
+
+        with self._lock:
+            self.stats["puts"] += 1
+            self._puts_since_scan += 1
+            self._record(path, size)
+        self.evict()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".joblib"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, rescan: bool = False):
+        """
+        Removes the least recently used entries above the limits. The index
+        is rebuilt from the directory on first use, every `rescan_every`
+        puts, or with rescan=True.
+        """
+        if self.max_bytes is None and self.max_entries is None:
+            return
+
+        with self._lock:
+            if rescan or self._index is None or self._puts_since_scan >= self.rescan_every:
+                self._index = {path: (mtime, size) for mtime, size, path in self._entries()}
+                self._total_bytes = sum(size for _, size in self._index.values())
+                self._puts_since_scan = 0
+            if not self._over_limits():
+                return
+
+            evicted = 0
+            for path in sorted(self._index, key=lambda p: self._index[p][0]):  # type: ignore[index]
+                if not self._over_limits():
+                    break
+                _, size = self._index.pop(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._total_bytes -= size
+                evicted += 1
+            self.stats["evictions"] += evicted
+
+    def _over_limits(self) -> bool:
+        return (self.max_bytes is not None and self._total_bytes > self.max_bytes) or (
+            self.max_entries is not None and len(self._index) > self.max_entries  # type: ignore[arg-type]
+        )
+
+    def pop_stats(self) -> dict[str, int]:
+        """Returns the counters since the last call and resets them."""
+        with self._lock:
+            stats = self.stats
+            self.stats = {key: 0 for key in stats}
+        return stats
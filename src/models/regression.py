@@ -1,5 +1,5 @@
 import pandas as pd
-from src.models.base import BaseModel, prepare_features
+from src.models.base import BaseModel, LagMatrix, prepare_features
 from sklearn.linear_model import Ridge
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
@@ -20,7 +20,12 @@ class LinearRegressionModel(BaseModel):
             params={},
         )
 
-    def train_predict_next(self, df: pd.DataFrame) -> dict:
+    def train_predict_next(
+        self,
+        df: pd.DataFrame,
+        ticker: str | None = None,
+        lag_matrix: LagMatrix | None = None,
+    ) -> dict:
         if not self.features:
             exclude = {"open", "high", "low", "close", "target"}
             self.features = [c for c in df.columns if c.lower() not in exclude]
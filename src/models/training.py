@@ -0,0 +1,185 @@
+import os
+from typing import Optional
+
+import joblib
+import numpy as np
+
+from src.models.registry import MODEL_CACHE_DIR, params_fingerprint
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+class TrainingPolicy:
+    """
+    Decides when a ticker's estimator is fitted from scratch.
+
+    A full refit happens every `refit_every` new bars (or when parameters or
+    history change); in between the last fitted estimator is loaded from
+    `cache_dir` and only used for predict_proba. With `warm_start`, models
+    that support it are continued on the most recent `warm_start_window` rows
+    instead: XGBoost adds `warm_start_estimators` boosting rounds through
+    xgb_model=, RandomForest grows `warm_start_estimators` more trees.
+
+    Estimators fitted across tickers go through fitted_pooled_estimator,
+    which counts new trading days instead of rows.
+    """
+
+    def __init__(
+        self,
+        refit_every: int = 1,
+        warm_start: bool = False,
+        warm_start_estimators: int = 10,
+        warm_start_window: int = 252,
+        cache_dir: Optional[str] = None,
+    ):
+        self.refit_every = max(1, refit_every)
+        self.warm_start = warm_start
+        self.warm_start_estimators = warm_start_estimators
+        self.warm_start_window = warm_start_window
+        self.cache_dir = cache_dir or MODEL_CACHE_DIR
+
+    def _path(self, ticker: str, model_name: str) -> str:
+        return os.path.join(self.cache_dir, ticker, f"{model_name}.joblib")
+
+    def _load(self, ticker: str, model_name: str) -> Optional[dict]:
+        path = self._path(ticker, model_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            logger.warning(f"[{ticker}] Could not load cached {model_name}: {e}")
+            return None
+
+    def _save(self, ticker: str, model_name: str, entry: dict):
+        path = self._path(ticker, model_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Per process: two processes may refit the same key at the same time.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+
+    def fitted_estimator(self, model, ticker: str, X_train, y_train):
+        n_rows = len(X_train)
+        fingerprint = params_fingerprint(model, X_train.shape[1])
+        entry = self._load(ticker, model.name)
+
+        needs_refit = (
+            entry is None
+            or entry["fingerprint"] != fingerprint
+            or n_rows < entry["n_rows"]
+            or n_rows - entry["full_fit_rows"] >= self.refit_every
+        )
+        if needs_refit:
+            clf = model.get_clf(y_train)
+            clf.fit(X_train, y_train)
+            self._save(
+                ticker,
+                model.name,
+                {
+                    "estimator": clf,
+                    "fingerprint": fingerprint,
+                    "full_fit_rows": n_rows,
+                    "n_rows": n_rows,
+                },
+            )
+            return clf
+
+        clf = entry["estimator"]  # type: ignore[index]
+        if self.warm_start and n_rows > entry["n_rows"]:  # type: ignore[index]
+            continued = self._continue(
+                model,
+                clf,
+                X_train[-self.warm_start_window :],
+                y_train[-self.warm_start_window :],
+                y_train,
+            )
+            if continued is not None:
+                clf = continued
+                entry.update({"estimator": clf, "n_rows": n_rows})  # type: ignore[union-attr]
+                self._save(ticker, model.name, entry)  # type: ignore[arg-type]
+        else:
+            logger.debug(f"[{ticker}] Reusing cached {model.name}.")
+        return clf
+
+    def fitted_pooled_estimator(
+        self,
+        model,
+        key: str,
+        X_train,
+        y_train,
+        dates: np.ndarray,
+        encoding: Optional[dict] = None,
+    ):
+        """
+        fitted_estimator for a training matrix stacked across tickers, where
+        `dates` holds each row's bar date. With a fixed window per ticker the
+        row count stays the same from day to day, so the cadence counts the
+        trading days after the last full fit instead, and warm starts
+        continue on the rows dated after the last update. A change of the
+        `encoding` vocabulary forces a full fit.
+        """
+        fingerprint = params_fingerprint(model, X_train.shape[1], encoding)
+        last_date = dates.max()
+        entry = self._load(key, model.name)
+
+        needs_refit = (
+            entry is None
+            or entry["fingerprint"] != fingerprint
+            or "full_fit_date" not in entry
+            or last_date < entry["last_date"]
+            or len(np.unique(dates[dates > entry["full_fit_date"]])) >= self.refit_every
+        )
+        if needs_refit:
+            clf = model.get_clf(y_train)
+            clf.fit(X_train, y_train)
+            self._save(
+                key,
+                model.name,
+                {
+                    "estimator": clf,
+                    "fingerprint": fingerprint,
+                    "full_fit_date": last_date,
+                    "last_date": last_date,
+                },
+            )
+            return clf
+
+        clf = entry["estimator"]  # type: ignore[index]
+        if self.warm_start and last_date > entry["last_date"]:  # type: ignore[index]
+            recent = dates > entry["last_date"]  # type: ignore[index]
+            continued = self._continue(model, clf, X_train[recent], y_train[recent], y_train)
+            if continued is not None:
+                clf = continued
+                entry.update({"estimator": clf, "last_date": last_date})  # type: ignore[union-attr]
+                self._save(key, model.name, entry)  # type: ignore[arg-type]
+        else:
+            logger.debug(f"[{key}] Reusing cached {model.name}.")
+        return clf
+
+    def _continue(self, model, clf, X_recent, y_recent, y_train):
+        if len(np.unique(y_recent)) < 2:
+            return None
+
+        if model.clf_class.__name__ == "XGBClassifier":
+            # scale_pos_weight from the full history, like the RF class weights.
+            continued = model.get_clf(y_train)
+            continued.set_params(n_estimators=self.warm_start_estimators)
+            continued.fit(X_recent, y_recent, xgb_model=clf.get_booster())
+            return continued
+
+        if model.clf_class.__name__ == "RandomForestClassifier":
+            from sklearn.utils.class_weight import compute_class_weight
+
+            # "balanced" would be re-estimated on the recent window only.
+            classes = np.unique(y_train)
+            weights = compute_class_weight("balanced", classes=classes, y=y_train)
+            clf.set_params(
+                warm_start=True,
+                n_estimators=clf.n_estimators + self.warm_start_estimators,
+                class_weight=dict(zip(classes.tolist(), weights)),
+            )
+            clf.fit(X_recent, y_recent)
+            return clf
+
+        return None
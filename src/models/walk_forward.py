@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.models.classifiers import ClassificationModel
+
+
+class WalkForwardFolds:
+    """
+    Design matrix, targets and expanding-window fold boundaries for one
+    (ticker, feature list, threshold). Arrays are contiguous and read-only;
+    splits() hands out slices, i.e. views, so trials share them without
+    copying.
+    """
+
+    def __init__(
+        self, X: np.ndarray, y: np.ndarray, train_window: int = 252, n_splits: int = 5
+    ):
+        self.X = np.ascontiguousarray(X)
+        self.y = np.ascontiguousarray(y)
+        self.X.flags.writeable = False
+        self.y.flags.writeable = False
+
+        n = len(self.X)
+        self.test_size = (n - train_window) // n_splits
+        self.bounds = []
+        for i in range(n_splits):
+            train_end = train_window + i * self.test_size
+            test_end = min(train_end + self.test_size, n)
+            if train_end >= test_end:
+                break
+            self.bounds.append((train_end, test_end))
+
+    @property
+    def usable(self) -> bool:
+        return self.test_size >= 20
+
+    def splits(self) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        for train_end, test_end in self.bounds:
+            yield (
+                self.X[:train_end],
+                self.y[:train_end],
+                self.X[train_end:test_end],
+                self.y[train_end:test_end],
+            )
+
+
+def build_folds(
+    df: pd.DataFrame,
+    model: ClassificationModel,
+    threshold: float,
+    train_window: int = 252,
+    n_splits: int = 5,
+) -> WalkForwardFolds:
+    X, y, _, _ = model._design_matrix(df, threshold=threshold)
+    return WalkForwardFolds(X, y, train_window, n_splits)
+
+
+class FoldCache:
+    """
+    Keeps the folds of the last `max_entries` (ticker, features, threshold,
+    train_window, n_splits) keys, so all trials of a study, and all models
+    sharing a feature list, reuse one preparation.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._folds: OrderedDict[tuple, WalkForwardFolds] = OrderedDict()
+
+    def get(
+        self,
+        ticker: str,
+        df: pd.DataFrame,
+        model: ClassificationModel,
+        threshold: float,
+        train_window: int = 252,
+        n_splits: int = 5,
+    ) -> WalkForwardFolds:
+        key = (ticker, tuple(model.features), threshold, train_window, n_splits)
+        if key in self._folds:
+            self._folds.move_to_end(key)
+            return self._folds[key]
+
+        folds = build_folds(df, model, threshold, train_window, n_splits)
+        self._folds[key] = folds
+        while len(self._folds) > self.max_entries:
+            self._folds.popitem(last=False)
+        return folds
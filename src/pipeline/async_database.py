@@ -0,0 +1,387 @@
+import asyncio
+import json
+import os
+from datetime import date
+from typing import AsyncIterator, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import JSON, MetaData, Table, func, make_url, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.pipeline.database import (
+    DatabaseService,
+    expanding,
+    features_query,
+    market_data_records,
+    pending_evaluations_query,
+    pool_options,
+    reflect_metadata,
+)
+from src.pipeline.dtypes import compact_frame
+from src.utils.logging_config import setup_logger
+
+load_dotenv()
+logger = setup_logger(__name__)
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(db_url: str) -> tuple[URL, dict]:
+    """
+    DATABASE_URL rewritten for the asyncio driver of its backend, plus the
+    connect_args it needs. asyncpg takes libpq's sslmode as `ssl`, and keeps
+    DB_STATEMENT_CACHE_SIZE prepared statements per connection (0 disables
+    them, e.g. behind PgBouncer in transaction mode).
+    """
+    url = make_url(db_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database backend: {backend}")
+
+    connect_args: dict = {}
+    query = dict(url.query)
+    if backend == "postgresql":
+        sslmode = query.pop("sslmode", None)
+        if sslmode is not None:
+            connect_args["ssl"] = sslmode
+        query["prepared_statement_cache_size"] = os.getenv(
+            "DB_STATEMENT_CACHE_SIZE", "100"
+        )
+    url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}", query=query)
+    return url, connect_args
+
+
+class AsyncDatabaseService:
+    """
+    asyncio counterpart of DatabaseService with the same methods as
+    coroutines, for callers that keep many queries in flight (one task per
+    ticker). Concurrency is bounded by the pool (see pool_options); tasks
+    beyond it wait up to DB_POOL_TIMEOUT for a connection.
+
+    Tables are reflected lazily on first use and shared with every other
+    service on the same database. Use as `async with AsyncDatabaseService()
+    as db:` or call dispose() when done.
+    """
+
+    def __init__(self):
+        db_url = os.getenv("DATABASE_URL")
+        self.metadata: Optional[MetaData] = None
+        self._metadata_lock = asyncio.Lock()
+        if not db_url:
+            logger.error("DATABASE_URL not found in environment.")
+            self.engine: Optional[AsyncEngine] = None
+            return
+
+        url, connect_args = async_url(db_url)
+        self.engine = create_async_engine(
+            url, connect_args=connect_args, **pool_options()
+        )
+        self.metadata = reflect_metadata(self.engine.sync_engine, [])
+
+    async def __aenter__(self) -> "AsyncDatabaseService":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.dispose()
+
+    async def dispose(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    async def _table(self, name: str) -> Table:
+        if name not in self.metadata.tables:  # type: ignore[union-attr]
+            async with self._metadata_lock:
+                try:
+                    async with self.engine.connect() as conn:  # type: ignore[union-attr]
+                        await conn.run_sync(reflect_metadata, [name])
+                except Exception as e:
+                    raise RuntimeError(f"Reflecting table {name} failed.") from e
+        return self.metadata.tables[name]  # type: ignore[union-attr]
+
+    async def _read(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
+        stmt, bound = expanding(query, params or {})
+        async with self.engine.connect() as conn:  # type: ignore[union-attr]
+            result = await conn.execute(stmt, bound)
+            df = pd.DataFrame(result.all(), columns=list(result.keys()))
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    async def _write(self, stmt, records=None):
+        async with self.engine.begin() as conn:  # type: ignore[union-attr]
+            await conn.execute(stmt, records)
+
+    async def save_market_data(self, df: pd.DataFrame, ticker: str):
+        if self.engine is None or df.empty:
+            return
+
+        records = market_data_records(df, ticker)
+        try:
+            table = await self._table("market_data")
+            stmt = insert(table).on_conflict_do_nothing(index_elements=["date", "ticker"])
+            await self._write(stmt, records)
+            logger.debug(f"[{ticker}] Saved {len(records)} market data records.")
+        except Exception as e:
+            logger.error(f"[{ticker}] Failed to save market data: {e}")
+
+    async def fetch_market_data(self, ticker: str) -> pd.DataFrame:
+        if self.engine is None:
+            return pd.DataFrame()
+
+        query = """
+            SELECT date, ticker, open, high, low, close, volume
+            FROM market_data
+            WHERE ticker = :ticker
+            ORDER BY date ASC
+        """
+        try:
+            return compact_frame(await self._read(query, {"ticker": ticker}))
+        except Exception as e:
+            logger.error(f"Error fetching market data: {e}")
+            return pd.DataFrame()
+
+    async def iter_market_data(
+        self, tickers: Optional[list[str]] = None, chunk_size: int = 50
+    ) -> AsyncIterator[tuple[str, pd.DataFrame]]:
+        if self.engine is None:
+            return
+
+        if tickers is None:
+            tickers = await self.fetch_available_tickers()
+        tickers = sorted(set(tickers))
+
+        query = """
+            SELECT date, ticker, open, high, low, close, volume
+            FROM market_data
+            WHERE ticker IN :tickers
+            ORDER BY ticker ASC, date ASC
+        """
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i : i + chunk_size]
+            try:
+                df = compact_frame(await self._read(query, {"tickers": tuple(chunk)}))
+            except Exception as e:
+                logger.error(
+                    f"Error bulk fetching market data for {len(chunk)} tickers: {e}"
+                )
+                continue
+
+            for item in DatabaseService._split_by_ticker(df):
+                yield item
+
+    async def save_prediction(self, record: dict, model_type: str):
+        if self.engine is None:
+            return
+
+        try:
+            table = await self._table(f"predictions_{model_type}")
+            stmt = (
+                insert(table)
+                .values(record)
+                .on_conflict_do_nothing(
+                    index_elements=["ticker", "model", "prediction_date"]
+                )
+            )
+            await self._write(stmt)
+            logger.debug(f"Saved {model_type} prediction for {record.get('ticker')}.")
+        except Exception as e:
+            logger.error(f"Failed to save {model_type} prediction: {e}")
+
+    async def save_evaluation(self, record: dict, model_type: str):
+        await self.save_evaluations(pd.DataFrame([record]), model_type)
+
+    async def save_evaluations(self, df: pd.DataFrame, model_type: str):
+        if self.engine is None or df.empty:
+            return
+
+        try:
+            table = await self._table(f"evaluations_{model_type}")
+            records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            stmt = insert(table).on_conflict_do_nothing(index_elements=["prediction_id"])
+            await self._write(stmt, records)
+            logger.debug(f"Saved {len(records)} {model_type} evaluations.")
+        except Exception as e:
+            logger.error(f"Failed to save {model_type} evaluations: {e}")
+
+    async def fetch_pending_evaluations(self, model_type: str) -> pd.DataFrame:
+        if self.engine is None:
+            return pd.DataFrame()
+
+        query, _ = pending_evaluations_query(model_type)
+        try:
+            return await self._read(query)
+        except Exception as e:
+            logger.error(f"Error fetching pending {model_type} evaluations: {e}")
+            return pd.DataFrame()
+
+    async def get_latest_date(self, ticker: str) -> date | None:
+        if self.engine is None:
+            return None
+
+        query = text("SELECT max(date) FROM market_data WHERE ticker = :ticker")
+        try:
+            async with self.engine.connect() as conn:
+                return (await conn.execute(query, {"ticker": ticker})).scalar()
+        except Exception as e:
+            logger.error(f"Error fetching latest date for {ticker}: {e}")
+            return None
+
+    async def get_latest_dates(
+        self, tickers: Optional[list[str]] = None
+    ) -> dict[str, date]:
+        """get_latest_date of many tickers (all with tickers=None) in one query."""
+        if self.engine is None or tickers == []:
+            return {}
+        where = "WHERE ticker IN :tickers" if tickers is not None else ""
+        query = f"SELECT ticker, max(date) AS date FROM market_data {where} GROUP BY ticker"
+        params = {"tickers": tuple(tickers)} if tickers is not None else {}
+        try:
+            stmt, bound = expanding(query, params)
+            async with self.engine.connect() as conn:
+                rows = (await conn.execute(stmt, bound)).all()
+            return {ticker: pd.Timestamp(latest).date() for ticker, latest in rows}
+        except Exception as e:
+            logger.error(f"Error fetching latest dates: {e}")
+            return {}
+
+    async def iter_features(
+        self,
+        tickers: list[str],
+        feature_columns: list[str],
+        version: str,
+        chunk_size: int = 50,
+    ) -> AsyncIterator[tuple[str, pd.DataFrame]]:
+        if self.engine is None:
+            return
+
+        query, _ = features_query(feature_columns)
+        tickers = sorted(set(tickers))
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i : i + chunk_size]
+            try:
+                df = compact_frame(
+                    await self._read(query, {"tickers": tuple(chunk), "version": version})
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error bulk fetching features for {len(chunk)} tickers: {e}"
+                )
+                continue
+
+            for item in DatabaseService._split_by_ticker(df):
+                yield item
+
+    async def save_features(self, df: pd.DataFrame, ticker: str, version: str):
+        if self.engine is None or df.empty:
+            return
+
+        try:
+            table = await self._table("market_features")
+            columns = [c.name for c in table.columns if c.name in df.columns]
+            df_to_save = df[columns].assign(ticker=ticker, feature_set_version=version)
+            records: list[dict] = df_to_save.to_dict(orient="records")  # type: ignore[assignment]
+            stmt = insert(table).on_conflict_do_nothing(
+                index_elements=["ticker", "feature_set_version", "date"]
+            )
+            await self._write(stmt, records)
+            logger.debug(f"[{ticker}] Saved {len(records)} feature rows.")
+        except Exception as e:
+            logger.error(f"[{ticker}] Failed to save features: {e}")
+
+    async def fetch_feature_states(self, tickers: list[str]) -> dict[str, dict]:
+        if self.engine is None or not tickers:
+            return {}
+
+        query = "SELECT ticker, state FROM feature_state WHERE ticker IN :tickers"
+        try:
+            res = await self._read(query, {"tickers": tuple(tickers)})
+        except Exception as e:
+            logger.error(f"Error fetching feature states: {e}")
+            return {}
+
+        return {
+            ticker: json.loads(state) if isinstance(state, str) else state
+            for ticker, state in zip(res["ticker"], res["state"])
+        }
+
+    async def fetch_feature_state(self, ticker: str) -> dict | None:
+        states = await self.fetch_feature_states([ticker])
+        return states.get(ticker)
+
+    async def save_feature_state(self, ticker: str, state: dict):
+        if self.engine is None or not state.get("last_date"):
+            return
+
+        try:
+            table = await self._table("feature_state")
+            payload = state if isinstance(table.c.state.type, JSON) else json.dumps(state)
+            stmt = insert(table).values(
+                ticker=ticker,
+                last_date=date.fromisoformat(str(state["last_date"])[:10]),
+                version=state["version"],
+                state=payload,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["ticker"],
+                set_={
+                    "last_date": stmt.excluded.last_date,
+                    "version": stmt.excluded.version,
+                    "state": stmt.excluded.state,
+                    "updated_at": func.now(),
+                },
+            )
+            await self._write(stmt)
+            logger.debug(f"[{ticker}] Saved feature state up to {state['last_date']}.")
+        except Exception as e:
+            logger.error(f"[{ticker}] Failed to save feature state: {e}")
+
+    async def fetch_completed_backtests(self, run: str) -> set[tuple[str, str]]:
+        if self.engine is None:
+            return set()
+
+        query = "SELECT ticker, model FROM backtest_summary WHERE run = :run"
+        try:
+            res = await self._read(query, {"run": run})
+            return set(zip(res["ticker"], res["model"]))
+        except Exception as e:
+            logger.error(f"Error fetching completed backtests for run {run}: {e}")
+            return set()
+
+    async def fetch_available_tickers(self) -> list[str]:
+        if self.engine is None:
+            return []
+
+        try:
+            res = await self._read("SELECT DISTINCT ticker FROM market_data")
+            return res["ticker"].tolist()
+        except Exception as e:
+            logger.error(f"Error fetching available tickers: {e}")
+            return []
+
+    async def fetch_predictions_for_type(self, model_type: str) -> pd.DataFrame:
+        if self.engine is None:
+            return pd.DataFrame()
+
+        query = f"SELECT * FROM predictions_{model_type} ORDER BY prediction_date DESC"
+        try:
+            return await self._read(query)
+        except Exception as e:
+            logger.error(f"Error fetching predictions for {model_type}: {e}")
+            return pd.DataFrame()
+
+    async def fetch_evaluations_for_type(self, model_type: str) -> pd.DataFrame:
+        if self.engine is None:
+            return pd.DataFrame()
+
+        if model_type not in {"classification", "regression"}:
+            raise ValueError(f"Invalid model_type: {model_type}.")
+
+        query = f"SELECT * FROM evaluations_{model_type} ORDER BY evaluation_date DESC"
+        try:
+            return await self._read(query)
+        except Exception as e:
+            logger.error(f"Error fetching evaluations for {model_type}: {e}")
+            return pd.DataFrame()
@@ -0,0 +1,375 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score
+
+from src.models.base import LagMatrix
+from src.models.classifiers import ClassificationModel
+from src.models.registry import ModelRegistry
+from src.pipeline.collector import add_features
+from src.pipeline.constituents import ConstituentsCache
+from src.pipeline.database import DatabaseService
+from src.pipeline.feature_store import FeatureStore
+from src.pipeline.market_cache import MARKET_CACHE_DIR, MarketDataCache
+from src.pipeline.writer import BatchWriter
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+RESULT_COLUMNS = ["date", "prediction", "probability", "actual_label", "actual_return", "pnl"]
+SUMMARY_COLUMNS = [
+    "model",
+    "accuracy",
+    "f1_score",
+    "cum_return",
+    "sharpe",
+    "max_drawdown",
+    "win_rate",
+    "total_trades",
+    "total_bars",
+]
+TRADING_DAYS = 252
+
+FEATURES = ["close", "rsi_14", "roc_10", "volume", "macd_hist", "bb_percent", "dist_ema_200", "volume_rolling_mean_20", "atr_14", "mfi_14"]
+
+
+def build_models(
+    features: list = FEATURES, registry: Optional[ModelRegistry] = None
+) -> dict[str, ClassificationModel]:
+    """The daily pipeline's classifiers, under the names used in backtest_*.csv."""
+    return {
+        "DecisionTree": ClassificationModel("DecisionTreeClassifier", features=features, registry=registry, max_depth=5, criterion="gini"),
+        "RandomForest": ClassificationModel("RandomForestClassifier", features=features, registry=registry, n_estimators=200, max_depth=5, criterion="gini"),
+        "XGBoost": ClassificationModel("XGBClassifier", features=features, registry=registry, n_estimators=200, max_depth=5, learning_rate=0.1),
+        "SVC": ClassificationModel("SVC", features=features, registry=registry, kernel="rbf", C=1.0, gamma="scale"),
+    }
+
+
+def walk_forward_predictions(
+    df: pd.DataFrame,
+    model: ClassificationModel,
+    ticker: Optional[str] = None,
+    min_train: int = 252,
+    refit_every: int = 21,
+    cost: float = 0.001,
+    lag_matrix: Optional[LagMatrix] = None,
+) -> pd.DataFrame:
+    """
+    Replays the daily predict-next-bar loop over `df` (features indexed by
+    date). Every `refit_every` bars the estimator is fitted on the expanding
+    window of all earlier bars, then scores the whole next block in one
+    predict_proba call. The pnl of a bar is the next bar's log return, less
+    `cost`, when the prediction is long, else 0.
+    """
+    X, y, _, rows = model._design_matrix(df, lag_matrix)
+    log_return = df["log_return"].to_numpy(dtype="float64")[rows]
+
+    # The last row has no next bar to score against.
+    n_bars = len(X) - 1
+    if n_bars <= min_train:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    probability = np.empty(n_bars - min_train)
+    for start in range(min_train, n_bars, max(1, refit_every)):
+        end = min(start + refit_every, n_bars)
+        clf = model._fitted_estimator(ticker, X[:start], y[:start])
+        probability[start - min_train : end - min_train] = clf.predict_proba(
+            X[start:end]
+        )[:, 1]
+
+    prediction = (probability > 0.5).astype(int)
+    actual_return = log_return[min_train + 1 : n_bars + 1]
+    return pd.DataFrame(
+        {
+            "date": df.index[rows[min_train:n_bars]].strftime("%Y-%m-%d"),
+            "prediction": prediction,
+            "probability": probability,
+            "actual_label": y[min_train:n_bars],
+            "actual_return": actual_return,
+            "pnl": prediction * (actual_return - cost),
+        }
+    )
+
+
+def summarize(results: pd.DataFrame, model_name: str) -> dict:
+    prediction = results["prediction"].to_numpy(dtype=int)
+    label = results["actual_label"].to_numpy(dtype=int)
+    pnl = results["pnl"].to_numpy(dtype="float64")
+    trades = prediction == 1
+
+    std = pnl.std(ddof=1) if len(pnl) > 1 else 0.0
+    equity = np.cumprod(1 + pnl)
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(pnl) else np.zeros(1)
+
+    return {
+        "model": model_name,
+        "accuracy": round(float((prediction == label).mean()) if len(pnl) else 0.0, 4),
+        "f1_score": round(float(f1_score(label, prediction, zero_division=0)) if len(pnl) else 0.0, 4),
+        "cum_return": round(float(pnl.sum()), 4),
+        "sharpe": round(float(pnl.mean() / std * np.sqrt(TRADING_DAYS)) if std > 0 else 0.0, 4),
+        "max_drawdown": round(float(drawdown.min()), 4),
+        "win_rate": round(float((pnl[trades] > 0).mean()) if trades.any() else 0.0, 4),
+        "total_trades": int(trades.sum()),
+        "total_bars": int(len(pnl)),
+    }
+
+
+def backtest_model(
+    ticker: str,
+    df: Union[pd.DataFrame, Callable[[], pd.DataFrame]],
+    model_name: str,
+    model: ClassificationModel,
+    min_train: int = 252,
+    refit_every: int = 21,
+    cost: float = 0.001,
+) -> tuple[str, str, pd.DataFrame, dict]:
+    """
+    Module level so it can run in a worker process. `df` may be a loader,
+    e.g. from load_frames with a cache, so the worker reads the frame itself.
+    """
+    if callable(df):
+        df = df()
+    results = walk_forward_predictions(
+        df, model, ticker=ticker, min_train=min_train, refit_every=refit_every, cost=cost
+    )
+    return ticker, model_name, results, summarize(results, model_name)
+
+
+class Backtester:
+    """
+    Walk-forward backtests of many tickers and models. (ticker, model) pairs
+    run in parallel worker processes. Each result is written as soon as it
+    completes: `<output_dir>/<ticker>/backtest_<model>.csv` plus a row in
+    that ticker's backtest_summary.csv, and, with a database, the
+    backtest_results / backtest_summary tables under `run`. Pairs already
+    present in a summary are skipped, so an interrupted run resumes.
+
+    With a `universe`, only bars on which the ticker was an index member
+    are scored, so the results carry no survivorship bias.
+    """
+
+    def __init__(
+        self,
+        db_service: Optional[DatabaseService] = None,
+        output_dir: str = "backtests",
+        run: str = "default",
+        workers: Optional[int] = None,
+        min_train: int = 252,
+        refit_every: int = 21,
+        cost: float = 0.001,
+        universe: Optional[ConstituentsCache] = None,
+    ):
+        self.db_service = db_service
+        self.writer = (
+            BatchWriter(db_service)
+            if db_service is not None and db_service.engine is not None
+            else None
+        )
+        self.output_dir = output_dir
+        self.run_name = run
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.min_train = min_train
+        self.refit_every = refit_every
+        self.cost = cost
+        self.universe = universe
+
+    def _summary_path(self, ticker: str) -> str:
+        return os.path.join(self.output_dir, ticker, "backtest_summary.csv")
+
+    def _read_summary(self, ticker: str) -> pd.DataFrame:
+        path = self._summary_path(ticker)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        return pd.read_csv(path)
+
+    def completed(self, tickers: list[str]) -> set[tuple[str, str]]:
+        done = {
+            (ticker, model)
+            for ticker in tickers
+            for model in self._read_summary(ticker)["model"]
+        }
+        if self.db_service is not None:
+            done |= self.db_service.fetch_completed_backtests(self.run_name)
+        return done
+
+    def _save(self, ticker: str, model_name: str, results: pd.DataFrame, summary: dict):
+        directory = os.path.join(self.output_dir, ticker)
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, f"backtest_{model_name}.csv")
+        results.to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+        # The summary row marks the pair as done, so it is written last.
+        summaries = self._read_summary(ticker)
+        summaries = pd.concat(
+            [
+                frame
+                for frame in (summaries[summaries["model"] != model_name], pd.DataFrame([summary]))
+                if not frame.empty
+            ],
+            ignore_index=True,
+        )
+        summary_path = self._summary_path(ticker)
+        summaries[SUMMARY_COLUMNS].to_csv(f"{summary_path}.tmp", index=False)
+        os.replace(f"{summary_path}.tmp", summary_path)
+
+        if self.writer is not None:
+            self.writer.save_backtest(results, summary, ticker, self.run_name)
+            self.writer.flush("backtest_results")
+            self.writer.flush("backtest_summary")
+
+    def run(
+        self,
+        frames: dict[str, Union[pd.DataFrame, Callable[[], pd.DataFrame]]],
+        models: dict[str, ClassificationModel],
+        resume: bool = True,
+    ) -> pd.DataFrame:
+        """
+        `frames` are feature frames indexed by date, or loaders of them
+        (see load_frames).
+        Returns the summaries of the pairs run now, with a ticker column.
+        """
+        done = self.completed(list(frames)) if resume else set()
+        tasks = [
+            (ticker, df, model_name, model)
+            for ticker, df in frames.items()
+            for model_name, model in models.items()
+            if (ticker, model_name) not in done
+        ]
+        logger.info(
+            f"Backtesting {len(tasks)} (ticker, model) pairs, {len(done)} already done."
+        )
+
+        summaries = []
+
+        def collect(ticker, model_name, results, summary):
+            if self.universe is not None:
+                results = results[self.universe.is_member(ticker, results["date"])]
+                summary = summarize(results, model_name)
+            self._save(ticker, model_name, results, summary)
+            summaries.append({"ticker": ticker, **summary})
+            logger.info(
+                f"[{ticker}] {model_name}: cum_return {summary['cum_return']}, "
+                f"sharpe {summary['sharpe']}"
+            )
+
+        args = (self.min_train, self.refit_every, self.cost)
+        if self.workers <= 0:
+            for task in tasks:
+                try:
+                    collect(*backtest_model(*task, *args))
+                except Exception as e:
+                    logger.error(f"[{task[0]}] Backtest of {task[2]} failed: {e}")
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                futures = {
+                    executor.submit(backtest_model, *task, *args): task for task in tasks
+                }
+                for future in as_completed(futures):
+                    ticker, _, model_name, _ = futures[future]
+                    try:
+                        collect(*future.result())
+                    except Exception as e:
+                        logger.error(f"[{ticker}] Backtest of {model_name} failed: {e}")
+
+        return pd.DataFrame(summaries, columns=["ticker"] + SUMMARY_COLUMNS)
+
+
+def load_frames(
+    db_service: DatabaseService,
+    tickers: list[str],
+    cache: Optional[MarketDataCache] = None,
+) -> dict[str, Union[pd.DataFrame, Callable[[], pd.DataFrame]]]:
+    """
+    Feature frames indexed by date: from the feature store, else computed.
+    Tickers in `cache` get a loader of the memory-mapped cached frame
+    instead, so workers share the page cache rather than pickled copies.
+    """
+    frames = {}
+    if cache is not None:
+        for ticker in tickers:
+            if cache.features(ticker) is not None:
+                frames[ticker] = partial(cache.features, ticker)
+        tickers = [ticker for ticker in tickers if ticker not in frames]
+
+    stored = FeatureStore(db_service).load_many(tickers)
+    for ticker in tickers:
+        if ticker in stored:
+            df = stored[ticker][0]
+        else:
+            df = db_service.fetch_market_data(ticker)
+            if df.empty:
+                continue
+            df = df.drop(columns=["ticker"])
+        df = df.set_index("date")
+        df.index = pd.to_datetime(df.index)
+        if ticker not in stored:
+            df = add_features(df)
+        if not df.empty:
+            frames[ticker] = df.dropna()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest")
+    parser.add_argument("--tickers", nargs="*", help="default: all tickers in market_data")
+    parser.add_argument("--models", nargs="*", help="default: all of build_models()")
+    parser.add_argument("--output-dir", default="backtests")
+    parser.add_argument("--run", default="default", help="name of the run in the database")
+    parser.add_argument("--workers", type=int, default=None, help="0 runs inline")
+    parser.add_argument("--min-train", type=int, default=252)
+    parser.add_argument("--refit-every", type=int, default=21)
+    parser.add_argument("--cost", type=float, default=0.001)
+    parser.add_argument("--no-resume", action="store_true")
+    parser.add_argument("--cache-dir", default=MARKET_CACHE_DIR, help="market data cache to sync and read")
+    parser.add_argument("--no-cache", action="store_true", help="read all frames from the database")
+    parser.add_argument(
+        "--sp500-membership",
+        action="store_true",
+        help="only score bars on which the ticker was in the S&P 500",
+    )
+    args = parser.parse_args()
+
+    db_service = DatabaseService()
+    if db_service.engine is None:
+        logger.error("Database connection is required. Check DATABASE_URL.")
+        return
+
+    tickers = args.tickers or db_service.fetch_available_tickers()
+    cache = None
+    if not args.no_cache:
+        cache = MarketDataCache(args.cache_dir)
+        cache.sync(db_service, tickers)
+    models = build_models()
+    if args.models:
+        models = {name: models[name] for name in args.models}
+
+    backtester = Backtester(
+        db_service,
+        output_dir=args.output_dir,
+        run=args.run,
+        workers=args.workers,
+        min_train=args.min_train,
+        refit_every=args.refit_every,
+        cost=args.cost,
+        universe=ConstituentsCache() if args.sp500_membership else None,
+    )
+    summary = backtester.run(
+        load_frames(db_service, tickers, cache), models, resume=not args.no_resume
+    )
+    if not summary.empty:
+        logger.info(f"Backtest summary:\n{summary.to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,38 @@
-import requests
-import pandas_ta as ta  # noqa: F401
 import pandas as pd
 import numpy as np
-from io import StringIO
-from typing import Union, Optional
-from finfetcher import DataFetcher
+from typing import Optional
+from src.pipeline.constituents import ConstituentsCache
+from src.pipeline.dtypes import compact_frame
+from src.pipeline.indicators import compute_features
 from src.utils.logging_config import setup_logger
 
 logger = setup_logger(__name__)
 
 
-def get_sp500_tickers():
-    url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        html = requests.get(url, headers=headers).text
-        tables = pd.read_html(StringIO(html))
-    except Exception as e:
-        logger.error(f"Failed to fetch tickers from Wikipedia: {e}")
-        raise
+def get_sp500_tickers(as_of=None) -> list[str]:
+    """
+    S&P 500 constituents from the local constituents cache, refreshed from
+    Wikipedia once the cache is older than CONSTITUENTS_TTL_HOURS. `as_of`
+    returns the membership of a past date instead of today's.
+    """
+    return ConstituentsCache().tickers(as_of)
 
-    sp500_table: Union[pd.DataFrame, None] = None
-    for table in tables:
-        if "Symbol" in table.columns:
-            sp500_table = table
-            break
 
-    if sp500_table is None:
-        raise ValueError("Could not find S&P 500 table on Wikipedia")
+def add_features(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or len(df) < 200:
+        return df
+    df.columns = [c.lower() for c in df.columns]
 
-    tickers = [
-        symbol.strip().replace(".", "-") for symbol in sp500_table["Symbol"].tolist()
-    ]
-    logger.info(f"Successfully retrieved {len(tickers)} tickers from Wikipedia.")
-    return tickers
+    return compute_features(df).dropna()
 
 
-def add_features(df: pd.DataFrame) -> pd.DataFrame:
+def add_features_pandas_ta(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reference implementation on pandas_ta, kept for parity checks and the
+    indicator benchmark. add_features is the NumPy kernel equivalent.
+    """
+    import pandas_ta as ta  # noqa: F401
+
     if df.empty or len(df) < 200:
         return df
     df.columns = [c.lower() for c in df.columns]
@@ -69,7 +65,26 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
     return df.dropna()
 
 
+def combine_market_data(db_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    if db_df.empty:
+        return new_df
+
+    # History from the DB is already sorted and unique per date, so only the
+    # fetched rows past its last date need to be appended.
+    db_df = db_df[["date", "open", "high", "low", "close", "volume"]]
+    new_rows = (
+        new_df[new_df["date"] > db_df["date"].iloc[-1]]
+        .drop_duplicates(subset="date")
+        .sort_values("date")
+    )
+    if new_rows.empty:
+        return db_df.reset_index(drop=True)
+    return pd.concat([db_df, new_rows], ignore_index=True)
+
+
 def fetch_ticker_data(ticker: str, period: str = "7d") -> Optional[pd.DataFrame]:
+    from finfetcher import DataFetcher
+
     try:
         fetcher = DataFetcher(ticker)
         df = fetcher.get_data(period=period, interval="1d")
@@ -88,8 +103,7 @@ def fetch_ticker_data(ticker: str, period: str = "7d") -> Optional[pd.DataFrame]
             "Volume": "volume",
         }
 
-        df = df.rename(columns=column_mapping)
-        return df
+        return compact_frame(df.rename(columns=column_mapping))
     except Exception as e:
         logger.error(f"Error fetching {ticker}: {e}")
         return None
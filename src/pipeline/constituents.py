@@ -0,0 +1,231 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import requests
+
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+CONSTITUENTS_CACHE = os.getenv("CONSTITUENTS_CACHE", os.path.join(".cache", "constituents.json"))
+CONSTITUENTS_TTL_HOURS = float(os.getenv("CONSTITUENTS_TTL_HOURS", "24"))
+
+
+def _normalize_symbol(symbol) -> Optional[str]:
+    if not isinstance(symbol, str) or not symbol.strip():
+        return None
+    return symbol.strip().replace(".", "-")
+
+
+def parse_sp500_page(html: str) -> tuple[list[str], list[dict]]:
+    """
+    Current constituents and the table of past additions/removals, as
+    [{"date": "YYYY-MM-DD", "added": ticker or None, "removed": ticker or None}].
+    """
+    tables = pd.read_html(StringIO(html))
+
+    sp500_table: Union[pd.DataFrame, None] = None
+    changes_table: Union[pd.DataFrame, None] = None
+    for table in tables:
+        if sp500_table is None and "Symbol" in table.columns:
+            sp500_table = table
+        flat = [" ".join(map(str, c)) if isinstance(c, tuple) else str(c) for c in table.columns]
+        if changes_table is None and any("Added" in c for c in flat) and any("Removed" in c for c in flat):
+            changes_table = table
+            changes_table.columns = flat
+
+    if sp500_table is None:
+        raise ValueError("Could not find S&P 500 table on Wikipedia")
+
+    tickers = [
+        symbol.strip().replace(".", "-") for symbol in sp500_table["Symbol"].tolist()
+    ]
+
+    changes = []
+    if changes_table is not None:
+        columns = list(changes_table.columns)
+        date_col = next(c for c in columns if "Date" in c)
+        added_col = next(c for c in columns if c.startswith("Added") and "Ticker" in c)
+        removed_col = next(c for c in columns if c.startswith("Removed") and "Ticker" in c)
+        dates = pd.to_datetime(changes_table[date_col], errors="coerce", format="mixed")
+        for when, added, removed in zip(dates, changes_table[added_col], changes_table[removed_col]):
+            added, removed = _normalize_symbol(added), _normalize_symbol(removed)
+            if pd.isna(when) or (added is None and removed is None):
+                continue
+            changes.append({"date": when.strftime("%Y-%m-%d"), "added": added, "removed": removed})
+    else:
+        logger.warning("No S&P 500 changes table found, membership history not updated.")
+
+    return tickers, changes
+
+
+class ConstituentsCache:
+    """
+    S&P 500 constituents kept in a local JSON file.
+
+    The Wikipedia page is only requested when the cache is older than
+    `ttl_hours`, and then conditionally (ETag / Last-Modified), so an
+    unchanged page costs a 304. If the refresh fails the stale list is used;
+    only a missing cache makes the scrape mandatory.
+
+    Besides the current list the cache keeps the dated additions and
+    removals, from the page's changes table and from differences seen
+    between refreshes, so tickers(as_of) and is_member() give the universe
+    of any past date.
+    """
+
+    def __init__(
+        self,
+        path: str = CONSTITUENTS_CACHE,
+        ttl_hours: float = CONSTITUENTS_TTL_HOURS,
+        url: str = SP500_URL,
+    ):
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.url = url
+        self._data: Optional[dict] = None
+
+    def _load(self) -> Optional[dict]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Unreadable constituents cache {self.path}: {e}")
+            return None
+
+    def _save(self, data: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _is_fresh(self, data: dict) -> bool:
+        fetched_at = datetime.fromisoformat(data["fetched_at"])
+        return datetime.now(timezone.utc) - fetched_at < self.ttl
+
+    def _refresh(self, data: Optional[dict]) -> dict:
+        headers = {"User-Agent": "Mozilla/5.0"}
+        if data is not None:
+            if data.get("etag"):
+                headers["If-None-Match"] = data["etag"]
+            if data.get("last_modified"):
+                headers["If-Modified-Since"] = data["last_modified"]
+
+        response = requests.get(self.url, headers=headers, timeout=30)
+        now = datetime.now(timezone.utc)
+        if response.status_code == 304 and data is not None:
+            logger.info("S&P 500 constituents unchanged since the last refresh.")
+            return {**data, "fetched_at": now.isoformat()}
+        response.raise_for_status()
+
+        tickers, scraped = parse_sp500_page(response.text)
+        changes = self._merge_changes(data, tickers, scraped, now)
+        logger.info(f"Successfully retrieved {len(tickers)} tickers from Wikipedia.")
+        return {
+            "fetched_at": now.isoformat(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "tickers": tickers,
+            "changes": changes,
+        }
+
+    @staticmethod
+    def _merge_changes(
+        data: Optional[dict], tickers: list[str], scraped: list[dict], now: datetime
+    ) -> list[dict]:
+        """Scraped changes plus earlier known ones and membership diffs the page does not list."""
+        changes = list(scraped)
+        known = {(c["date"], c["added"], c["removed"]) for c in changes}
+        listed_added = {c["added"] for c in changes if c["added"]}
+        listed_removed = {c["removed"] for c in changes if c["removed"]}
+
+        if data is not None:
+            for change in data.get("changes", []):
+                key = (change["date"], change["added"], change["removed"])
+                if key not in known:
+                    changes.append(change)
+                    known.add(key)
+
+            previous, current = set(data["tickers"]), set(tickers)
+            today = now.strftime("%Y-%m-%d")
+            for ticker in sorted(current - previous - listed_added):
+                changes.append({"date": today, "added": ticker, "removed": None})
+            for ticker in sorted(previous - current - listed_removed):
+                changes.append({"date": today, "added": None, "removed": ticker})
+
+        return sorted(changes, key=lambda c: c["date"], reverse=True)
+
+    @property
+    def data(self) -> dict:
+        if self._data is not None and self._is_fresh(self._data):
+            return self._data
+
+        data = self._load()
+        if data is None or not self._is_fresh(data):
+            try:
+                data = self._refresh(data)
+                self._save(data)
+            except Exception as e:
+                if data is None:
+                    logger.error(f"Failed to fetch tickers from Wikipedia: {e}")
+                    raise
+                logger.warning(
+                    f"Constituents refresh failed, using the list from {data['fetched_at']}: {e}"
+                )
+        self._data = data
+        return data
+
+    def tickers(self, as_of=None) -> list[str]:
+        """Constituents on `as_of` (default: now), rolled back through the changes after it."""
+        data = self.data
+        members = set(data["tickers"])
+        if as_of is None:
+            return list(data["tickers"])
+
+        as_of = pd.Timestamp(as_of).strftime("%Y-%m-%d")
+        for change in data["changes"]:  # newest first
+            if change["date"] <= as_of:
+                break
+            if change["added"]:
+                members.discard(change["added"])
+            if change["removed"]:
+                members.add(change["removed"])
+        return sorted(members)
+
+    def intervals(self, ticker: str) -> list[tuple[Optional[str], Optional[str]]]:
+        """[start, end) membership spans, oldest first; None is open-ended."""
+        data = self.data
+        member = ticker in data["tickers"]
+        end: Optional[str] = None
+        spans = []
+        for change in data["changes"]:  # newest first
+            if change["added"] == ticker and member:
+                spans.append((change["date"], end))
+                member = False
+            elif change["removed"] == ticker and not member:
+                end = change["date"]
+                member = True
+        if member:
+            spans.append((None, end))
+        return spans[::-1]
+
+    def is_member(self, ticker: str, dates) -> np.ndarray:
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        mask = np.zeros(len(dates), dtype=bool)
+        for start, end in self.intervals(ticker):
+            in_span = np.ones(len(dates), dtype=bool)
+            if start is not None:
+                in_span &= dates >= pd.Timestamp(start)
+            if end is not None:
+                in_span &= dates < pd.Timestamp(end)
+            mask |= in_span
+        return mask
@@ -0,0 +1,209 @@
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.collector import fetch_ticker_data, get_sp500_tickers
+from src.pipeline.constituents import ConstituentsCache
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+
+def make_ohlcv(n_bars: int, seed: int = 0, start: str = "2015-01-01") -> pd.DataFrame:
+    """Geometric random walk with consistent open/high/low/close and volume."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_bars)))
+    open_ = close * np.exp(rng.normal(0, 0.005, n_bars))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.008, n_bars)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.008, n_bars)))
+    volume = rng.integers(1_000_000, 5_000_000, n_bars)
+    return pd.DataFrame(
+        {
+            "date": pd.bdate_range(start, periods=n_bars),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+    )
+
+
+def period_start(end: pd.Timestamp, period: str) -> Optional[pd.Timestamp]:
+    """First date covered by a yfinance-style period ("7d", "3mo", "2y", "max")."""
+    if period == "max":
+        return None
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if match is None:
+        raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    offset = {
+        "d": pd.DateOffset(days=n),
+        "wk": pd.DateOffset(weeks=n),
+        "mo": pd.DateOffset(months=n),
+        "y": pd.DateOffset(years=n),
+    }[unit]
+    return end - offset
+
+
+class DataSource(ABC):
+    """
+    Where the pipeline gets its universe and daily bars from. Frames have the
+    columns of fetch_ticker_data (date, open, high, low, close, volume).
+
+    Offline sources honour `as_of`: fetch() then only returns bars up to that
+    date, which is how replay mode steps through history. With a `universe`,
+    get_tickers() only returns the index members on `as_of`.
+    """
+
+    def __init__(self, universe: Optional[ConstituentsCache] = None):
+        self.as_of: Optional[pd.Timestamp] = None
+        self.universe = universe
+
+    def _in_universe(self, tickers: list[str]) -> list[str]:
+        if self.universe is None:
+            return tickers
+        members = set(self.universe.tickers(self.as_of))
+        return [t for t in tickers if t in members]
+
+    @abstractmethod
+    def get_tickers(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    def fetch(self, ticker: str, period: str = "7d") -> Optional[pd.DataFrame]:
+        pass
+
+    def trading_days(self, start, end) -> pd.DatetimeIndex:
+        return pd.bdate_range(start, end)
+
+    def _window(self, df: pd.DataFrame, period: str) -> Optional[pd.DataFrame]:
+        if self.as_of is not None:
+            df = df[df["date"] <= self.as_of]
+        if df.empty:
+            return None
+        first = period_start(self.as_of or df["date"].iloc[-1], period)
+        if first is not None:
+            df = df[df["date"] > first]
+        return df.reset_index(drop=True) if not df.empty else None
+
+
+class LiveDataSource(DataSource):
+    """
+    S&P 500 list from the constituents cache, bars from finfetcher. as_of
+    selects the historical membership; bars are always live.
+    """
+
+    def get_tickers(self) -> list[str]:
+        return get_sp500_tickers(self.as_of)
+
+    def fetch(self, ticker: str, period: str = "7d") -> Optional[pd.DataFrame]:
+        return fetch_ticker_data(ticker, period=period)
+
+
+class SnapshotDataSource(DataSource):
+    """
+    One file per ticker in `directory`, `<ticker>.parquet` or `<ticker>.csv`,
+    with the OHLCV columns. write() creates such a snapshot from any frames,
+    e.g. the market_data table or a SyntheticDataSource.
+    """
+
+    def __init__(self, directory: str, universe: Optional[ConstituentsCache] = None):
+        super().__init__(universe)
+        self.directory = directory
+
+    def _path(self, ticker: str) -> Optional[str]:
+        for ext in ("parquet", "csv"):
+            path = os.path.join(self.directory, f"{ticker}.{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get_tickers(self) -> list[str]:
+        names = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        tickers = sorted(
+            {
+                os.path.splitext(name)[0]
+                for name in names
+                if name.endswith((".parquet", ".csv"))
+            }
+        )
+        return self._in_universe(tickers)
+
+    def fetch(self, ticker: str, period: str = "7d") -> Optional[pd.DataFrame]:
+        path = self._path(ticker)
+        if path is None:
+            logger.warning(f"No snapshot for ticker: {ticker}")
+            return None
+        try:
+            if path.endswith(".parquet"):
+                df = pd.read_parquet(path, columns=OHLCV_COLUMNS)
+            else:
+                df = pd.read_csv(path, usecols=OHLCV_COLUMNS, parse_dates=["date"])
+        except Exception as e:
+            logger.error(f"Error reading snapshot of {ticker}: {e}")
+            return None
+        return self._window(df.sort_values("date"), period)
+
+    @staticmethod
+    def write(frames: dict[str, pd.DataFrame], directory: str, fmt: str = "parquet"):
+        os.makedirs(directory, exist_ok=True)
+        for ticker, df in frames.items():
+            path = os.path.join(directory, f"{ticker}.{fmt}")
+            df = df[OHLCV_COLUMNS]
+            if fmt == "parquet":
+                df.to_parquet(path, index=False)
+            else:
+                df.to_csv(path, index=False)
+
+
+class SyntheticDataSource(DataSource):
+    """
+    Deterministic random-walk bars for `n_tickers` tickers (SYN0000, ...)
+    over `years` of business days ending at `end`. Every ticker is
+    generated on demand from its own seed, so the universe can be large.
+    """
+
+    def __init__(
+        self, n_tickers: int = 500, years: int = 10, seed: int = 0, end: str = "2024-12-31"
+    ):
+        super().__init__()
+        self.n_tickers = n_tickers
+        self.seed = seed
+        self.calendar = pd.bdate_range(end=end, periods=years * 252)
+
+    def get_tickers(self) -> list[str]:
+        return [f"SYN{i:04d}" for i in range(self.n_tickers)]
+
+    def fetch(self, ticker: str, period: str = "7d") -> Optional[pd.DataFrame]:
+        seed = zlib.crc32(f"{self.seed}:{ticker}".encode())
+        df = make_ohlcv(len(self.calendar), seed=seed, start=self.calendar[0])
+        return self._window(df, period)
+
+    def trading_days(self, start, end) -> pd.DatetimeIndex:
+        return self.calendar[(self.calendar >= start) & (self.calendar <= end)]
+
+
+def create_data_source(
+    spec: str = "live", universe: Optional[ConstituentsCache] = None
+) -> DataSource:
+    """
+    "live", "snapshot:<directory>" or "synthetic[:<n_tickers>[:<years>[:<seed>]]]".
+    `universe` restricts snapshots to the index members of each replayed day.
+    """
+    kind, _, args = spec.partition(":")
+    if kind == "live":
+        return LiveDataSource()
+    if kind == "snapshot":
+        return SnapshotDataSource(args, universe)
+    if kind == "synthetic":
+        params = [int(x) for x in args.split(":") if x]
+        return SyntheticDataSource(*params)
+    raise ValueError(f"Unknown data source: {spec}")
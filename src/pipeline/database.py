@@ -1,14 +1,165 @@
 from datetime import date
+from io import StringIO
+import json
+import re
+import threading
+from typing import Iterable, Iterator, Optional
 import os
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text, MetaData
+from sqlalchemy import JSON, bindparam, create_engine, func, text, MetaData, Table
 from sqlalchemy.dialects.postgresql import insert
+from src.pipeline.dtypes import compact_frame
 from src.utils.logging_config import setup_logger
 
 load_dotenv()
 logger = setup_logger(__name__)
 
+_metadata: dict[str, MetaData] = {}
+_fully_reflected: set[str] = set()
+_metadata_lock = threading.Lock()
+
+
+def pool_options() -> dict:
+    """
+    Engine pool settings from DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+    (seconds to wait for a free connection) and DB_POOL_RECYCLE (seconds).
+    """
+    return {
+        "pool_pre_ping": True,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+
+def reflect_metadata(bind, tables: Optional[Iterable[str]] = None) -> MetaData:
+    """
+    Schema of the database behind `bind` (a sync Engine or Connection),
+    shared by every service on the same database, sync or async. Only the
+    requested `tables` (and the tables they reference) are reflected, each
+    once per process; tables=None reflects the whole schema.
+    """
+    url = bind.engine.url
+    key = url.set(drivername=url.get_backend_name()).render_as_string(hide_password=False)
+    with _metadata_lock:
+        metadata = _metadata.setdefault(key, MetaData())
+        if tables is None:
+            if key not in _fully_reflected:
+                metadata.reflect(bind=bind)
+                _fully_reflected.add(key)
+                logger.info("Database metadata loaded successfully.")
+        else:
+            missing = [t for t in tables if t not in metadata.tables]
+            if missing:
+                metadata.reflect(bind=bind, only=missing)
+                logger.debug(f"Reflected tables: {', '.join(missing)}")
+        return metadata
+
+
+def market_data_records(df: pd.DataFrame, ticker: str) -> list[dict]:
+    df_to_save = df.reset_index() if "date" not in df.columns else df
+    df_to_save = df_to_save[["date", "open", "high", "low", "close", "volume"]].assign(ticker=ticker)
+    return df_to_save.to_dict(orient="records")  # type: ignore[return-value]
+
+
+def pending_evaluations_query(model_type: str) -> tuple[str, list[str]]:
+    """
+    Every prediction without an evaluation whose target date has a bar in
+    market_data, with that bar's close and the previous close.
+    """
+    val_col = (
+        "predicted_class" if model_type == "classification" else "predicted_return"
+    )
+    columns = ["date", "prediction_id", "ticker", "model", "predicted_value", "close", "prev_close"]
+    query = f"""
+        SELECT p.target_date AS date, p.id AS prediction_id, p.ticker, p.model,
+               p.{val_col} AS predicted_value, m.close,
+               (
+                   SELECT prev.close FROM market_data prev
+                   WHERE prev.ticker = p.ticker AND prev.date < p.target_date
+                   ORDER BY prev.date DESC
+                   LIMIT 1
+               ) AS prev_close
+        FROM predictions_{model_type} p
+        JOIN market_data m ON m.ticker = p.ticker AND m.date = p.target_date
+        WHERE NOT EXISTS (
+            SELECT 1 FROM evaluations_{model_type} e WHERE e.prediction_id = p.id
+        )
+        ORDER BY p.id
+    """
+    return query, columns
+
+
+# Additive measures kept per (model, evaluation_date) and per (model, ticker).
+EVALUATION_MEASURES = {
+    "classification": {
+        "n": "COUNT(*)",
+        "wins": "SUM(CASE WHEN correct THEN 1 ELSE 0 END)",
+        "sum_actual_return": "SUM(actual_return)",
+    },
+    "regression": {
+        "n": "COUNT(*)",
+        "sum_error": "SUM(error)",
+        "sum_abs_error": "SUM(abs_error)",
+        "sum_squared_error": "SUM(squared_error)",
+        "sum_actual_return": "SUM(actual_return)",
+    },
+}
+
+
+# Per-evaluation columns and rolling window measures of the drill-down views.
+ROLLING_METRICS = {
+    "classification": (
+        ["predicted_class", "actual_class", "correct", "actual_return"],
+        {"rolling_winrate": "AVG(CASE WHEN correct THEN 1.0 ELSE 0.0 END)"},
+    ),
+    "regression": (
+        ["predicted_return", "actual_return", "error", "abs_error"],
+        {"rolling_mae": "AVG(abs_error)", "rolling_bias": "AVG(error)"},
+    ),
+}
+
+# Ranking metric per model type: (name, numerator column in the aggregates, best first order).
+RANKING_METRICS = {
+    "classification": ("winrate", "wins", "DESC"),
+    "regression": ("mae", "sum_abs_error", "ASC"),
+}
+
+
+def features_query(feature_columns: list[str]) -> tuple[str, list[str]]:
+    """Stored features of one version joined with their OHLCV rows, for a chunk of tickers."""
+    columns = ["date", "ticker", "open", "high", "low", "close", "volume"]
+    columns += feature_columns
+    select = ", ".join(
+        f"m.{c}" if c in ("date", "ticker") else c for c in columns
+    )
+    query = f"""
+        SELECT {select}
+        FROM market_features f
+        JOIN market_data m ON m.ticker = f.ticker AND m.date = f.date
+        WHERE f.ticker IN :tickers AND f.feature_set_version = :version
+        ORDER BY m.ticker ASC, m.date ASC
+    """
+    return query, columns
+
+
+def expanding(query: str, params: dict):
+    """text() statement with tuple parameters bound as expanding IN lists."""
+    stmt = text(query).bindparams(
+        *[
+            bindparam(name, expanding=True)
+            for name, value in params.items()
+            if isinstance(value, tuple)
+        ]
+    )
+    return stmt, {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in params.items()
+    }
+
 
 class DatabaseService:
     def __init__(self):
@@ -19,34 +170,26 @@ class DatabaseService:
             self.metadata = None
             return
 
-        self.engine = create_engine(
-            db_url,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-        )
-
-        self.metadata = MetaData()
+        self.engine = create_engine(db_url, **pool_options())
+        # Filled by table(): only the tables a process actually uses are reflected.
+        self.metadata = reflect_metadata(self.engine, [])
 
+    def table(self, name: str) -> Table:
         try:
-            self.metadata.reflect(bind=self.engine)
-            logger.info("Database metadata loaded successfully.")
+            reflect_metadata(self.engine, [name])
         except Exception as e:
-            raise RuntimeError("DatabaseService initialization failed.") from e
+            raise RuntimeError(f"Reflecting table {name} failed.") from e
+        return self.metadata.tables[name]  # type: ignore[union-attr]
 
     def save_market_data(self, df: pd.DataFrame, ticker: str):
         if self.engine is None or self.metadata is None or df.empty:
             return
 
-        df_to_save = df.reset_index() if "date" not in df.columns else df.copy()
-        df_to_save = df_to_save[["date", "open", "high", "low", "close", "volume"]]
-        df_to_save["ticker"] = ticker
-
-        records: list[dict] = df_to_save.to_dict(orient="records")  # type: ignore[assignment]
+        records = market_data_records(df, ticker)
 
         try:
             with self.engine.begin() as conn:
-                table = self.metadata.tables["market_data"]
+                table = self.table("market_data")
                 stmt = (
                     insert(table)
                     .values(records)
@@ -57,27 +200,113 @@ class DatabaseService:
         except Exception as e:
             logger.error(f"[{ticker}] Failed to save market data: {e}")
 
-    def fetch_market_data(self, ticker: str) -> pd.DataFrame:
+    def fetch_market_data(self, ticker: str, after: Optional[date] = None) -> pd.DataFrame:
+        """Full history of a ticker, or only the bars after `after`."""
         if self.engine is None:
             return pd.DataFrame()
 
-        query = text("""
+        query = text(f"""
 
                 SELECT date, ticker, open, high, low, close, volume 
                 FROM market_data
-                WHERE ticker = :ticker
+                WHERE ticker = :ticker{" AND date > :after" if after is not None else ""}
                 ORDER BY date ASC
             """)
+        params = {"ticker": ticker}
+        if after is not None:
+            params["after"] = pd.Timestamp(after).date()
 
         try:
             with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params={"ticker": ticker})
-                df["date"] = pd.to_datetime(df["date"])
-                return df
+                df = pd.read_sql(query, conn, params=params)
+                return compact_frame(df)
         except Exception as e:
             logger.error(f"Error fetching market data: {e}")
             return pd.DataFrame()
 
+    def iter_market_data(
+        self, tickers: Optional[list[str]] = None, chunk_size: int = 50
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Streams full history for many tickers with one query per chunk of tickers.
+        Yields (ticker, frame) with the same columns as fetch_market_data.
+        tickers=None loads the whole universe stored in market_data.
+        """
+        if self.engine is None:
+            return
+
+        if tickers is None:
+            tickers = self.fetch_available_tickers()
+        tickers = sorted(set(tickers))
+
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i : i + chunk_size]
+            try:
+                df = self._load_market_data_chunk(chunk)
+            except Exception as e:
+                logger.error(
+                    f"Error bulk fetching market data for {len(chunk)} tickers: {e}"
+                )
+                continue
+
+            yield from self._split_by_ticker(df)
+
+    def _load_market_data_chunk(self, tickers: list[str]) -> pd.DataFrame:
+        columns = ["date", "ticker", "open", "high", "low", "close", "volume"]
+        query = f"""
+            SELECT {", ".join(columns)}
+            FROM market_data
+            WHERE ticker IN :tickers
+            ORDER BY ticker ASC, date ASC
+        """
+        return compact_frame(self._read_columnar(query, columns, {"tickers": tuple(tickers)}))
+
+    def _read_columnar(
+        self, query: str, columns: list[str], params: dict
+    ) -> pd.DataFrame:
+        """
+        Runs a SELECT returning `columns` (first one "date") into a DataFrame.
+        Tuple parameters are bound as expanding IN lists.
+        """
+        with self.engine.connect() as conn:  # type: ignore[union-attr]
+            if conn.dialect.name == "postgresql":
+                # COPY the result into a CSV buffer and parse it column-wise
+                # instead of materializing one Python object per row.
+                raw = conn.connection.driver_connection
+                buffer = StringIO()
+                with raw.cursor() as cursor:  # type: ignore[union-attr]
+                    select = cursor.mogrify(
+                        re.sub(r":(\w+)", r"%(\1)s", query), params
+                    ).decode()
+                    cursor.copy_expert(f"COPY ({select}) TO STDOUT WITH CSV", buffer)
+                buffer.seek(0)
+                df = pd.read_csv(
+                    buffer,
+                    names=columns,
+                    header=None,
+                    parse_dates=["date"],
+                    dtype={"ticker": str},
+                )
+                return df
+
+            stmt, bound = expanding(query, params)
+            df = pd.read_sql(stmt, conn, params=bound)
+            df["date"] = pd.to_datetime(df["date"])
+            return df
+
+    @staticmethod
+    def _split_by_ticker(df: pd.DataFrame) -> Iterator[tuple[str, pd.DataFrame]]:
+        if df.empty:
+            return
+
+        # Rows arrive sorted by ticker, so each ticker is one contiguous block.
+        ticker_values = df["ticker"].to_numpy()
+        bounds = np.flatnonzero(ticker_values[1:] != ticker_values[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(df)]))
+        for start, end in zip(starts, ends):
+            yield ticker_values[start], df.iloc[start:end].reset_index(drop=True)
+
     def save_prediction(self, record: dict, model_type: str):
         if self.engine is None or self.metadata is None:
             return
@@ -86,7 +315,7 @@ class DatabaseService:
 
         try:
             with self.engine.begin() as conn:
-                table = self.metadata.tables[table_name]
+                table = self.table(table_name)
                 stmt = (
                     insert(table)
                     .values(record)
@@ -107,7 +336,7 @@ class DatabaseService:
 
         try:
             with self.engine.begin() as conn:
-                table = self.metadata.tables[table_name]
+                table = self.table(table_name)
                 stmt = (
                     insert(table)
                     .values(record)
@@ -120,39 +349,121 @@ class DatabaseService:
         except Exception as e:
             logger.error(f"Failed to save {model_type} evaluation: {e}")
 
-    def get_prediction_for_evaluation(
-        self, ticker: str, model: str, target_date: str, model_type: str
-    ) -> dict | None:
+    def save_evaluations(self, df: pd.DataFrame, model_type: str):
+        if self.engine is None or self.metadata is None or df.empty:
+            return
+
+        table_name = f"evaluations_{model_type}"
+
+        try:
+            table = self.table(table_name)
+            records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            stmt = insert(table).on_conflict_do_nothing(index_elements=["prediction_id"])
+            with self.engine.begin() as conn:
+                conn.execute(stmt, records)
+            logger.debug(f"Saved {len(records)} {model_type} evaluations.")
+        except Exception as e:
+            logger.error(f"Failed to save {model_type} evaluations: {e}")
+
+    def fetch_pending_evaluations(self, model_type: str) -> pd.DataFrame:
+        """
+        See pending_evaluations_query. One query per model type, which also
+        picks up targets missed on earlier runs.
+        """
         if self.engine is None:
-            return None
+            return pd.DataFrame()
 
-        table_name = f"predictions_{model_type}"
-        val_col = (
-            "predicted_class" if model_type == "classification" else "predicted_return"
-        )
+        query, columns = pending_evaluations_query(model_type)
 
-        query = text(f"""
-            SELECT id, {val_col} as predicted_value 
-            FROM {table_name} 
-            WHERE ticker = :ticker AND model = :model AND target_date = :target_date
-            LIMIT 1
-        """)
+        try:
+            return self._read_columnar(query, columns, {})
+        except Exception as e:
+            logger.error(f"Error fetching pending {model_type} evaluations: {e}")
+            return pd.DataFrame()
+
+    def refresh_evaluation_aggregates(self, model_type: str) -> int:
+        """
+        Folds the evaluations added since the last refresh (ids above the
+        watermark in aggregate_watermarks) into evaluation_daily_* and
+        evaluation_ticker_*, so the dashboard never scans the evaluations
+        table. Returns the number of evaluations folded in.
+        """
+        if self.engine is None:
+            return 0
 
+        source = f"evaluations_{model_type}"
+        measures = EVALUATION_MEASURES[model_type]
         try:
-            with self.engine.connect() as conn:
-                res = pd.read_sql(
-                    query,
-                    conn,
-                    params={
-                        "ticker": ticker,
-                        "model": model,
-                        "target_date": target_date,
-                    },
+            with self.engine.begin() as conn:
+                postgres = conn.dialect.name == "postgresql"
+                conn.execute(
+                    text(
+                        "INSERT INTO aggregate_watermarks (name, last_id) VALUES (:name, 0) "
+                        "ON CONFLICT (name) DO NOTHING"
+                    ),
+                    {"name": source},
+                )
+                # The row lock serializes concurrent refreshes on Postgres.
+                last_id = conn.execute(
+                    text(
+                        "SELECT last_id FROM aggregate_watermarks WHERE name = :name"
+                        + (" FOR UPDATE" if postgres else "")
+                    ),
+                    {"name": source},
+                ).scalar()
+                max_id, count = conn.execute(
+                    text(f"SELECT max(id), count(*) FROM {source} WHERE id > :last_id"),
+                    {"last_id": last_id},
+                ).one()
+                if not count:
+                    return 0
+
+                least, greatest = ("LEAST", "GREATEST") if postgres else ("MIN", "MAX")
+                targets = [
+                    (f"evaluation_daily_{model_type}", ["model", "evaluation_date"], {}),
+                    (
+                        f"evaluation_ticker_{model_type}",
+                        ["model", "ticker"],
+                        {
+                            "first_date": ("MIN(evaluation_date)", least),
+                            "last_date": ("MAX(evaluation_date)", greatest),
+                        },
+                    ),
+                ]
+                for table, keys, bounds in targets:
+                    select = {**measures, **{c: agg for c, (agg, _) in bounds.items()}}
+                    # last_id marks the rows touched by this refresh for delta reads.
+                    select["last_id"] = ":max_id"
+                    updates = [f"{c} = {table}.{c} + excluded.{c}" for c in measures]
+                    updates += [
+                        f"{c} = {fn}({table}.{c}, excluded.{c})"
+                        for c, (_, fn) in bounds.items()
+                    ]
+                    updates.append("last_id = excluded.last_id")
+                    conn.execute(
+                        text(f"""
+                            INSERT INTO {table} ({", ".join(keys + list(select))})
+                            SELECT {", ".join(keys + list(select.values()))}
+                            FROM {source}
+                            WHERE id > :last_id AND id <= :max_id
+                            GROUP BY {", ".join(keys)}
+                            ON CONFLICT ({", ".join(keys)}) DO UPDATE SET {", ".join(updates)}
+                        """),
+                        {"last_id": last_id, "max_id": max_id},
+                    )
+
+                conn.execute(
+                    text(
+                        "UPDATE aggregate_watermarks SET last_id = :max_id, updated_at = CURRENT_TIMESTAMP "
+                        "WHERE name = :name"
+                    ),
+                    {"max_id": max_id, "name": source},
                 )
-                return res.iloc[0].to_dict() if not res.empty else None
+            logger.info(f"Folded {count} {model_type} evaluations into the dashboard aggregates.")
+            return int(count)
         except Exception as e:
-            logger.error(f"Error fetching prediction for evaluation: {e}")
-            return None
+            logger.error(f"Failed to refresh {model_type} evaluation aggregates: {e}")
+            return 0
 
     def get_latest_date(self, ticker: str) -> date | None:
         if self.engine is None:
@@ -167,6 +478,158 @@ class DatabaseService:
             logger.error(f"Error fetching latest date for {ticker}: {e}")
             return None
 
+    def get_latest_dates(self, tickers: Optional[list[str]] = None) -> dict[str, date]:
+        """get_latest_date of many tickers (all with tickers=None) in one query."""
+        if self.engine is None or tickers == []:
+            return {}
+
+        where = "WHERE ticker IN :tickers" if tickers is not None else ""
+        query = f"SELECT ticker, max(date) AS date FROM market_data {where} GROUP BY ticker"
+        params = {"tickers": tuple(tickers)} if tickers is not None else {}
+
+        try:
+            stmt, bound = expanding(query, params)
+            with self.engine.connect() as conn:
+                rows = conn.execute(stmt, bound).all()
+            return {ticker: pd.Timestamp(latest).date() for ticker, latest in rows}
+        except Exception as e:
+            logger.error(f"Error fetching latest dates: {e}")
+            return {}
+
+    def iter_features(
+        self,
+        tickers: list[str],
+        feature_columns: list[str],
+        version: str,
+        chunk_size: int = 50,
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Streams stored features of one feature set version joined with their
+        OHLCV rows, i.e. the same frame add_features returns.
+        """
+        if self.engine is None:
+            return
+
+        query, columns = features_query(feature_columns)
+
+        tickers = sorted(set(tickers))
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i : i + chunk_size]
+            try:
+                df = compact_frame(
+                    self._read_columnar(
+                        query, columns, {"tickers": tuple(chunk), "version": version}
+                    )
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error bulk fetching features for {len(chunk)} tickers: {e}"
+                )
+                continue
+
+            yield from self._split_by_ticker(df)
+
+    def save_features(self, df: pd.DataFrame, ticker: str, version: str):
+        if self.engine is None or self.metadata is None or df.empty:
+            return
+
+        table = self.table("market_features")
+        columns = [c.name for c in table.columns if c.name in df.columns]
+        df_to_save = df[columns].assign(ticker=ticker, feature_set_version=version)
+        records: list[dict] = df_to_save.to_dict(orient="records")  # type: ignore[assignment]
+
+        try:
+            with self.engine.begin() as conn:
+                stmt = (
+                    insert(table)
+                    .values(records)
+                    .on_conflict_do_nothing(
+                        index_elements=["ticker", "feature_set_version", "date"]
+                    )
+                )
+                conn.execute(stmt)
+            logger.debug(f"[{ticker}] Saved {len(records)} feature rows.")
+        except Exception as e:
+            logger.error(f"[{ticker}] Failed to save features: {e}")
+
+    def fetch_feature_states(self, tickers: list[str]) -> dict[str, dict]:
+        if self.engine is None or not tickers:
+            return {}
+
+        query = text(
+            "SELECT ticker, state FROM feature_state WHERE ticker IN :tickers"
+        ).bindparams(bindparam("tickers", expanding=True))
+
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(query, {"tickers": list(tickers)}).all()
+        except Exception as e:
+            logger.error(f"Error fetching feature states: {e}")
+            return {}
+
+        return {
+            ticker: json.loads(state) if isinstance(state, str) else state
+            for ticker, state in rows
+        }
+
+    def fetch_feature_state(self, ticker: str) -> dict | None:
+        if self.engine is None:
+            return None
+
+        query = text("SELECT state FROM feature_state WHERE ticker = :ticker")
+
+        try:
+            with self.engine.connect() as conn:
+                state = conn.execute(query, {"ticker": ticker}).scalar()
+                if isinstance(state, str):
+                    state = json.loads(state)
+                return state
+        except Exception as e:
+            logger.error(f"Error fetching feature state for {ticker}: {e}")
+            return None
+
+    def save_feature_state(self, ticker: str, state: dict):
+        if self.engine is None or self.metadata is None or not state.get("last_date"):
+            return
+
+        try:
+            with self.engine.begin() as conn:
+                table = self.table("feature_state")
+                # Plain TEXT/DATE columns outside Postgres (e.g. SQLite replays).
+                payload = state if isinstance(table.c.state.type, JSON) else json.dumps(state)
+                stmt = insert(table).values(
+                    ticker=ticker,
+                    last_date=date.fromisoformat(str(state["last_date"])[:10]),
+                    version=state["version"],
+                    state=payload,
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["ticker"],
+                    set_={
+                        "last_date": stmt.excluded.last_date,
+                        "version": stmt.excluded.version,
+                        "state": stmt.excluded.state,
+                        "updated_at": func.now(),
+                    },
+                )
+                conn.execute(stmt)
+            logger.debug(f"[{ticker}] Saved feature state up to {state['last_date']}.")
+        except Exception as e:
+            logger.error(f"[{ticker}] Failed to save feature state: {e}")
+
+    def fetch_completed_backtests(self, run: str) -> set[tuple[str, str]]:
+        if self.engine is None:
+            return set()
+
+        query = text("SELECT ticker, model FROM backtest_summary WHERE run = :run")
+        try:
+            with self.engine.connect() as conn:
+                res = pd.read_sql(query, conn, params={"run": run})
+                return set(zip(res["ticker"], res["model"]))
+        except Exception as e:
+            logger.error(f"Error fetching completed backtests for run {run}: {e}")
+            return set()
+
     # --- Methods for frontend data retrieval. NOT used in pipeline.
 
     def fetch_available_tickers(self) -> list[str]:
@@ -212,3 +675,175 @@ class DatabaseService:
         except Exception as e:
             logger.error(f"Error fetching evaluations for {model_type}: {e}")
             return pd.DataFrame()
+
+    def fetch_daily_aggregates(self, model_type: str, after_id: int = 0) -> pd.DataFrame:
+        """
+        One row per (model, evaluation_date) with the EVALUATION_MEASURES
+        columns. With `after_id`, only rows changed by refreshes past that
+        evaluation id (their last_id).
+        """
+        return self._fetch_aggregates(
+            f"evaluation_daily_{model_type}", model_type, "model, evaluation_date", after_id
+        )
+
+    def fetch_ticker_aggregates(self, model_type: str, after_id: int = 0) -> pd.DataFrame:
+        """One row per (model, ticker) with the EVALUATION_MEASURES columns and the date range."""
+        return self._fetch_aggregates(
+            f"evaluation_ticker_{model_type}", model_type, "model, ticker", after_id
+        )
+
+    def _fetch_aggregates(
+        self, table_name: str, model_type: str, order_by: str, after_id: int
+    ) -> pd.DataFrame:
+        if self.engine is None:
+            return pd.DataFrame()
+
+        if model_type not in EVALUATION_MEASURES:
+            raise ValueError(f"Invalid model_type: {model_type}.")
+
+        query = text(
+            f"SELECT * FROM {table_name} WHERE last_id > :after_id ORDER BY {order_by}"
+        )
+        try:
+            with self.engine.connect() as conn:
+                return pd.read_sql(query, conn, params={"after_id": after_id})
+        except Exception as e:
+            logger.error(f"Error fetching {table_name}: {e}")
+            return pd.DataFrame()
+
+    def fetch_rolling_metrics(
+        self,
+        model_type: str,
+        ticker: str,
+        model: str,
+        window: int = 20,
+        limit: int = 250,
+        before=None,
+    ) -> pd.DataFrame:
+        """
+        Evaluations of one ticker and model, newest first, with ROLLING_METRICS
+        over the last `window` evaluations. Keyset-paginated: pass the oldest
+        evaluation_date of a page as `before` to get the next one. Reads at
+        most limit + window - 1 rows through idx_eval_*_ticker_model.
+        """
+        if self.engine is None:
+            return pd.DataFrame()
+
+        if model_type not in ROLLING_METRICS:
+            raise ValueError(f"Invalid model_type: {model_type}.")
+
+        columns, measures = ROLLING_METRICS[model_type]
+        window = max(1, int(window))
+        params = {"ticker": ticker, "model": model, "fetch": limit + window - 1, "limit": limit}
+        cursor = ""
+        if before is not None:
+            cursor = "AND evaluation_date < :before"
+            params["before"] = pd.Timestamp(before).date()
+
+        rolling = ", ".join(f"{expr} OVER w AS {name}" for name, expr in measures.items())
+        query = text(f"""
+            SELECT evaluation_date, {", ".join(columns)}, {rolling}, COUNT(*) OVER w AS window_n
+            FROM (
+                SELECT evaluation_date, {", ".join(columns)}
+                FROM evaluations_{model_type}
+                WHERE ticker = :ticker AND model = :model {cursor}
+                ORDER BY evaluation_date DESC
+                LIMIT :fetch
+            ) recent
+            WINDOW w AS (ORDER BY evaluation_date ROWS BETWEEN {window - 1} PRECEDING AND CURRENT ROW)
+            ORDER BY evaluation_date DESC
+            LIMIT :limit
+        """)
+        try:
+            with self.engine.connect() as conn:
+                df = pd.read_sql(query, conn, params=params)
+                df["evaluation_date"] = pd.to_datetime(df["evaluation_date"])
+                return df
+        except Exception as e:
+            logger.error(f"Error fetching rolling {model_type} metrics for {ticker}/{model}: {e}")
+            return pd.DataFrame()
+
+    def fetch_model_ranking(self, model_type: str, recent_days: int = 20) -> pd.DataFrame:
+        """
+        One row per model, best first: the RANKING_METRICS value over all
+        evaluations and over the last `recent_days` evaluation days, from the
+        daily aggregates.
+        """
+        if self.engine is None:
+            return pd.DataFrame()
+
+        if model_type not in RANKING_METRICS:
+            raise ValueError(f"Invalid model_type: {model_type}.")
+
+        metric, numerator, order = RANKING_METRICS[model_type]
+        recent_days = max(1, int(recent_days))
+        total = "PARTITION BY model ORDER BY evaluation_date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW"
+        recent = f"PARTITION BY model ORDER BY evaluation_date ROWS BETWEEN {recent_days - 1} PRECEDING AND CURRENT ROW"
+        query = text(f"""
+            SELECT model, evaluation_date AS last_date, total_n AS n,
+                   1.0 * total_num / total_n AS {metric},
+                   1.0 * recent_num / recent_n AS recent_{metric}
+            FROM (
+                SELECT model, evaluation_date,
+                       SUM(n) OVER ({total}) AS total_n,
+                       SUM({numerator}) OVER ({total}) AS total_num,
+                       SUM(n) OVER ({recent}) AS recent_n,
+                       SUM({numerator}) OVER ({recent}) AS recent_num,
+                       ROW_NUMBER() OVER (PARTITION BY model ORDER BY evaluation_date DESC) AS rn
+                FROM evaluation_daily_{model_type}
+            ) daily
+            WHERE rn = 1
+            ORDER BY recent_{metric} {order}, model
+        """)
+        try:
+            with self.engine.connect() as conn:
+                return pd.read_sql(query, conn)
+        except Exception as e:
+            logger.error(f"Error fetching {model_type} model ranking: {e}")
+            return pd.DataFrame()
+
+    def fetch_ticker_ranking(
+        self,
+        model_type: str,
+        model: Optional[str] = None,
+        worst: bool = False,
+        limit: int = 10,
+        offset: int = 0,
+        min_evaluations: int = 20,
+    ) -> pd.DataFrame:
+        """
+        One page of tickers ranked by the RANKING_METRICS value (best or
+        worst first), over one model or all of them, from the per-ticker
+        aggregates.
+        """
+        if self.engine is None:
+            return pd.DataFrame()
+
+        if model_type not in RANKING_METRICS:
+            raise ValueError(f"Invalid model_type: {model_type}.")
+
+        metric, numerator, order = RANKING_METRICS[model_type]
+        if worst:
+            order = "ASC" if order == "DESC" else "DESC"
+        params = {"min_n": min_evaluations, "limit": limit, "offset": offset}
+        where = ""
+        if model is not None:
+            where = "WHERE model = :model"
+            params["model"] = model
+
+        query = text(f"""
+            SELECT ticker, SUM(n) AS n, 1.0 * SUM({numerator}) / SUM(n) AS {metric},
+                   MAX(last_date) AS last_date
+            FROM evaluation_ticker_{model_type}
+            {where}
+            GROUP BY ticker
+            HAVING SUM(n) >= :min_n
+            ORDER BY {metric} {order}, ticker
+            LIMIT :limit OFFSET :offset
+        """)
+        try:
+            with self.engine.connect() as conn:
+                return pd.read_sql(query, conn, params=params)
+        except Exception as e:
+            logger.error(f"Error fetching {model_type} ticker ranking: {e}")
+            return pd.DataFrame()
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.indicators import FEATURE_COLUMNS
+
+# "0" keeps working frames in float64/object, e.g. to compare memory use
+# and model outputs against the compact policy.
+COMPACT_DTYPES = os.getenv("PIPELINE_COMPACT_DTYPES", "1") != "0"
+
+# Indicators are model inputs only, and their float32 rounding (~1e-7
+# relative) is far below their noise; tree models and XGBoost fit on float32
+# anyway. Prices, volume and log_return stay float64: returns, targets and
+# evaluations are computed from them. The indicator kernel computes and the
+# feature store persists float64, so incremental updates still match a full
+# recomputation.
+FLOAT32_COLUMNS = [c for c in FEATURE_COLUMNS if c != "log_return"]
+CATEGORY_COLUMNS = ["ticker"]
+TARGET_DTYPE = np.int8
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies the dtype policy to a market data or feature frame: float32
+    indicators, categorical ticker and a datetime64 date column or index.
+    Columns already in policy are shared with `df`, not copied.
+    """
+    if not COMPACT_DTYPES or df.empty:
+        return df
+
+    dtypes = {
+        column: np.float32
+        for column in FLOAT32_COLUMNS
+        if column in df.columns and df[column].dtype != np.float32
+    }
+    dtypes.update(
+        {
+            column: "category"
+            for column in CATEGORY_COLUMNS
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype)
+        }
+    )
+    if dtypes:
+        df = df.astype(dtypes, copy=False)
+    if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df = df.assign(date=pd.to_datetime(df["date"]))
+    if df.index.name == "date" and not isinstance(df.index, pd.DatetimeIndex):
+        df = df.set_axis(pd.to_datetime(df.index), copy=False)
+    return df
+
+
+def frame_memory(frames) -> int:
+    """Deep memory usage in bytes of a frame or an iterable of frames."""
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    return sum(int(df.memory_usage(deep=True).sum()) for df in frames)
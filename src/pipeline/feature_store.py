@@ -0,0 +1,88 @@
+from typing import Optional
+
+import pandas as pd
+
+from src.pipeline.database import DatabaseService
+from src.pipeline.indicators import (
+    FEATURE_COLUMNS,
+    FEATURE_SET_VERSION,
+    add_features_incremental,
+    is_usable_state,
+)
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+
+def update_features(
+    ohlcv: pd.DataFrame, stored: pd.DataFrame, state: Optional[dict]
+) -> tuple[pd.DataFrame, pd.DataFrame, Optional[dict]]:
+    """
+    Extends stored features with the bars of `ohlcv` newer than the state.
+    Without a usable state `ohlcv` must be the full history and everything is
+    recomputed. Returns (all features, rows to persist, new state).
+    """
+    ohlcv = ohlcv.rename(columns=str.lower)[OHLCV_COLUMNS]
+
+    if not is_usable_state(state):
+        if len(ohlcv) < 200:
+            return pd.DataFrame(), pd.DataFrame(), None
+        features, state = add_features_incremental(pd.DataFrame(), ohlcv, None)
+        return features, features, state
+
+    last_date = pd.Timestamp(state["last_date"])  # type: ignore[index]
+    features, state = add_features_incremental(stored, ohlcv, state)
+    return features, features[features["date"] > last_date], state
+
+
+class FeatureStore:
+    """
+    Persisted technical features in market_features, keyed by
+    (ticker, date, feature_set_version), plus the indicator state needed to
+    extend them bar by bar. A change in the feature definitions changes
+    FEATURE_SET_VERSION, which makes stored rows invisible and triggers a
+    full recomputation on the next update.
+    """
+
+    def __init__(self, db_service: DatabaseService, writer=None):
+        self.db_service = db_service
+        self.writer = writer if writer is not None else db_service
+        self.version = FEATURE_SET_VERSION
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        features, _ = self.load_many([ticker]).get(ticker, (pd.DataFrame(), None))
+        return features
+
+    def load_many(
+        self, tickers: list[str], chunk_size: int = 50
+    ) -> dict[str, tuple[pd.DataFrame, Optional[dict]]]:
+        """
+        Stored features and state per ticker. The state is None when it cannot
+        be used to extend the stored rows (missing, other version, or out of
+        sync after an interrupted run).
+        """
+        stored = {
+            ticker: df.drop(columns=["ticker"])
+            for ticker, df in self.db_service.iter_features(
+                tickers, FEATURE_COLUMNS, self.version, chunk_size=chunk_size
+            )
+        }
+        states = self.db_service.fetch_feature_states(list(stored))
+
+        result = {}
+        for ticker, df in stored.items():
+            state = states.get(ticker)
+            in_sync = (
+                is_usable_state(state)
+                and df["date"].iloc[-1] == pd.Timestamp(state["last_date"])  # type: ignore[index]
+            )
+            result[ticker] = (df, state if in_sync else None)
+        return result
+
+    def save(self, ticker: str, new_rows: pd.DataFrame, state: Optional[dict]):
+        if not new_rows.empty:
+            self.writer.save_features(new_rows, ticker, self.version)
+        if state is not None:
+            self.db_service.save_feature_state(ticker, state)
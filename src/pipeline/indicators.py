@@ -0,0 +1,480 @@
+import hashlib
+import inspect
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bump when an indicator definition changes; persisted states of an older
+# version are discarded and rebuilt from history.
+STATE_VERSION = 1
+
+FEATURE_COLUMNS = [
+    "log_return",
+    "volumne_rolling_mean_20",
+    "rsi_14",
+    "roc_10",
+    "atr_14",
+    "mfi_14",
+    "macd_hist",
+    "bb_percent",
+    "dist_ema_200",
+]
+
+
+# --- Vectorized kernel
+#
+# All arrays are float64, either 1-D (bars) or 2-D (tickers x bars). Rows of a
+# 2-D batch are left-aligned: each ticker's history starts at column 0 and is
+# padded with NaN at the end. Every indicator is causal along the last axis, so
+# the padding never leaks into valid bars.
+
+# Rows per block for the windowed std; bounds the temporary window copy.
+_STD_BLOCK_ROWS = 128
+
+
+def lfilter(*args, **kwargs):
+    # scipy.signal takes most of a second to import; load it with the first
+    # feature computation instead of with every importer of this module.
+    from scipy.signal import lfilter as scipy_lfilter
+
+    return scipy_lfilter(*args, **kwargs)
+
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[..., n:] = x[..., :-n]
+    return out
+
+
+def _rolling_sum(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] >= n:
+        out[..., n - 1 :] = sliding_window_view(x, n, axis=-1).sum(axis=-1)
+    return out
+
+
+def _rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] < n:
+        return out
+    x2 = np.atleast_2d(x)
+    out2 = np.atleast_2d(out)
+    for start in range(0, x2.shape[0], _STD_BLOCK_ROWS):
+        block = x2[start : start + _STD_BLOCK_ROWS]
+        out2[start : start + _STD_BLOCK_ROWS, n - 1 :] = sliding_window_view(
+            block, n, axis=-1
+        ).std(axis=-1, ddof=1)
+    return out
+
+
+def _ema(x: np.ndarray, length: int, start: int = 0) -> np.ndarray:
+    # SMA of x[start:start+length] as seed, then ewm(span=length, adjust=False).
+    out = np.full_like(x, np.nan)
+    seed_end = start + length
+    if x.shape[-1] < seed_end:
+        return out
+    alpha = 2.0 / (length + 1)
+    seed = x[..., start:seed_end].mean(axis=-1)
+    out[..., seed_end - 1] = seed
+    if x.shape[-1] > seed_end:
+        zi = ((1 - alpha) * seed)[..., np.newaxis]
+        out[..., seed_end:], _ = lfilter(
+            [alpha], [1.0, alpha - 1.0], x[..., seed_end:], axis=-1, zi=zi
+        )
+    return out
+
+
+def _rma(x: np.ndarray, length: int, start: int = 1) -> np.ndarray:
+    # ewm(alpha=1/length, adjust=True, min_periods=length) over x[start:].
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] < start + length:
+        return out
+    decay = 1.0 - 1.0 / length
+    num = lfilter([1.0], [1.0, -decay], x[..., start:], axis=-1)
+    den = (1.0 - decay ** np.arange(1, num.shape[-1] + 1)) / (1.0 - decay)
+    out[..., start:] = num / den
+    out[..., : start + length - 1] = np.nan
+    return out
+
+
+def compute_indicators(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Computes FEATURE_COLUMNS for 1-D or left-aligned 2-D float64 arrays.
+    Warm-up bars are NaN, matching add_features before its dropna().
+    """
+    prev_close = _shift(close, 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_return = np.log(close / prev_close)
+        volume_mean = _rolling_sum(volume, 20) / 20
+
+        delta = close - prev_close
+        gain = _rma(np.maximum(delta, 0.0), 14)
+        loss = _rma(np.minimum(delta, 0.0), 14)
+        rsi = 100.0 * gain / (gain + np.abs(loss))
+
+        close_10 = _shift(close, 10)
+        roc = 100.0 * (close - close_10) / close_10
+
+        tr = np.maximum(
+            high - low,
+            np.maximum(np.abs(high - prev_close), np.abs(prev_close - low)),
+        )
+        atr = _rma(tr, 14)
+
+        tp = (high + low + close) / 3.0
+        flow = tp * volume
+        tp_diff = tp - _shift(tp, 1)
+        pos = _rolling_sum(np.where(tp_diff > 0, flow, 0.0), 14)
+        neg = _rolling_sum(np.where(tp_diff < 0, flow, 0.0), 14)
+        mfi = 100.0 * pos / (pos + neg)
+
+        macd = _ema(close, 12) - _ema(close, 26)
+        macd_hist = macd - _ema(macd, 9, start=25)
+
+        mid = _rolling_sum(close, 20) / 20
+        dev = 2.0 * _rolling_std(close, 20)
+        bb_percent = (close - (mid - dev)) / (2.0 * dev)
+
+        ema_200 = _ema(close, 200)
+        dist_ema_200 = (close - ema_200) / ema_200
+
+    return {
+        "log_return": log_return,
+        "volumne_rolling_mean_20": volume_mean,
+        "rsi_14": rsi,
+        "roc_10": roc,
+        "atr_14": atr,
+        "mfi_14": mfi,
+        "macd_hist": macd_hist,
+        "bb_percent": bb_percent,
+        "dist_ema_200": dist_ema_200,
+    }
+
+
+def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Appends FEATURE_COLUMNS to a single ticker's OHLCV frame (no dropna)."""
+    ohlcv = df[["open", "high", "low", "close", "volume"]].to_numpy(dtype="float64")
+    features = compute_indicators(*np.ascontiguousarray(ohlcv.T))
+    return df.assign(**features)
+
+
+def compute_features_many(frames: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """
+    Batch version of compute_features: stacks all tickers into left-aligned
+    (tickers x bars) arrays and runs the kernel once.
+    """
+    if not frames:
+        return {}
+
+    tickers = list(frames)
+    lengths = np.array([len(frames[t]) for t in tickers])
+    stacked = np.full((5, len(tickers), lengths.max()), np.nan)
+    for i, ticker in enumerate(tickers):
+        ohlcv = frames[ticker][["open", "high", "low", "close", "volume"]]
+        stacked[:, i, : lengths[i]] = ohlcv.to_numpy(dtype="float64").T
+
+    features = compute_indicators(*stacked)
+    return {
+        ticker: frames[ticker].assign(
+            **{name: values[i, : lengths[i]] for name, values in features.items()}
+        )
+        for i, ticker in enumerate(tickers)
+    }
+
+
+# --- Incremental state machine
+
+
+def _ema_state() -> dict:
+    return {"count": 0, "sum": 0.0, "value": None}
+
+
+def _ema_update(state: dict, x: float, length: int) -> Optional[float]:
+    # pandas_ta ema: SMA of the first `length` values as seed, then
+    # ewm(span=length, adjust=False).
+    state["count"] += 1
+    if state["count"] < length:
+        state["sum"] += x
+        return None
+    if state["count"] == length:
+        state["value"] = (state["sum"] + x) / length
+    else:
+        alpha = 2.0 / (length + 1)
+        state["value"] = alpha * x + (1 - alpha) * state["value"]
+    return state["value"]
+
+
+def _rma_state() -> dict:
+    return {"count": 0, "num": 0.0, "den": 0.0}
+
+
+def _rma_update(state: dict, x: float, length: int) -> Optional[float]:
+    # pandas_ta rma: ewm(alpha=1/length, adjust=True, min_periods=length),
+    # kept exact through the running weighted numerator and denominator.
+    decay = 1.0 - 1.0 / length
+    state["count"] += 1
+    state["num"] = decay * state["num"] + x
+    state["den"] = decay * state["den"] + 1.0
+    if state["count"] < length:
+        return None
+    return state["num"] / state["den"]
+
+
+def _push(window: list, x: float, length: int) -> bool:
+    window.append(x)
+    if len(window) > length:
+        del window[0]
+    return len(window) == length
+
+
+def new_feature_state() -> dict:
+    return {
+        "version": STATE_VERSION,
+        "feature_set_version": FEATURE_SET_VERSION,
+        "last_date": None,
+        "prev_close": None,
+        "prev_tp": None,
+        "rsi_gain": _rma_state(),
+        "rsi_loss": _rma_state(),
+        "atr": _rma_state(),
+        "roc_closes": [],
+        "mfi_pos": [],
+        "mfi_neg": [],
+        "bb_closes": [],
+        "volumes": [],
+        "ema_12": _ema_state(),
+        "ema_26": _ema_state(),
+        "macd_signal": _ema_state(),
+        "ema_200": _ema_state(),
+    }
+
+
+def _step(state: dict, o: float, h: float, low: float, c: float, v: float) -> list:
+    nan = math.nan
+    prev_close = state["prev_close"]
+    tp = (h + low + c) / 3.0
+
+    log_return = math.log(c / prev_close) if prev_close is not None else nan
+
+    vol_full = _push(state["volumes"], v, 20)
+    vol_mean = sum(state["volumes"]) / 20 if vol_full else nan
+
+    rsi = nan
+    atr = nan
+    if prev_close is not None:
+        delta = c - prev_close
+        gain = _rma_update(state["rsi_gain"], max(delta, 0.0), 14)
+        loss = _rma_update(state["rsi_loss"], min(delta, 0.0), 14)
+        if gain is not None and loss is not None and gain + abs(loss) != 0:
+            rsi = 100.0 * gain / (gain + abs(loss))
+
+        tr = max(h - low, abs(h - prev_close), abs(prev_close - low))
+        atr_value = _rma_update(state["atr"], tr, 14)
+        atr = atr_value if atr_value is not None else nan
+
+    roc_full = _push(state["roc_closes"], c, 11)
+    roc = (
+        100.0 * (c - state["roc_closes"][0]) / state["roc_closes"][0]
+        if roc_full
+        else nan
+    )
+
+    prev_tp = state["prev_tp"]
+    flow = tp * v
+    pos = flow if prev_tp is not None and tp > prev_tp else 0.0
+    neg = flow if prev_tp is not None and tp < prev_tp else 0.0
+    _push(state["mfi_pos"], pos, 14)
+    mfi_full = _push(state["mfi_neg"], neg, 14)
+    mfi = nan
+    if mfi_full:
+        psum, nsum = sum(state["mfi_pos"]), sum(state["mfi_neg"])
+        if psum + nsum != 0:
+            mfi = 100.0 * psum / (psum + nsum)
+
+    fast = _ema_update(state["ema_12"], c, 12)
+    slow = _ema_update(state["ema_26"], c, 26)
+    macd_hist = nan
+    if fast is not None and slow is not None:
+        macd = fast - slow
+        signal = _ema_update(state["macd_signal"], macd, 9)
+        if signal is not None:
+            macd_hist = macd - signal
+
+    bb_percent = nan
+    if _push(state["bb_closes"], c, 20):
+        window = np.asarray(state["bb_closes"])
+        mid = window.mean()
+        dev = 2.0 * window.std(ddof=1)
+        if dev != 0:
+            bb_percent = (c - (mid - dev)) / (2.0 * dev)
+
+    ema_200 = _ema_update(state["ema_200"], c, 200)
+    dist_ema_200 = (c - ema_200) / ema_200 if ema_200 is not None else nan
+
+    state["prev_close"] = c
+    state["prev_tp"] = tp
+
+    return [log_return, vol_mean, rsi, roc, atr, mfi, macd_hist, bb_percent, dist_ema_200]
+
+
+def compute_features_incremental(
+    df: pd.DataFrame, state: Optional[dict] = None
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Advances the indicator state over the rows of `df` that are newer than
+    state["last_date"] and returns those rows with feature columns appended,
+    warm-up rows included (NaN features). state=None starts from scratch.
+    """
+    if not is_usable_state(state):
+        state = new_feature_state()
+
+    df = df.rename(columns=str.lower)
+    if state["last_date"] is not None:
+        df = df[pd.to_datetime(df["date"]) > pd.Timestamp(state["last_date"])]
+    if df.empty:
+        return df.reindex(columns=list(df.columns) + FEATURE_COLUMNS), state
+
+    ohlcv = df[["open", "high", "low", "close", "volume"]].to_numpy(dtype="float64")
+    rows = [_step(state, *bar) for bar in ohlcv]
+
+    out = df.copy()
+    out[FEATURE_COLUMNS] = np.asarray(rows, dtype="float64")
+    state["last_date"] = pd.Timestamp(df["date"].iloc[-1]).strftime("%Y-%m-%d")
+    return out, state
+
+
+def _ema_state_from(ema: np.ndarray, x: np.ndarray, length: int) -> dict:
+    # x holds the EMA inputs from its first valid value on.
+    count = len(x)
+    return {
+        "count": count,
+        "sum": float(x[: length - 1].sum()) if count < length else 0.0,
+        "value": float(ema[-1]) if count >= length else None,
+    }
+
+
+def _rma_state_from(x: np.ndarray, length: int) -> dict:
+    decay = 1.0 - 1.0 / length
+    num = lfilter([1.0], [1.0, -decay], x)[-1] if len(x) else 0.0
+    den = (1.0 - decay ** len(x)) / (1.0 - decay)
+    return {"count": len(x), "num": float(num), "den": float(den)}
+
+
+def build_feature_state(df: pd.DataFrame) -> dict:
+    """
+    State after the last row of an OHLCV frame, derived with the vectorized
+    kernel instead of stepping through every bar.
+    """
+    state = new_feature_state()
+    if df.empty:
+        return state
+
+    df = df.rename(columns=str.lower)
+    open_, high, low, close, volume = np.ascontiguousarray(
+        df[["open", "high", "low", "close", "volume"]].to_numpy(dtype="float64").T
+    )
+    delta = np.diff(close)
+    prev_close = close[:-1]
+    tr = np.maximum(
+        high[1:] - low[1:],
+        np.maximum(np.abs(high[1:] - prev_close), np.abs(prev_close - low[1:])),
+    )
+    tp = (high + low + close) / 3.0
+    flow = tp * volume
+    tp_diff = np.diff(tp, prepend=np.nan)
+
+    macd = _ema(close, 12) - _ema(close, 26)
+    macd_valid = macd[25:]
+    signal = _ema(macd, 9, start=25)
+
+    state.update(
+        {
+            "last_date": pd.Timestamp(df["date"].iloc[-1]).strftime("%Y-%m-%d"),
+            "prev_close": float(close[-1]),
+            "prev_tp": float(tp[-1]),
+            "rsi_gain": _rma_state_from(np.maximum(delta, 0.0), 14),
+            "rsi_loss": _rma_state_from(np.minimum(delta, 0.0), 14),
+            "atr": _rma_state_from(tr, 14),
+            "roc_closes": close[-11:].tolist(),
+            "mfi_pos": np.where(tp_diff > 0, flow, 0.0)[-14:].tolist(),
+            "mfi_neg": np.where(tp_diff < 0, flow, 0.0)[-14:].tolist(),
+            "bb_closes": close[-20:].tolist(),
+            "volumes": volume[-20:].tolist(),
+            "ema_12": _ema_state_from(_ema(close, 12), close, 12),
+            "ema_26": _ema_state_from(_ema(close, 26), close, 26),
+            "macd_signal": _ema_state_from(signal, macd_valid, 9),
+            "ema_200": _ema_state_from(_ema(close, 200), close, 200),
+        }
+    )
+    return state
+
+
+def is_usable_state(state: Optional[dict]) -> bool:
+    return (
+        state is not None
+        and state.get("version") == STATE_VERSION
+        and state.get("feature_set_version") == FEATURE_SET_VERSION
+        and state.get("last_date") is not None
+    )
+
+
+def add_features_incremental(
+    history: pd.DataFrame, new_df: pd.DataFrame, state: Optional[dict]
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Incremental counterpart of collector.add_features: `history` is the
+    feature frame already computed up to state["last_date"], only the new bars
+    are run through the indicators and appended. Without a usable state the
+    history is rebuilt from scratch, which requires `new_df` to hold the full
+    OHLCV history.
+    """
+    if not is_usable_state(state):
+        new_df = new_df.rename(columns=str.lower)
+        full = compute_features(new_df).dropna().reset_index(drop=True)
+        return full, build_feature_state(new_df)
+
+    fresh, state = compute_features_incremental(new_df, state)
+    fresh = fresh.dropna()
+    if fresh.empty:
+        return history, state
+    return pd.concat([history, fresh], ignore_index=True), state
+
+
+# Every function whose source defines the feature values, batch and
+# incremental. A helper added to either path must be listed here.
+_DEFINITIONS = [
+    lfilter,
+    _shift,
+    _rolling_sum,
+    _rolling_std,
+    _ema,
+    _rma,
+    compute_indicators,
+    _ema_update,
+    _rma_update,
+    _push,
+    _step,
+]
+
+
+def _feature_set_version() -> str:
+    # Hash of everything that defines the feature values; stored features and
+    # states of another version are recomputed.
+    definition = "\n".join(
+        [str(STATE_VERSION), ",".join(FEATURE_COLUMNS)]
+        + [inspect.getsource(fn) for fn in _DEFINITIONS]
+    )
+    return hashlib.sha256(definition.encode()).hexdigest()[:16]
+
+
+FEATURE_SET_VERSION = _feature_set_version()
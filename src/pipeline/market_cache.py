@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import os
+import shutil
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from src.pipeline.collector import add_features
+from src.pipeline.database import DatabaseService
+from src.pipeline.dtypes import compact_frame
+from src.pipeline.indicators import FEATURE_SET_VERSION
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+MARKET_CACHE_DIR = os.getenv("MARKET_CACHE_DIR", os.path.join(".cache", "market_data"))
+
+# Bump when the file layout changes; the schema itself is part of the key.
+# volume is BIGINT but nullable in market_data, hence float64.
+CACHE_VERSION = 1
+OHLCV_SCHEMA = pa.schema(
+    [
+        ("date", pa.timestamp("ns")),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+    ]
+)
+
+
+def _schema_key() -> str:
+    definition = f"{CACHE_VERSION}\n{OHLCV_SCHEMA.to_string()}"
+    return hashlib.sha256(definition.encode()).hexdigest()[:12]
+
+
+def _read(path: str) -> Optional[pd.DataFrame]:
+    """
+    Memory-maps an Arrow IPC file. Numeric columns are views of the mapped
+    pages (read-only), so processes reading the same file share the page
+    cache instead of holding copies.
+    """
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    return table.to_pandas(split_blocks=True)
+
+
+def _metadata(path: str) -> dict[str, str]:
+    try:
+        schema = pa.ipc.open_file(pa.memory_map(path)).schema
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return {}
+    return {k.decode(): v.decode() for k, v in (schema.metadata or {}).items()}
+
+
+def _write(path: str, df: pd.DataFrame, schema: Optional[pa.Schema], metadata: dict[str, str]):
+    """Writes atomically: readers keep their mapping of the replaced file."""
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    table = table.replace_schema_metadata(metadata)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+class MarketDataCache:
+    """
+    Local columnar copy of market_data: one uncompressed Arrow IPC file per
+    ticker, read through memory maps. Tuning workers and backtests on one
+    machine read it instead of querying the database for full histories.
+
+    sync() appends the bars stored after each file's last date (see
+    DatabaseService.get_latest_dates). features() derives the feature frame
+    from the cached bars once per bar set and caches it as well.
+
+    Files live under a directory per OHLCV schema and per FEATURE_SET_VERSION,
+    so a schema or feature definition change starts from an empty cache;
+    prune() removes the directories of other versions.
+    """
+
+    def __init__(self, directory: str = MARKET_CACHE_DIR):
+        self.directory = directory
+        self.ohlcv_dir = os.path.join(directory, f"ohlcv-{_schema_key()}")
+        self.features_dir = os.path.join(directory, f"features-{FEATURE_SET_VERSION}")
+
+    def _ohlcv_path(self, ticker: str) -> str:
+        return os.path.join(self.ohlcv_dir, f"{ticker}.arrow")
+
+    def _features_path(self, ticker: str) -> str:
+        return os.path.join(self.features_dir, f"{ticker}.arrow")
+
+    def tickers(self) -> list[str]:
+        if not os.path.isdir(self.ohlcv_dir):
+            return []
+        return sorted(
+            name[: -len(".arrow")] for name in os.listdir(self.ohlcv_dir) if name.endswith(".arrow")
+        )
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        last = _metadata(self._ohlcv_path(ticker)).get("last_date")
+        return pd.Timestamp(last) if last else None
+
+    def read(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Cached OHLCV bars with a date column, like fetch_market_data without ticker."""
+        return _read(self._ohlcv_path(ticker))
+
+    def features(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        add_features of the cached bars, indexed by date and in the dtype
+        policy of compact_frame, so the mapped columns are used as they are.
+        Recomputed when the bars have been synced since the last call.
+        """
+        last_date = _metadata(self._ohlcv_path(ticker)).get("last_date")
+        if last_date is None:
+            return None
+
+        path = self._features_path(ticker)
+        if _metadata(path).get("last_date") == last_date:
+            df = _read(path)
+        else:
+            ohlcv = self.read(ticker)
+            if ohlcv is None:
+                return None
+            df = add_features(ohlcv.set_index("date"))
+            if df.empty or "log_return" not in df.columns:
+                # Too short a history for the indicators.
+                return None
+            df = compact_frame(df).reset_index()
+            _write(path, df, None, {"last_date": last_date})
+        if df is None:
+            return None
+        df.index = pd.DatetimeIndex(df.pop("date"))
+        return df
+
+    def _store(self, ticker: str, df: pd.DataFrame):
+        df = df[OHLCV_SCHEMA.names].astype({"volume": "float64"})
+        last_date = pd.Timestamp(df["date"].iloc[-1]).strftime("%Y-%m-%d")
+        _write(self._ohlcv_path(ticker), df, OHLCV_SCHEMA, {"last_date": last_date})
+
+    def sync(self, db_service: DatabaseService, tickers: Optional[list[str]] = None) -> dict[str, int]:
+        """
+        Brings the cached tickers (or `tickers`) up to the database's latest
+        dates. Missing tickers are loaded in full with bulk reads, stale ones
+        only fetch the bars after their last cached date.
+        """
+        latest = db_service.get_latest_dates(tickers)
+        stats = {"tickers": len(latest), "created": 0, "updated": 0, "rows": 0}
+
+        missing, stale = [], []
+        for ticker, latest_date in latest.items():
+            cached = self.last_date(ticker)
+            if cached is None:
+                missing.append(ticker)
+            elif cached < pd.Timestamp(latest_date):
+                stale.append((ticker, cached))
+
+        for ticker, df in db_service.iter_market_data(missing):
+            if df.empty:
+                continue
+            self._store(ticker, df)
+            stats["created"] += 1
+            stats["rows"] += len(df)
+
+        for ticker, cached in stale:
+            new_rows = db_service.fetch_market_data(ticker, after=cached)
+            if new_rows.empty:
+                continue
+            # The cached columns are read-only views; concat builds a new frame.
+            self._store(ticker, pd.concat([self.read(ticker), new_rows[OHLCV_SCHEMA.names]], ignore_index=True))
+            stats["updated"] += 1
+            stats["rows"] += len(new_rows)
+
+        logger.info(
+            f"Market data cache: {stats['created']} tickers created, {stats['updated']} updated, "
+            f"{stats['rows']} rows written."
+        )
+        return stats
+
+    def prune(self) -> list[str]:
+        """Removes cache directories of other schema or feature set versions."""
+        keep = {os.path.basename(self.ohlcv_dir), os.path.basename(self.features_dir)}
+        removed = []
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name not in keep and os.path.isdir(path) and name.startswith(("ohlcv-", "features-")):
+                    shutil.rmtree(path)
+                    removed.append(name)
+        if removed:
+            logger.info(f"Removed outdated cache directories: {', '.join(removed)}")
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the local market data cache")
+    parser.add_argument("--tickers", nargs="*", help="default: all tickers in market_data")
+    parser.add_argument("--directory", default=MARKET_CACHE_DIR)
+    parser.add_argument("--features", action="store_true", help="also precompute the feature frames")
+    args = parser.parse_args()
+
+    db_service = DatabaseService()
+    if db_service.engine is None:
+        logger.error("Database connection is required. Check DATABASE_URL.")
+        return
+
+    cache = MarketDataCache(args.directory)
+    cache.prune()
+    cache.sync(db_service, args.tickers)
+    if args.features:
+        for ticker in args.tickers or cache.tickers():
+            cache.features(ticker)
+
+
+if __name__ == "__main__":
+    main()
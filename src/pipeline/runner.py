@@ -1,33 +1,156 @@
+import numpy as np
 import pandas as pd
-from src.models.base import BaseModel
+from src.models.base import BaseModel, LagMatrix
 from src.pipeline.database import DatabaseService
+from src.pipeline.dtypes import compact_frame
 from typing import Optional, List
 from src.utils.logging_config import setup_logger
+from src.utils.profiling import stage
 from pandas.tseries.offsets import BDay
 
 logger = setup_logger(__name__)
 
 
+def prepare_ticker_frame(ticker: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    if df is None or df.empty or len(df) < 50:
+        logger.warning(f"[{ticker}] Received empty DataFrame. Skipping.")
+        return None
+
+    if "log_return" not in df.columns:
+        logger.error(f"[{ticker}] Missing 'log_return' in data. Skipping.")
+        return None
+
+    # A shallow copy: the caller's frame keeps its columns, the data is shared.
+    df_work = df.copy(deep=False)
+    if "date" in df_work.columns:
+        df_work.index = pd.DatetimeIndex(df_work.pop("date"))
+    else:
+        df_work.index = pd.to_datetime(df_work.index)
+    return compact_frame(df_work)
+
+
+def build_prediction_record(
+    ticker: str, model: BaseModel, pred_date: pd.Timestamp, pred_output: dict
+) -> dict:
+    pred_record = {
+        "ticker": ticker,
+        "model": model.name,
+        "prediction_date": pred_date.strftime("%Y-%m-%d"),
+        "target_date": (pred_date + BDay(1)).strftime("%Y-%m-%d"),
+    }
+
+    if model.model_type == "classification":
+        pred_record["predicted_class"] = int(pred_output["prediction"])
+        pred_record["probability"] = float(pred_output["probability"])
+    else:
+        pred_record["predicted_return"] = float(pred_output["prediction"])
+
+    return pred_record
+
+
+def predict_ticker(
+    ticker: str, df_work: pd.DataFrame, models: List[BaseModel]
+) -> List[tuple[str, dict]]:
+    """
+    Trains every model on the prepared frame and returns (model_type, record) pairs.
+    Does not touch the database, so it can run in a worker process.
+    The lagged design matrix is built once here and shared by all models.
+    """
+    pred_date = df_work.index[-1]
+    lag_matrix = LagMatrix(df_work)
+
+    records = []
+    for model in models:
+        try:
+            logger.info(f"[{ticker}] Predicting with {model.name}...")
+            with stage("train_predict", model=model.name):
+                pred_output = model.train_predict_next(
+                    df_work, ticker=ticker, lag_matrix=lag_matrix
+                )
+            records.append(
+                (
+                    model.model_type,
+                    build_prediction_record(ticker, model, pred_date, pred_output),
+                )
+            )
+
+        except Exception as e:
+            logger.error(f"Error processing {ticker} with {model.name}: {e}")
+
+    return records
+
+
+def build_evaluations(
+    pending: pd.DataFrame,
+    model_type: str,
+    thresholds: dict[str, float],
+    default_threshold: float = 0.005,
+) -> pd.DataFrame:
+    """
+    Evaluation rows for DatabaseService.fetch_pending_evaluations output,
+    computed column-wise. `thresholds` maps model names to their
+    classification threshold.
+    """
+    pending = pending[pending["prev_close"].notna()]
+    actual_return = np.log(pending["close"] / pending["prev_close"])
+
+    res = pd.DataFrame(
+        {
+            "prediction_id": pending["prediction_id"].astype(int),
+            "ticker": pending["ticker"],
+            "model": pending["model"],
+            "evaluation_date": pd.to_datetime(pending["date"]).dt.date,
+            "actual_return": actual_return,
+        }
+    )
+
+    if model_type == "classification":
+        threshold = pending["model"].map(thresholds).fillna(default_threshold)
+        actual_class = (actual_return > threshold).astype(int)
+        predicted_class = pending["predicted_value"].astype(int)
+        res["predicted_class"] = predicted_class
+        res["actual_class"] = actual_class
+        res["correct"] = predicted_class == actual_class
+    else:
+        error = pending["predicted_value"].astype(float) - actual_return
+        res["predicted_return"] = pending["predicted_value"].astype(float)
+        res["error"] = error
+        res["abs_error"] = error.abs()
+        res["squared_error"] = error**2
+
+    return res.reset_index(drop=True)
+
+
 class TradingPipeline:
-    def __init__(self, db_service: DatabaseService):
+    def __init__(self, db_service: DatabaseService, writer=None):
         self.db_service = db_service
+        # Anything with DatabaseService's save_* methods, e.g. a BatchWriter.
+        self.writer = writer if writer is not None else db_service
 
     def process_ticker(self, ticker: str, df: pd.DataFrame, models: List[BaseModel]):
-        if df is None or df.empty or len(df) < 50:
-            logger.warning(f"[{ticker}] Received empty DataFrame. Skipping.")
-            return
-
-        if "log_return" not in df.columns:
-            logger.error(f"[{ticker}] Missing 'log_return' in data. Skipping.")
+        df_work = prepare_ticker_frame(ticker, df)
+        if df_work is None:
             return
 
         # 1. Update Market Data
-        df_work = df.copy()
-        if "date" in df_work.columns:
-            df_work.set_index("date", inplace=True)
+        self.update_market_data(ticker, df_work)
 
-        df_work.index = pd.to_datetime(df_work.index)
+        # 2. Run Models (previous predictions are evaluated by evaluate_pending)
+        self.save_predictions(predict_ticker(ticker, df_work, models))
 
+    def process_pooled(self, frames: dict[str, pd.DataFrame], models: List[BaseModel]):
+        """
+        Pooled mode: `frames` are prepared per-ticker frames (see
+        prepare_ticker_frame), each PooledClassificationModel is fitted once
+        across all of them. Previous pooled predictions are evaluated by
+        evaluate_pending like those of any other model.
+        """
+        from src.models.pooled import predict_pooled
+
+        for model in models:
+            self.save_predictions(predict_pooled(model, frames))  # type: ignore[arg-type]
+
+    def update_market_data(self, ticker: str, df_work: pd.DataFrame):
         latest_db_date = self.db_service.get_latest_date(ticker)
         if latest_db_date:
             new_market_data = df_work[df_work.index > pd.to_datetime(latest_db_date)]
@@ -35,97 +158,37 @@ class TradingPipeline:
             new_market_data = df_work
 
         if not new_market_data.empty:
-            self.db_service.save_market_data(new_market_data, ticker)
+            self.writer.save_market_data(new_market_data, ticker)
 
-        # 2. Run Models
-        for model in models:
-            try:
-                today_date_str = df_work.index[-1].strftime("%Y-%m-%d")
-                eval_res = self.evaluate_prediction(
-                    ticker, df_work, model, today_date_str
-                )
-                if eval_res:
-                    self.db_service.save_evaluation(eval_res, model.model_type)
-
-                # NEW PREDICTION:
-                logger.info(f"[{ticker}] Predicting with {model.name}...")
-                pred_output = model.train_predict_next(df_work)
-
-                pred_date = df_work.index[-1]
-                target_date = (pred_date + BDay(1)).strftime("%Y-%m-%d")
-                pred_date_str = pred_date.strftime("%Y-%m-%d")
-
-                pred_record = {
-                    "ticker": ticker,
-                    "model": model.name,
-                    "prediction_date": pred_date_str,
-                    "target_date": target_date,
-                }
-
-                if model.model_type == "classification":
-                    pred_record["predicted_class"] = int(pred_output["prediction"])
-                    pred_record["probability"] = float(pred_output["probability"])
-                else:
-                    pred_record["predicted_return"] = float(pred_output["prediction"])
-
-                self.db_service.save_prediction(pred_record, model.model_type)
-
-            except Exception as e:
-                logger.error(f"Error processing {ticker} with {model.name}: {e}")
-
-    def evaluate_prediction(
-        self,
-        ticker: str,
-        df_actual: pd.DataFrame,
-        model: BaseModel,
-        target_date_str: str,
-    ) -> Optional[dict]:
+    def evaluate_pending(self, models: List[BaseModel]) -> int:
+        """
+        Set-based evaluation of all tickers: one query per model type joins
+        unevaluated predictions with market_data on their target date, so
+        targets missed on earlier runs are caught up as well. Run it after
+        the day's market data is saved. Returns the number of evaluations.
         """
-        Looks for a prediction targeting 'target_date_str' and compares it with actual data.
+        thresholds = {m.name: m.classification_threshold for m in models}
+        evaluated = 0
+        for model_type in ("classification", "regression"):
+            pending = self.db_service.fetch_pending_evaluations(model_type)
+            if pending.empty:
+                continue
+            evaluations = build_evaluations(pending, model_type, thresholds)
+            self.writer.save_evaluations(evaluations, model_type)
+            evaluated += len(evaluations)
+            logger.info(f"Evaluated {len(evaluations)} pending {model_type} predictions.")
+        return evaluated
+
+    def refresh_aggregates(self) -> int:
         """
-        prev_pred = self.db_service.get_prediction_for_evaluation(
-            ticker, model.name, target_date_str, model.model_type
+        Folds new evaluations into the dashboard aggregates. Evaluations
+        buffered in a BatchWriter must be flushed first.
+        """
+        return sum(
+            self.db_service.refresh_evaluation_aggregates(model_type)
+            for model_type in ("classification", "regression")
         )
-        if not prev_pred:
-            return None
-
-        prediction_id = prev_pred["id"]
-        predicted_val = prev_pred["predicted_value"]
-
-        target_ts = pd.to_datetime(target_date_str)
-        if target_ts not in df_actual.index:
-            return None
-
-        actual_log_return = float(df_actual.loc[target_ts, "log_return"])  # type: ignore
-
-        res = {
-            "prediction_id": int(prediction_id),
-            "ticker": ticker,
-            "model": model.name,
-            "evaluation_date": target_date_str,
-            "actual_return": actual_log_return,
-        }
-
-        if model.model_type == "classification":
-            actual_class = (
-                1 if actual_log_return > model.classification_threshold else 0
-            )  # type: ignore
-            res.update(
-                {
-                    "predicted_class": int(predicted_val),
-                    "actual_class": int(actual_class),
-                    "correct": bool(int(predicted_val) == actual_class),
-                }
-            )
-        else:
-            error = predicted_val - actual_log_return
-            res.update(
-                {
-                    "predicted_return": float(predicted_val),
-                    "error": float(error),
-                    "abs_error": float(abs(error)),
-                    "squared_error": float(error**2),
-                }
-            )
 
-        return res
+    def save_predictions(self, records: List[tuple[str, dict]]):
+        for model_type, record in records:
+            self.writer.save_prediction(record, model_type)
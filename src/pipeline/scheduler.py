@@ -0,0 +1,388 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait,
+)
+from contextlib import nullcontext
+from typing import List, Optional
+
+import pandas as pd
+
+from src.models.base import BaseModel
+from src.models.pooled import PooledClassificationModel, predict_pooled
+from src.pipeline.collector import add_features, combine_market_data
+from src.pipeline.data_sources import DataSource, LiveDataSource
+from src.pipeline.feature_store import FeatureStore, update_features
+from src.pipeline.runner import TradingPipeline, predict_ticker, prepare_ticker_frame
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import EventLog, StageTimings, collect, peak_memory, profile, stage
+
+logger = setup_logger(__name__)
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted work in the calling thread (cpu_workers=0)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _pop_registry_stats(models: List[BaseModel]) -> dict[str, int]:
+    counters: dict[str, int] = {}
+    registries = {id(r): r for m in models if (r := getattr(m, "registry", None))}
+    for registry in registries.values():
+        for stat, value in registry.pop_stats().items():
+            counters[f"registry_{stat}"] = counters.get(f"registry_{stat}", 0) + value
+    return counters
+
+
+def compute_ticker(
+    ticker: str,
+    ohlcv: pd.DataFrame,
+    models: List[BaseModel],
+    stored: Optional[pd.DataFrame] = None,
+    state: Optional[dict] = None,
+    profile_dir: Optional[str] = None,
+    profiler: str = "cprofile",
+) -> dict:
+    """
+    CPU-bound part of a ticker run: feature engineering and model fits.
+    Module level so it can be shipped to a process pool.
+
+    With `stored` (feature store enabled) features are extended incrementally
+    and the rows to persist are returned alongside the new indicator state.
+    Stage timings come back as events; with `profile_dir` the whole call is
+    profiled into that directory.
+    """
+    log = EventLog()
+    profiling = profile(ticker, profile_dir, profiler) if profile_dir else nullcontext()
+    with collect(log), profiling:
+        result = _compute_ticker(ticker, ohlcv, models, stored, state)
+    result["timings"] = log.events
+    return result
+
+
+def _compute_ticker(
+    ticker: str,
+    ohlcv: pd.DataFrame,
+    models: List[BaseModel],
+    stored: Optional[pd.DataFrame],
+    state: Optional[dict],
+) -> dict:
+    result: dict = {
+        "df_work": None,
+        "records": [],
+        "new_features": (pd.DataFrame(), None),
+        "counters": {},
+    }
+
+    with stage("features"):
+        if stored is None:
+            features_df = add_features(ohlcv)
+        else:
+            features_df, new_rows, state = update_features(ohlcv, stored, state)
+            result["new_features"] = (new_rows, state)
+
+    if features_df.empty:
+        logger.warning(f"[{ticker}] No valid data after feature engineering. Skipping.")
+        return result
+
+    df_work = prepare_ticker_frame(ticker, features_df)
+    if df_work is None:
+        return result
+
+    with stage("predict"):
+        result["records"] = predict_ticker(ticker, df_work, models)
+
+    result["df_work"] = df_work
+    result["counters"] = _pop_registry_stats(models)
+    return result
+
+
+class PipelineScheduler:
+    """
+    Runs tickers concurrently: network fetches and DB reads/writes on a thread
+    pool, feature engineering and model fits on a process pool.
+    """
+
+    def __init__(
+        self,
+        pipeline: TradingPipeline,
+        models: List[BaseModel],
+        io_workers: int = 8,
+        cpu_workers: Optional[int] = None,
+        bulk_chunk_size: int = 50,
+        feature_store: Optional[FeatureStore] = None,
+        data_source: Optional[DataSource] = None,
+        fetch_period: str = "7d",
+        backfill_period: str = "max",
+        profile_tickers: Optional[set[str]] = None,
+        profile_dir: str = ".profiles",
+        profiler: str = "cprofile",
+    ):
+        self.pipeline = pipeline
+        self.db_service = pipeline.db_service
+        self.models = models
+        self.ticker_models = [
+            m for m in models if not isinstance(m, PooledClassificationModel)
+        ]
+        self.pooled_models = [
+            m for m in models if isinstance(m, PooledClassificationModel)
+        ]
+        # Per-ticker frames kept for the pooled fit after the ticker phase.
+        self._pooled_frames: dict[str, pd.DataFrame] = {}
+        self.io_workers = max(1, io_workers)
+        self.cpu_workers = (
+            multiprocessing.cpu_count() if cpu_workers is None else cpu_workers
+        )
+        self.bulk_chunk_size = max(1, bulk_chunk_size)
+        self.feature_store = feature_store
+        self.data_source = data_source if data_source is not None else LiveDataSource()
+        # Tickers without stored history fetch `backfill_period` instead.
+        self.fetch_period = fetch_period
+        self.backfill_period = backfill_period
+        # Tickers whose compute_ticker call is profiled into profile_dir.
+        self.profile_tickers = profile_tickers or set()
+        self.profile_dir = profile_dir
+        self.profiler = profiler
+        self.timings = StageTimings()
+        self.counters: dict[str, int] = {}
+        self._counters_lock = threading.Lock()
+
+    def _make_cpu_executor(self) -> Executor:
+        if self.cpu_workers <= 0:
+            return _InlineExecutor()
+        # spawn: forking while the I/O threads hold locks is not safe
+        return ProcessPoolExecutor(
+            max_workers=self.cpu_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _run_ticker(
+        self,
+        ticker: str,
+        db_df: pd.DataFrame,
+        stored: tuple[Optional[pd.DataFrame], Optional[dict]],
+        cpu_executor: Executor,
+    ) -> bool:
+        logger.info(f"Processing ticker: {ticker}")
+        stored_df, state = stored
+        has_history = state is not None or not db_df.empty
+        with self.timings.track("fetch", ticker=ticker):
+            new_df = self.data_source.fetch(
+                ticker, self.fetch_period if has_history else self.backfill_period
+            )
+        if new_df is None or new_df.empty:
+            logger.warning(f"[{ticker}] No data fetched. Skipping.")
+            return False
+        self._count({"rows_fetched": len(new_df)})
+
+        if state is not None:
+            # Stored features are extended from the fetched bars alone.
+            ohlcv = new_df
+        else:
+            ohlcv = combine_market_data(db_df, new_df)
+
+        profile_dir = self.profile_dir if ticker in self.profile_tickers else None
+        with self.timings.track("cpu_wait", ticker=ticker):
+            result = cpu_executor.submit(
+                compute_ticker,
+                ticker,
+                ohlcv,
+                self.ticker_models,
+                stored_df,
+                state,
+                profile_dir,
+                self.profiler,
+            ).result()
+        self.timings.merge(result["timings"], ticker=ticker)
+        self._count(result["counters"])
+        df_work, records = result["df_work"], result["records"]
+
+        with self.timings.track("db_write", ticker=ticker):
+            if self.feature_store is not None:
+                self.feature_store.save(ticker, *result["new_features"])
+
+        if df_work is None:
+            return False
+
+        with self.timings.track("db_write", ticker=ticker):
+            self.pipeline.update_market_data(ticker, df_work)
+        with self.timings.track("db_write", ticker=ticker):
+            self.pipeline.save_predictions(records)
+
+        if self.pooled_models:
+            columns = {"log_return"}
+            for model in self.pooled_models:
+                columns.update(c for c in model.features if c in df_work.columns)
+            with self._counters_lock:
+                self._pooled_frames[ticker] = df_work[sorted(columns)]
+
+        return True
+
+    def _run_pooled(self, cpu_executor: Executor):
+        frames, self._pooled_frames = self._pooled_frames, {}
+        if not frames:
+            return
+
+        with self.timings.track("pooled_predict"):
+            futures = {
+                cpu_executor.submit(predict_pooled, model, frames): model
+                for model in self.pooled_models
+            }
+            for future, model in futures.items():
+                try:
+                    records = future.result()
+                except Exception as e:
+                    logger.error(f"Pooled {model.name} failed: {e}")
+                    continue
+                with self.timings.track("db_write"):
+                    self.pipeline.save_predictions(records)
+
+    def _run_evaluations(self):
+        # Evaluations join market_data, so buffered bars must be written first.
+        flush = getattr(self.pipeline.writer, "flush", None)
+        if flush is not None:
+            with self.timings.track("db_write"):
+                flush("market_data")
+
+        with self.timings.track("evaluate"):
+            evaluated = self.pipeline.evaluate_pending(self.models)
+
+        # The dashboard aggregates are folded in from the written evaluations.
+        if flush is not None:
+            with self.timings.track("db_write"):
+                flush()
+        with self.timings.track("aggregate"):
+            aggregated = self.pipeline.refresh_aggregates()
+        self._count({"evaluations": evaluated, "aggregated_evaluations": aggregated})
+
+    def _count(self, counters: dict[str, int]):
+        with self._counters_lock:
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def _load_chunk(
+        self, chunk: List[str]
+    ) -> tuple[dict[str, pd.DataFrame], dict[str, tuple]]:
+        stored: dict[str, tuple] = {}
+        if self.feature_store is not None:
+            stored = self.feature_store.load_many(chunk, chunk_size=len(chunk))
+
+        # Full OHLCV history is only needed where features must be rebuilt.
+        need_history = [t for t in chunk if stored.get(t, (None, None))[1] is None]
+        history = {}
+        if need_history:
+            history = dict(
+                self.db_service.iter_market_data(need_history, chunk_size=len(chunk))
+            )
+        self._count(
+            {
+                "rows_loaded": sum(len(df) for df in history.values())
+                + sum(len(entry[0]) for entry in stored.values() if entry[0] is not None)
+            }
+        )
+        return history, stored
+
+    def run(self, tickers: List[str]) -> dict:
+        start = time.perf_counter()
+        processed, skipped, failed = 0, 0, 0
+
+        with self._make_cpu_executor() as cpu_executor:
+            with ThreadPoolExecutor(max_workers=self.io_workers) as io_executor:
+                futures: dict[Future, str] = {}
+                pending: set[Future] = set()
+
+                def collect(done):
+                    nonlocal processed, skipped, failed
+                    for future in done:
+                        ticker = futures.pop(future)
+                        try:
+                            if future.result():
+                                processed += 1
+                            else:
+                                skipped += 1
+                        except Exception as e:
+                            failed += 1
+                            logger.error(f"[{ticker}] Ticker run failed: {e}")
+
+                for i in range(0, len(tickers), self.bulk_chunk_size):
+                    chunk = tickers[i : i + self.bulk_chunk_size]
+
+                    # Keep at most two chunks of history in memory.
+                    while len(pending) > self.bulk_chunk_size:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+
+                    with self.timings.track("db_read"):
+                        history, stored = self._load_chunk(chunk)
+
+                    for ticker in chunk:
+                        db_df = history.pop(ticker, pd.DataFrame())
+                        if self.feature_store is not None:
+                            entry = stored.pop(ticker, (pd.DataFrame(), None))
+                        else:
+                            entry = (None, None)
+                        future = io_executor.submit(
+                            self._run_ticker, ticker, db_df, entry, cpu_executor
+                        )
+                        futures[future] = ticker
+                        pending.add(future)
+
+                done, _ = wait(pending)
+                collect(done)
+
+            self._run_pooled(cpu_executor)
+
+        self._run_evaluations()
+
+        summary = {
+            "tickers": len(tickers),
+            "processed": processed,
+            "skipped": skipped,
+            "failed": failed,
+            "wall_s": round(time.perf_counter() - start, 3),
+            "io_workers": self.io_workers,
+            "cpu_workers": self.cpu_workers,
+            "stages": self.timings.summary(),
+            "models": self.timings.breakdown("model"),
+            # fetch, cpu_wait and db_write add up to a ticker's time in the run.
+            "slowest_tickers": self.timings.slowest(
+                "ticker", stages=("fetch", "cpu_wait", "db_write")
+            ),
+            "counters": dict(self.counters),
+            "peak_memory_bytes": peak_memory(),
+        }
+
+        logger.info(
+            f"Run finished in {summary['wall_s']}s: {processed} processed, "
+            f"{skipped} skipped, {failed} failed."
+        )
+        for stage, stats in summary["stages"].items():
+            logger.info(
+                f"Stage {stage}: total={stats['total_s']}s count={stats['count']} "
+                f"mean={stats['mean_s']}s max={stats['max_s']}s"
+            )
+        for model, stages in summary["models"].items():
+            logger.info(
+                f"Model {model}: "
+                + " ".join(f"{stage}={seconds}s" for stage, seconds in stages.items())
+            )
+        for name, value in summary["counters"].items():
+            logger.info(f"Counter {name}: {value}")
+        logger.info(
+            f"Peak RSS: {summary['peak_memory_bytes']['self'] / 2**20:.0f} MiB, "
+            f"workers {summary['peak_memory_bytes']['children'] / 2**20:.0f} MiB."
+        )
+        return summary
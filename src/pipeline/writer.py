@@ -0,0 +1,190 @@
+import threading
+from io import StringIO
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import Date
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.pipeline.database import DatabaseService
+from src.pipeline.indicators import FEATURE_COLUMNS
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+MARKET_DATA_COLUMNS = ["date", "ticker", "open", "high", "low", "close", "volume"]
+
+CONFLICT_COLUMNS = {
+    "market_data": ["date", "ticker"],
+    "market_features": ["ticker", "feature_set_version", "date"],
+    "predictions_classification": ["ticker", "model", "prediction_date"],
+    "predictions_regression": ["ticker", "model", "prediction_date"],
+    "evaluations_classification": ["prediction_id"],
+    "evaluations_regression": ["prediction_id"],
+    "backtest_results": ["run", "ticker", "model", "date"],
+    "backtest_summary": ["run", "ticker", "model"],
+}
+
+# Evaluations reference predictions, so tables are flushed in this order.
+FLUSH_ORDER = list(CONFLICT_COLUMNS)
+
+
+class BatchWriter:
+    """
+    Write-behind buffer for market data, predictions and evaluations.
+
+    Exposes the same save_* methods as DatabaseService, so it can be handed to
+    TradingPipeline in its place. Rows are collected across tickers and models
+    and flushed per table once `flush_size` rows are pending: on Postgres via
+    COPY into a temporary staging table followed by
+    INSERT ... ON CONFLICT DO NOTHING. Call flush() at the end of the run.
+    """
+
+    def __init__(self, db_service: DatabaseService, flush_size: int = 5000):
+        self.db_service = db_service
+        self.flush_size = max(1, flush_size)
+        self._lock = threading.Lock()
+        self._buffers: dict[str, list[pd.DataFrame]] = {}
+        self._pending: dict[str, int] = {}
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def save_market_data(self, df: pd.DataFrame, ticker: str):
+        if df.empty:
+            return
+
+        df_to_save = df.reset_index() if "date" not in df.columns else df
+        df_to_save = df_to_save[["date", "open", "high", "low", "close", "volume"]]
+        df_to_save = df_to_save.assign(ticker=ticker)[MARKET_DATA_COLUMNS]
+        self._add("market_data", df_to_save)
+
+    def save_features(self, df: pd.DataFrame, ticker: str, version: str):
+        if df.empty:
+            return
+
+        columns = ["date"] + [c for c in FEATURE_COLUMNS if c in df.columns]
+        df_to_save = df[columns].assign(ticker=ticker, feature_set_version=version)
+        self._add("market_features", df_to_save)
+
+    def save_prediction(self, record: dict, model_type: str):
+        self._add(f"predictions_{model_type}", pd.DataFrame([record]))
+
+    def save_evaluation(self, record: dict, model_type: str):
+        self._add(f"evaluations_{model_type}", pd.DataFrame([record]))
+
+    def save_evaluations(self, df: pd.DataFrame, model_type: str):
+        if not df.empty:
+            self._add(f"evaluations_{model_type}", df)
+
+    def save_backtest(self, results: pd.DataFrame, summary: dict, ticker: str, run: str):
+        model = summary["model"]
+        self._add(
+            "backtest_results", results.assign(run=run, ticker=ticker, model=model)
+        )
+        self._add("backtest_summary", pd.DataFrame([{"run": run, "ticker": ticker, **summary}]))
+
+    def _add(self, table_name: str, df: pd.DataFrame):
+        with self._lock:
+            self._buffers.setdefault(table_name, []).append(df)
+            self._pending[table_name] = self._pending.get(table_name, 0) + len(df)
+            if self._pending[table_name] < self.flush_size:
+                return
+            frames = self._take(table_name)
+
+        self._write(table_name, frames)
+
+    def _take(self, table_name: str) -> list[pd.DataFrame]:
+        self._pending[table_name] = 0
+        return self._buffers.pop(table_name, [])
+
+    def flush(self, table_name: Optional[str] = None):
+        tables = [table_name] if table_name else FLUSH_ORDER
+        for name in tables:
+            with self._lock:
+                frames = self._take(name)
+            if frames:
+                self._write(name, frames)
+
+    def _record_stats(self, table_name: str, written: int, skipped: int, failed: int):
+        with self._lock:
+            stats = self.stats.setdefault(
+                table_name, {"written": 0, "skipped": 0, "failed": 0}
+            )
+            stats["written"] += written
+            stats["skipped"] += skipped
+            stats["failed"] += failed
+
+    def _write(self, table_name: str, frames: list[pd.DataFrame]):
+        engine = self.db_service.engine
+        if engine is None or self.db_service.metadata is None:
+            return
+
+        df = pd.concat(frames, ignore_index=True)
+        if "volume" in df.columns:
+            df["volume"] = df["volume"].round().astype("Int64")
+
+        try:
+            if engine.dialect.name == "postgresql":
+                written = self._copy_insert(table_name, df)
+            else:
+                written = self._executemany_insert(table_name, df)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(df)} rows into {table_name}: {e}")
+            self._record_stats(table_name, 0, 0, len(df))
+            return
+
+        self._record_stats(table_name, written, len(df) - written, 0)
+        logger.debug(
+            f"Flushed {len(df)} rows into {table_name}: {written} written, "
+            f"{len(df) - written} skipped."
+        )
+
+    def _copy_insert(self, table_name: str, df: pd.DataFrame) -> int:
+        columns = ", ".join(df.columns)
+        conflict = ", ".join(CONFLICT_COLUMNS[table_name])
+        staging = f"staging_{table_name}"
+
+        buffer = StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        with self.db_service.engine.begin() as conn:  # type: ignore[union-attr]
+            raw = conn.connection.driver_connection
+            with raw.cursor() as cursor:  # type: ignore[union-attr]
+                # Staging table without defaults, so no sequence values are burned.
+                cursor.execute(
+                    f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                    f"SELECT {columns} FROM {table_name} WITH NO DATA"
+                )
+                cursor.copy_expert(
+                    f"COPY {staging} ({columns}) FROM STDIN WITH CSV", buffer
+                )
+                cursor.execute(
+                    f"INSERT INTO {table_name} ({columns}) "
+                    f"SELECT {columns} FROM {staging} "
+                    f"ON CONFLICT ({conflict}) DO NOTHING"
+                )
+                return cursor.rowcount
+
+    def _executemany_insert(self, table_name: str, df: pd.DataFrame) -> int:
+        table = self.db_service.table(table_name)
+        dialect = self.db_service.engine.dialect.name  # type: ignore[union-attr]
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+
+        df = df.copy()
+        for column in table.columns:
+            if column.name in df.columns and isinstance(column.type, Date):
+                df[column.name] = pd.to_datetime(df[column.name]).dt.date
+        records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+        stmt = insert(table).on_conflict_do_nothing(
+            index_elements=CONFLICT_COLUMNS[table_name]
+        )
+        written = 0
+        with self.db_service.engine.begin() as conn:  # type: ignore[union-attr]
+            for record in records:
+                written += conn.execute(stmt, record).rowcount
+        return written
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {table: dict(stats) for table, stats in self.stats.items()}
@@ -7,116 +7,248 @@ load_dotenv()
 logger = setup_logger(__name__)
 
 
+TABLES = [
+    # Market Data
+    """
+    CREATE TABLE IF NOT EXISTS market_data (
+        date DATE NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        open DOUBLE PRECISION,
+        high DOUBLE PRECISION,
+        low DOUBLE PRECISION,
+        close DOUBLE PRECISION,
+        volume BIGINT,
+        created_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (date, ticker)
+    );  
+    """,
+    # Predictions Classification
+    """
+    CREATE TABLE IF NOT EXISTS predictions_classification (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        prediction_date DATE NOT NULL,
+        target_date DATE NOT NULL,
+        predicted_class INT NOT NULL,
+        probability FLOAT,
+        created_at TIMESTAMP DEFAULT NOW(),
+        UNIQUE(ticker, model, prediction_date)
+    );
+    """,
+    # Predictions Regression
+    """
+    CREATE TABLE IF NOT EXISTS predictions_regression (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        prediction_date DATE NOT NULL,
+        target_date DATE NOT NULL,
+        predicted_return FLOAT NOT NULL,
+        created_at TIMESTAMP DEFAULT NOW(),
+        UNIQUE(ticker, model, prediction_date)
+    );
+    """,
+    # Evaluations Classification
+    """
+    CREATE TABLE IF NOT EXISTS evaluations_classification (
+        id SERIAL PRIMARY KEY,
+        prediction_id INT NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        evaluation_date DATE NOT NULL,
+        predicted_class INT NOT NULL,
+        actual_class INT NOT NULL,
+        correct BOOLEAN NOT NULL,
+        actual_return FLOAT NOT NULL,
+        created_at TIMESTAMP DEFAULT NOW(),
+        FOREIGN KEY (prediction_id) REFERENCES predictions_classification(id) ON DELETE CASCADE,
+        UNIQUE(prediction_id)
+    );
+    """,
+    # Evaluations Regression
+    """
+    CREATE TABLE IF NOT EXISTS evaluations_regression (
+        id SERIAL PRIMARY KEY,
+        prediction_id INT NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        evaluation_date DATE NOT NULL,
+        predicted_return FLOAT NOT NULL,
+        actual_return FLOAT NOT NULL,
+        error FLOAT NOT NULL,
+        abs_error FLOAT NOT NULL,
+        squared_error FLOAT NOT NULL,
+        created_at TIMESTAMP DEFAULT NOW(),
+        FOREIGN KEY (prediction_id) REFERENCES predictions_regression(id) ON DELETE CASCADE,
+        UNIQUE(prediction_id)
+    );
+    """,
+    # Feature store, one row per bar and feature set version
+    """
+    CREATE TABLE IF NOT EXISTS market_features (
+        ticker VARCHAR(10) NOT NULL,
+        date DATE NOT NULL,
+        feature_set_version VARCHAR(16) NOT NULL,
+        log_return DOUBLE PRECISION,
+        volumne_rolling_mean_20 DOUBLE PRECISION,
+        rsi_14 DOUBLE PRECISION,
+        roc_10 DOUBLE PRECISION,
+        atr_14 DOUBLE PRECISION,
+        mfi_14 DOUBLE PRECISION,
+        macd_hist DOUBLE PRECISION,
+        bb_percent DOUBLE PRECISION,
+        dist_ema_200 DOUBLE PRECISION,
+        created_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (ticker, feature_set_version, date)
+    );
+    """,
+    # Incremental indicator state per ticker
+    """
+    CREATE TABLE IF NOT EXISTS feature_state (
+        ticker VARCHAR(10) PRIMARY KEY,
+        last_date DATE NOT NULL,
+        version INT NOT NULL,
+        state JSONB NOT NULL,
+        updated_at TIMESTAMP DEFAULT NOW()
+    );
+    """,
+    # Walk-forward backtests, one row per bar, see src/pipeline/backtest.py
+    """
+    CREATE TABLE IF NOT EXISTS backtest_results (
+        run VARCHAR(50) NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        date DATE NOT NULL,
+        prediction INT NOT NULL,
+        probability FLOAT,
+        actual_label INT NOT NULL,
+        actual_return FLOAT NOT NULL,
+        pnl FLOAT NOT NULL,
+        created_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (run, ticker, model, date)
+    );
+    """,
+    # Backtest metrics per ticker and model
+    """
+    CREATE TABLE IF NOT EXISTS backtest_summary (
+        run VARCHAR(50) NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        accuracy FLOAT,
+        f1_score FLOAT,
+        cum_return FLOAT,
+        sharpe FLOAT,
+        max_drawdown FLOAT,
+        win_rate FLOAT,
+        total_trades INT,
+        total_bars INT,
+        created_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (run, ticker, model)
+    );
+    """,
+    # Dashboard aggregates, folded in from new evaluations after each run
+    """
+    CREATE TABLE IF NOT EXISTS evaluation_daily_classification (
+        model VARCHAR(50) NOT NULL,
+        evaluation_date DATE NOT NULL,
+        n INT NOT NULL,
+        wins INT NOT NULL,
+        sum_actual_return DOUBLE PRECISION NOT NULL,
+        last_id BIGINT NOT NULL,
+        PRIMARY KEY (model, evaluation_date)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS evaluation_ticker_classification (
+        model VARCHAR(50) NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        n INT NOT NULL,
+        wins INT NOT NULL,
+        sum_actual_return DOUBLE PRECISION NOT NULL,
+        first_date DATE NOT NULL,
+        last_date DATE NOT NULL,
+        last_id BIGINT NOT NULL,
+        PRIMARY KEY (model, ticker)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS evaluation_daily_regression (
+        model VARCHAR(50) NOT NULL,
+        evaluation_date DATE NOT NULL,
+        n INT NOT NULL,
+        sum_error DOUBLE PRECISION NOT NULL,
+        sum_abs_error DOUBLE PRECISION NOT NULL,
+        sum_squared_error DOUBLE PRECISION NOT NULL,
+        sum_actual_return DOUBLE PRECISION NOT NULL,
+        last_id BIGINT NOT NULL,
+        PRIMARY KEY (model, evaluation_date)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS evaluation_ticker_regression (
+        model VARCHAR(50) NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        n INT NOT NULL,
+        sum_error DOUBLE PRECISION NOT NULL,
+        sum_abs_error DOUBLE PRECISION NOT NULL,
+        sum_squared_error DOUBLE PRECISION NOT NULL,
+        sum_actual_return DOUBLE PRECISION NOT NULL,
+        first_date DATE NOT NULL,
+        last_date DATE NOT NULL,
+        last_id BIGINT NOT NULL,
+        PRIMARY KEY (model, ticker)
+    );
+    """,
+    # Last evaluation id folded into the aggregates, per evaluations table
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_watermarks (
+        name VARCHAR(64) PRIMARY KEY,
+        last_id BIGINT NOT NULL,
+        updated_at TIMESTAMP DEFAULT NOW()
+    );
+    """,
+]
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS idx_market_data_ticker_date ON market_data(ticker, date);",
+    "CREATE INDEX IF NOT EXISTS idx_pred_class_ticker_model ON predictions_classification(ticker, model, prediction_date);",
+    "CREATE INDEX IF NOT EXISTS idx_pred_reg_ticker_model ON predictions_regression(ticker, model, prediction_date);",
+    "CREATE INDEX IF NOT EXISTS idx_eval_class_ticker_model ON evaluations_classification(ticker, model, evaluation_date);",
+    "CREATE INDEX IF NOT EXISTS idx_eval_reg_ticker_model ON evaluations_regression(ticker, model, evaluation_date);",
+    # New indexes for target_date performance
+    "CREATE INDEX IF NOT EXISTS idx_pred_class_target_date ON predictions_classification(ticker, model, target_date);",
+    "CREATE INDEX IF NOT EXISTS idx_pred_reg_target_date ON predictions_regression(ticker, model, target_date);",
+]
+
+
+def for_dialect(ddl: str, dialect: str) -> str:
+    """The Postgres DDL above as SQLite accepts it (replays, tests, benchmarks)."""
+    if dialect != "sqlite":
+        return ddl
+    return (
+        ddl.replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY")
+        .replace("JSONB", "TEXT")
+        .replace("NOW()", "CURRENT_TIMESTAMP")
+    )
+
+
 def initialize_database():
     db_url = os.getenv("DATABASE_URL")
     if not db_url:
         logger.error("DATABASE_URL not found in environment.")
         return
-    engine = create_engine(
-        db_url,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
-    )
-
-    tables = [
-        # Market Data
-        """
-        CREATE TABLE IF NOT EXISTS market_data (
-            date DATE NOT NULL,
-            ticker VARCHAR(10) NOT NULL,
-            open DOUBLE PRECISION,
-            high DOUBLE PRECISION,
-            low DOUBLE PRECISION,
-            close DOUBLE PRECISION,
-            volume BIGINT,
-            created_at TIMESTAMP DEFAULT NOW(),
-            PRIMARY KEY (date, ticker)
-        );  
-        """,
-        # Predictions Classification
-        """
-        CREATE TABLE IF NOT EXISTS predictions_classification (
-            id SERIAL PRIMARY KEY,
-            ticker VARCHAR(10) NOT NULL,
-            model VARCHAR(50) NOT NULL,
-            prediction_date DATE NOT NULL,
-            target_date DATE NOT NULL,
-            predicted_class INT NOT NULL,
-            probability FLOAT,
-            created_at TIMESTAMP DEFAULT NOW(),
-            UNIQUE(ticker, model, prediction_date)
-        );
-        """,
-        # Predictions Regression
-        """
-        CREATE TABLE IF NOT EXISTS predictions_regression (
-            id SERIAL PRIMARY KEY,
-            ticker VARCHAR(10) NOT NULL,
-            model VARCHAR(50) NOT NULL,
-            prediction_date DATE NOT NULL,
-            target_date DATE NOT NULL,
-            predicted_return FLOAT NOT NULL,
-            created_at TIMESTAMP DEFAULT NOW(),
-            UNIQUE(ticker, model, prediction_date)
-        );
-        """,
-        # Evaluations Classification
-        """
-        CREATE TABLE IF NOT EXISTS evaluations_classification (
-            id SERIAL PRIMARY KEY,
-            prediction_id INT NOT NULL,
-            ticker VARCHAR(10) NOT NULL,
-            model VARCHAR(50) NOT NULL,
-            evaluation_date DATE NOT NULL,
-            predicted_class INT NOT NULL,
-            actual_class INT NOT NULL,
-            correct BOOLEAN NOT NULL,
-            actual_return FLOAT NOT NULL,
-            created_at TIMESTAMP DEFAULT NOW(),
-            FOREIGN KEY (prediction_id) REFERENCES predictions_classification(id) ON DELETE CASCADE,
-            UNIQUE(prediction_id)
-        );
-        """,
-        # Evaluations Regression
-        """
-        CREATE TABLE IF NOT EXISTS evaluations_regression (
-            id SERIAL PRIMARY KEY,
-            prediction_id INT NOT NULL,
-            ticker VARCHAR(10) NOT NULL,
-            model VARCHAR(50) NOT NULL,
-            evaluation_date DATE NOT NULL,
-            predicted_return FLOAT NOT NULL,
-            actual_return FLOAT NOT NULL,
-            error FLOAT NOT NULL,
-            abs_error FLOAT NOT NULL,
-            squared_error FLOAT NOT NULL,
-            created_at TIMESTAMP DEFAULT NOW(),
-            FOREIGN KEY (prediction_id) REFERENCES predictions_regression(id) ON DELETE CASCADE,
-            UNIQUE(prediction_id)
-        );
-        """,
-    ]
-
-    indices = [
-        "CREATE INDEX IF NOT EXISTS idx_market_data_ticker_date ON market_data(ticker, date);",
-        "CREATE INDEX IF NOT EXISTS idx_pred_class_ticker_model ON predictions_classification(ticker, model, prediction_date);",
-        "CREATE INDEX IF NOT EXISTS idx_pred_reg_ticker_model ON predictions_regression(ticker, model, prediction_date);",
-        "CREATE INDEX IF NOT EXISTS idx_eval_class_ticker_model ON evaluations_classification(ticker, model, evaluation_date);",
-        "CREATE INDEX IF NOT EXISTS idx_eval_reg_ticker_model ON evaluations_regression(ticker, model, evaluation_date);",
-        # New indexes for target_date performance
-        "CREATE INDEX IF NOT EXISTS idx_pred_class_target_date ON predictions_classification(ticker, model, target_date);",
-        "CREATE INDEX IF NOT EXISTS idx_pred_reg_target_date ON predictions_regression(ticker, model, target_date);",
-    ]
+    engine = create_engine(db_url, pool_pre_ping=True)
 
     with engine.begin() as conn:
         try:
-            for ddl in tables + indices:
-                conn.execute(text(ddl))
+            for ddl in TABLES + INDICES:
+                conn.execute(text(for_dialect(ddl, conn.dialect.name)))
             logger.info("Database schema initialized successfully.")
         except Exception as e:
             logger.error(f"Schema initialization failed, rolling back: {e}")
             raise
+    engine.dispose()
 
 
 if __name__ == "__main__":
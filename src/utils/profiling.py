@@ -0,0 +1,253 @@
+import cProfile
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from src.utils.logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# Collector and labels of stage() calls in the current thread or task.
+_active: ContextVar[Optional["StageTimings"]] = ContextVar("stage_timings", default=None)
+_labels: ContextVar[dict] = ContextVar("stage_labels", default={})
+
+
+class StageTimings:
+    """
+    Wall time per stage: totals, counts and maxima, plus per label value
+    (e.g. per ticker or per model) when stages are recorded with labels.
+    Nested stages are recorded independently, so "fit" is also part of the
+    "predict" that contains it. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.maxima: dict[str, float] = {}
+        # (label, value) -> stage -> seconds
+        self.labeled: dict[tuple[str, str], dict[str, float]] = {}
+
+    def add(self, stage: str, seconds: float, **labels):
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+            self.maxima[stage] = max(self.maxima.get(stage, 0.0), seconds)
+            for label, value in labels.items():
+                if value is None:
+                    continue
+                stages = self.labeled.setdefault((label, str(value)), {})
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def merge(self, timings, **labels):
+        """
+        Adds timings from elsewhere, e.g. a worker process: a {stage: seconds}
+        dict or the events of an EventLog. `labels` apply to all.
+        """
+        if isinstance(timings, dict):
+            timings = [(stage, seconds, {}) for stage, seconds in timings.items()]
+        for stage, seconds, event_labels in timings:
+            self.add(stage, seconds, **{**event_labels, **labels})
+
+    @contextmanager
+    def track(self, stage: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, **labels)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                stage: {
+                    "total_s": round(total, 3),
+                    "count": self.counts[stage],
+                    "mean_s": round(total / self.counts[stage], 3),
+                    "max_s": round(self.maxima[stage], 3),
+                }
+                for stage, total in self.totals.items()
+            }
+
+    def breakdown(self, label: str) -> dict[str, dict[str, float]]:
+        """{value: {stage: seconds}} for one label, e.g. breakdown("model")."""
+        with self._lock:
+            return {
+                value: {stage: round(s, 3) for stage, s in stages.items()}
+                for (name, value), stages in self.labeled.items()
+                if name == label
+            }
+
+    def slowest(self, label: str, n: int = 10, stages: Optional[tuple] = None) -> list[dict]:
+        """
+        The `n` label values with the most time, summed over `stages` (pass
+        non-overlapping ones) or over all stages recorded for them.
+        """
+        rows = [
+            {
+                label: value,
+                "total_s": round(
+                    sum(s for stage, s in recorded.items() if stages is None or stage in stages), 3
+                ),
+                **recorded,
+            }
+            for value, recorded in self.breakdown(label).items()
+        ]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)[:n]
+
+
+class EventLog:
+    """
+    Picklable list of (stage, seconds, labels) recorded by stage() in a
+    worker process, to be merged into the parent's StageTimings.
+    """
+
+    def __init__(self):
+        self.events: list[tuple[str, float, dict]] = []
+
+    def add(self, stage: str, seconds: float, **labels):
+        self.events.append((stage, seconds, labels))
+
+
+@contextmanager
+def collect(timings, **labels):
+    """
+    Makes `timings` (a StageTimings or EventLog) the target of stage() calls
+    in this thread or task, with `labels` attached to all of them.
+    """
+    token = _active.set(timings)
+    labels_token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield timings
+    finally:
+        _labels.reset(labels_token)
+        _active.reset(token)
+
+
+@contextmanager
+def stage(name: str, **labels):
+    """
+    Times a block into the collector of the current context, if any. Labels
+    also apply to stages nested inside the block. A no-op without collect().
+    """
+    timings = _active.get()
+    if timings is None:
+        yield
+        return
+
+    labels_token = _labels.set({**_labels.get(), **labels})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        current = _labels.get()
+        _labels.reset(labels_token)
+        timings.add(name, seconds, **current)
+
+
+def peak_memory() -> dict[str, int]:
+    """Peak resident set size in bytes of this process and of its waited-for children."""
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    }
+
+
+@contextmanager
+def profile(name: str, directory: str, profiler: str = "cprofile"):
+    """
+    Profiles the block into `directory`: <name>.prof (cProfile, view with
+    snakeviz or pstats) or <name>.html with profiler="pyinstrument".
+    """
+    os.makedirs(directory, exist_ok=True)
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+
+        sampler = Profiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            path = os.path.join(directory, f"{name}.html")
+            with open(path, "w") as f:
+                f.write(sampler.output_html())
+            logger.info(f"Profile of {name} written to {path}")
+        return
+
+    tracer = cProfile.Profile()
+    tracer.enable()
+    try:
+        yield
+    finally:
+        tracer.disable()
+        path = os.path.join(directory, f"{name}.prof")
+        tracer.dump_stats(path)
+        logger.info(f"Profile of {name} written to {path}")
+
+
+def _atomic_write(path: str, content: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_json(summary: dict, path: str):
+    _atomic_write(path, json.dumps(summary, indent=2, default=str))
+
+
+def _prom_labels(labels: dict) -> str:
+    escaped = {k: str(v).replace("\\", "\\\\").replace('"', '\\"') for k, v in labels.items()}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped.items()) + "}" if labels else ""
+
+
+def prometheus_text(summary: dict, prefix: str = "pipeline") -> str:
+    """
+    The run summary in the Prometheus text format, for node_exporter's
+    textfile collector.
+    """
+    samples: dict[str, list[tuple[dict, float]]] = {}
+
+    def sample(metric: str, value, **labels):
+        samples.setdefault(f"{prefix}_{metric}", []).append((labels, float(value)))
+
+    sample("last_run_timestamp_seconds", time.time())
+    sample("run_wall_seconds", summary.get("wall_s", 0))
+    for status in ("processed", "skipped", "failed"):
+        if status in summary:
+            sample("tickers", summary[status], status=status)
+    for name, stats in summary.get("stages", {}).items():
+        sample("stage_seconds_total", stats["total_s"], stage=name)
+        sample("stage_runs_total", stats["count"], stage=name)
+        sample("stage_max_seconds", stats["max_s"], stage=name)
+    for model, stages in summary.get("models", {}).items():
+        for name, seconds in stages.items():
+            sample("model_stage_seconds_total", seconds, model=model, stage=name)
+    for name, value in summary.get("counters", {}).items():
+        sample("counter_total", value, name=name)
+    for table, stats in summary.get("writes", {}).items():
+        for outcome, value in stats.items():
+            sample("rows_written_total", value, table=table, outcome=outcome)
+    for process, value in summary.get("peak_memory_bytes", {}).items():
+        sample("peak_rss_bytes", value, process=process)
+
+    lines = []
+    for name, values in samples.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_prom_labels(labels)} {value}" for labels, value in values)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(summary: dict, path: str):
+    _atomic_write(path, prometheus_text(summary))
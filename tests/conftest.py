@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.data_sources import make_ohlcv
+from src.utils.db_init import initialize_database
+
+
+@pytest.fixture
+def ohlcv() -> pd.DataFrame:
+    return make_ohlcv(600)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """DatabaseService on a SQLite file with the schema of db_init."""
+    from src.pipeline.database import DatabaseService
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'pipeline.db'}")
+    initialize_database()
+    return DatabaseService()
+
+
+@pytest.fixture
+def count_fits():
+    """
+    count_fits(model) records the training size of every estimator
+    model.get_clf builds from then on.
+    """
+
+    def spy_on(model) -> list[int]:
+        fits = []
+        get_clf = model.get_clf
+
+        def spy(y_train=None):
+            fits.append(len(y_train))
+            return get_clf(y_train)
+
+        model.get_clf = spy
+        return fits
+
+    return spy_on
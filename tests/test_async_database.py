@@ -0,0 +1,104 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from sqlalchemy import event
+
+pytest.importorskip("aiosqlite")
+
+from src.pipeline.async_database import AsyncDatabaseService, async_url
+from src.pipeline.database import pool_options
+
+
+def test_async_url():
+    url, connect_args = async_url("postgresql://u:p@db:5432/prices?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg"
+    assert "sslmode" not in url.query
+    assert url.query["prepared_statement_cache_size"] == "100"
+    assert connect_args == {"ssl": "require"}
+
+    url, connect_args = async_url("sqlite:///pipeline.db")
+    assert url.drivername == "sqlite+aiosqlite" and connect_args == {}
+
+    with pytest.raises(ValueError):
+        async_url("mysql://u:p@db/prices")
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "50")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    options = pool_options()
+    assert options["pool_size"] == 50 and options["max_overflow"] == 0
+
+
+def test_matches_sync_service(sqlite_db, ohlcv, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "4")
+    bars = ohlcv.iloc[:30].set_index("date")
+    tickers = [f"T{i:03d}" for i in range(40)]
+
+    async def run():
+        async with AsyncDatabaseService() as db:
+            assert db.metadata is sqlite_db.metadata
+            # Far more tasks than pooled connections.
+            await asyncio.gather(*(db.save_market_data(bars, t) for t in tickers))
+            queries = []
+            event.listen(
+                db.engine.sync_engine,
+                "before_cursor_execute",
+                lambda *args: queries.append(args[2]),
+            )
+            latest = await db.get_latest_dates(tickers + ["MISSING"])
+            assert len(queries) == 1
+            every = await db.get_latest_dates()
+            assert await db.get_latest_dates([]) == {}
+            frames = [item async for item in db.iter_market_data(chunk_size=16)]
+            fetched = await db.fetch_market_data("T001")
+            return latest, every, frames, fetched
+
+    latest, every, frames, fetched = asyncio.run(run())
+
+    assert latest == sqlite_db.get_latest_dates(tickers + ["MISSING"])
+    assert every == sqlite_db.get_latest_dates()
+    assert set(latest.values()) == {bars.index[-1].date()}
+    assert "MISSING" not in latest
+    assert [t for t, _ in frames] == tickers
+    pd.testing.assert_frame_equal(fetched, sqlite_db.fetch_market_data("T001"))
+
+
+def test_pending_evaluations(sqlite_db, ohlcv):
+    bars = ohlcv.iloc[:5].set_index("date")
+    sqlite_db.save_market_data(bars, "AAA")
+    record = {
+        "ticker": "AAA",
+        "model": "Tree",
+        "prediction_date": bars.index[2].date(),
+        "target_date": bars.index[3].date(),
+        "predicted_class": 1,
+        "probability": 0.7,
+    }
+
+    async def run():
+        async with AsyncDatabaseService() as db:
+            await db.save_prediction(record, "classification")
+            pending = await db.fetch_pending_evaluations("classification")
+            await db.save_evaluation(
+                {
+                    "prediction_id": int(pending["prediction_id"].iloc[0]),
+                    "ticker": "AAA",
+                    "model": "Tree",
+                    "evaluation_date": record["target_date"],
+                    "actual_return": 0.01,
+                    "predicted_class": 1,
+                    "actual_class": 1,
+                    "correct": True,
+                },
+                "classification",
+            )
+            return pending, await db.fetch_pending_evaluations("classification")
+
+    pending, after = asyncio.run(run())
+    assert len(pending) == 1
+    assert pending["close"].iloc[0] == pytest.approx(bars["close"].iloc[3])
+    assert pending["prev_close"].iloc[0] == pytest.approx(bars["close"].iloc[2])
+    assert after.empty
+    assert len(sqlite_db.fetch_evaluations_for_type("classification")) == 1
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from src.models.classifiers import ClassificationModel
+from src.pipeline.backtest import (
+    SUMMARY_COLUMNS,
+    Backtester,
+    summarize,
+    walk_forward_predictions,
+)
+from src.pipeline.collector import add_features
+from src.pipeline.data_sources import make_ohlcv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURES = ["close", "rsi_14", "roc_10", "macd_hist", "log_return"]
+
+
+def tree_model() -> ClassificationModel:
+    return ClassificationModel(
+        DecisionTreeClassifier, FEATURES, max_depth=3, random_state=0
+    )
+
+
+def feature_frame(n_bars: int = 600, seed: int = 0) -> pd.DataFrame:
+    return add_features(make_ohlcv(n_bars, seed).set_index("date"))
+
+
+@pytest.mark.parametrize("model", ["DecisionTree", "RandomForest", "XGBoost", "SVC"])
+def test_summary_matches_shipped_csv(model):
+    results = pd.read_csv(os.path.join(ROOT, f"backtest_{model}.csv"))
+    expected = pd.read_csv(os.path.join(ROOT, "backtest_summary.csv")).set_index("model")
+
+    summary = summarize(results, model)
+
+    assert list(summary) == SUMMARY_COLUMNS
+    for column in SUMMARY_COLUMNS[1:]:
+        assert summary[column] == pytest.approx(expected.loc[model, column], abs=1e-4)
+
+
+def test_daily_refit_matches_live_predictions():
+    df = feature_frame()
+    model = tree_model()
+
+    results = walk_forward_predictions(df, model, min_train=300, refit_every=1)
+
+    for i in (0, 50, len(results) - 1):
+        pred_date = pd.Timestamp(results["date"].iloc[i])
+        live = model.train_predict_next(df.loc[:pred_date])
+        assert results["probability"].iloc[i] == pytest.approx(live["probability"])
+
+    next_return = df["log_return"].shift(-1).loc[pd.to_datetime(results["date"])]
+    np.testing.assert_allclose(results["actual_return"], next_return.to_numpy())
+    np.testing.assert_allclose(
+        results["pnl"], results["prediction"] * (results["actual_return"] - 0.001)
+    )
+
+
+def test_backtester_resumes(tmp_path):
+    frames = {"AAA": feature_frame(seed=1), "BBB": feature_frame(seed=2)}
+    models = {"DecisionTree": tree_model()}
+    backtester = Backtester(output_dir=str(tmp_path), workers=0, min_train=300)
+
+    first = backtester.run(frames, models)
+    assert sorted(first["ticker"]) == ["AAA", "BBB"]
+    assert os.path.exists(tmp_path / "AAA" / "backtest_DecisionTree.csv")
+    assert list(pd.read_csv(tmp_path / "AAA" / "backtest_summary.csv")) == SUMMARY_COLUMNS
+
+    assert backtester.run(frames, models).empty
+    assert len(backtester.run(frames, models, resume=False)) == 2
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pytest
+import requests
+
+from src.pipeline import constituents
+from src.pipeline.constituents import ConstituentsCache, parse_sp500_page
+
+PAGE = """
+<table>
+  <tr><th>Symbol</th><th>Security</th></tr>
+  <tr><td>AAA</td><td>A Corp</td></tr>
+  <tr><td>BRK.B</td><td>Berkshire</td></tr>
+  <tr><td>CCC</td><td>C Corp</td></tr>
+</table>
+<table>
+  <tr><th rowspan="2">Effective Date</th><th colspan="2">Added</th><th colspan="2">Removed</th><th rowspan="2">Reason</th></tr>
+  <tr><th>Ticker</th><th>Security</th><th>Ticker</th><th>Security</th></tr>
+  <tr><td>March 18, 2024</td><td>CCC</td><td>C Corp</td><td>OLD</td><td>Old Corp</td><td>x</td></tr>
+  <tr><td>June 1, 2020</td><td>AAA</td><td>A Corp</td><td></td><td></td><td>x</td></tr>
+</table>
+"""
+
+
+class FakeResponse:
+    def __init__(self, text="", status_code=200, headers=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Queue of responses (or exceptions) returned by requests.get, plus the calls made."""
+    queue, calls = [], []
+
+    def fake_get(url, headers=None, timeout=None):
+        calls.append(headers or {})
+        item = queue.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    monkeypatch.setattr(constituents.requests, "get", fake_get)
+    return queue, calls
+
+
+def test_parse_page():
+    tickers, changes = parse_sp500_page(PAGE)
+    assert tickers == ["AAA", "BRK-B", "CCC"]
+    assert changes == [
+        {"date": "2024-03-18", "added": "CCC", "removed": "OLD"},
+        {"date": "2020-06-01", "added": "AAA", "removed": None},
+    ]
+
+
+def test_ttl_and_conditional_refresh(tmp_path, responses):
+    queue, calls = responses
+    path = str(tmp_path / "constituents.json")
+    queue.append(FakeResponse(PAGE, headers={"ETag": '"v1"'}))
+
+    assert ConstituentsCache(path).tickers() == ["AAA", "BRK-B", "CCC"]
+    # Within the TTL the file is enough.
+    assert ConstituentsCache(path).tickers() == ["AAA", "BRK-B", "CCC"]
+    assert len(calls) == 1
+
+    queue.append(FakeResponse(status_code=304))
+    assert ConstituentsCache(path, ttl_hours=0).tickers() == ["AAA", "BRK-B", "CCC"]
+    assert calls[-1]["If-None-Match"] == '"v1"'
+
+
+def test_stale_cache_survives_failed_refresh(tmp_path, responses):
+    queue, _ = responses
+    path = str(tmp_path / "constituents.json")
+
+    queue.append(requests.ConnectionError("offline"))
+    with pytest.raises(requests.ConnectionError):
+        ConstituentsCache(path).tickers()
+
+    queue.append(FakeResponse(PAGE))
+    ConstituentsCache(path).tickers()
+    queue.append(requests.ConnectionError("offline"))
+    assert ConstituentsCache(path, ttl_hours=0).tickers() == ["AAA", "BRK-B", "CCC"]
+
+
+def test_historical_membership(tmp_path, responses):
+    queue, _ = responses
+    path = str(tmp_path / "constituents.json")
+    queue.append(FakeResponse(PAGE))
+    cache = ConstituentsCache(path)
+
+    assert cache.tickers("2024-03-18") == ["AAA", "BRK-B", "CCC"]
+    assert cache.tickers("2024-03-15") == ["AAA", "BRK-B", "OLD"]
+    assert cache.tickers("2019-12-31") == ["BRK-B", "OLD"]
+
+    assert cache.intervals("OLD") == [(None, "2024-03-18")]
+    assert cache.intervals("CCC") == [("2024-03-18", None)]
+    np.testing.assert_array_equal(
+        cache.is_member("CCC", ["2024-03-15", "2024-03-18", "2025-01-02"]),
+        [False, True, True],
+    )
+
+
+def test_refresh_records_unlisted_changes(tmp_path, responses):
+    queue, _ = responses
+    path = str(tmp_path / "constituents.json")
+    queue.append(FakeResponse(PAGE))
+    ConstituentsCache(path).tickers()
+
+    queue.append(FakeResponse(PAGE.replace("<td>CCC</td><td>C Corp</td></tr>\n</table>", "<td>DDD</td><td>D Corp</td></tr>\n</table>", 1)))
+    cache = ConstituentsCache(path, ttl_hours=0)
+    assert cache.tickers() == ["AAA", "BRK-B", "DDD"]
+
+    with open(path) as f:
+        changes = json.load(f)["changes"]
+    assert {"added": "DDD", "removed": None} in [
+        {k: c[k] for k in ("added", "removed")} for c in changes
+    ]
+    assert any(c["removed"] == "CCC" for c in changes)
@@ -0,0 +1,80 @@
+import pandas as pd
+
+from frontend.scripts.data import DashboardData
+
+
+def evaluate(db, ticker, bars, days, correct=True):
+    for i in days:
+        db.save_prediction(
+            {
+                "ticker": ticker,
+                "model": "Tree",
+                "prediction_date": bars.index[i - 1].date(),
+                "target_date": bars.index[i].date(),
+                "predicted_class": 1,
+                "probability": 0.6,
+            },
+            "classification",
+        )
+    pending = db.fetch_pending_evaluations("classification")
+    db.save_evaluations(
+        pd.DataFrame(
+            {
+                "prediction_id": pending["prediction_id"],
+                "ticker": pending["ticker"],
+                "model": pending["model"],
+                "evaluation_date": pending["date"].dt.date,
+                "predicted_class": 1,
+                "actual_class": 1 if correct else 0,
+                "correct": correct,
+                "actual_return": 0.01,
+            }
+        ),
+        "classification",
+    )
+    db.refresh_evaluation_aggregates("classification")
+
+
+def test_delta_refresh(sqlite_db, ohlcv):
+    bars = ohlcv.iloc[:10].set_index("date")
+    for ticker in ("AAA", "BBB"):
+        sqlite_db.save_market_data(bars, ticker)
+    evaluate(sqlite_db, "AAA", bars, range(1, 6))
+
+    data = DashboardData(sqlite_db, refresh_seconds=0)
+    daily = data.get("daily", "classification")
+    assert len(daily) == 5 and data.rows_fetched == 5
+    assert isinstance(daily["model"].dtype, pd.CategoricalDtype)
+    assert daily["n"].dtype == "int32"
+
+    # A second ticker on overlapping days: only the touched rows come back.
+    evaluate(sqlite_db, "BBB", bars, range(4, 8), correct=False)
+    daily = data.get("daily", "classification")
+    assert data.rows_fetched == 5 + 4
+    assert daily["n"].tolist() == [1, 1, 1, 2, 2, 1, 1]
+    assert daily["wins"].tolist() == [1, 1, 1, 1, 1, 0, 0]
+    pd.testing.assert_frame_equal(
+        daily.drop(columns="last_id").reset_index(drop=True),
+        DashboardData(sqlite_db).get("daily", "classification").drop(columns="last_id"),
+    )
+
+    # Nothing changed: an empty delta.
+    data.get("daily", "classification")
+    assert data.rows_fetched == 9
+    assert data.tickers() == ["AAA", "BBB"]
+
+
+def test_reads_within_interval_hit_memory(sqlite_db, ohlcv):
+    bars = ohlcv.iloc[:5].set_index("date")
+    sqlite_db.save_market_data(bars, "AAA")
+    evaluate(sqlite_db, "AAA", bars, range(1, 3))
+
+    data = DashboardData(sqlite_db, refresh_seconds=3600)
+    first = data.get("daily", "classification")
+    evaluate(sqlite_db, "AAA", bars, range(3, 5))
+    assert data.get("daily", "classification") is first
+
+    stats = data.stats()
+    assert stats["hits"] == 1 and stats["stages"]["load"]["count"] == 1
+    assert "refresh" not in stats["stages"]
+    assert stats["memory_bytes"] > 0
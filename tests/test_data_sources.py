@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.data_sources import (
+    SnapshotDataSource,
+    SyntheticDataSource,
+    create_data_source,
+    period_start,
+)
+
+
+def test_period_start():
+    end = pd.Timestamp("2024-03-15")
+    assert period_start(end, "7d") == pd.Timestamp("2024-03-08")
+    assert period_start(end, "3mo") == pd.Timestamp("2023-12-15")
+    assert period_start(end, "max") is None
+    with pytest.raises(ValueError):
+        period_start(end, "soon")
+
+
+def test_synthetic_is_deterministic_and_cut_at_as_of():
+    source = create_data_source("synthetic:3:2")
+    assert source.get_tickers() == ["SYN0000", "SYN0001", "SYN0002"]
+
+    full = source.fetch("SYN0001", period="max")
+    assert len(full) == 2 * 252
+    pd.testing.assert_frame_equal(full, SyntheticDataSource(3, 2).fetch("SYN0001", "max"))
+    assert not full.equals(source.fetch("SYN0002", period="max"))
+
+    source.as_of = full["date"].iloc[100]
+    window = source.fetch("SYN0001", period="7d")
+    assert window["date"].iloc[-1] == source.as_of
+    assert len(window) == 5
+    pd.testing.assert_frame_equal(window, full.iloc[96:101].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_snapshot_round_trip(tmp_path, fmt):
+    synthetic = SyntheticDataSource(2, 1)
+    frames = {t: synthetic.fetch(t, "max") for t in synthetic.get_tickers()}
+    SnapshotDataSource.write(frames, str(tmp_path), fmt=fmt)
+
+    snapshot = create_data_source(f"snapshot:{tmp_path}")
+    assert snapshot.get_tickers() == synthetic.get_tickers()
+
+    snapshot.as_of = synthetic.as_of = frames["SYN0000"]["date"].iloc[-20]
+    pd.testing.assert_frame_equal(
+        snapshot.fetch("SYN0000", "1mo"),
+        synthetic.fetch("SYN0000", "1mo"),
+        check_dtype=False,
+    )
+    assert snapshot.fetch("MISSING") is None
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+MODELS = ["Tree", "Forest"]
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+@pytest.fixture
+def evaluated(sqlite_db):
+    """60 days of evaluations for every ticker and model, folded into the aggregates."""
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range("2024-01-01", periods=60).date
+    rows = [
+        (ticker, model, day)
+        for ticker in TICKERS
+        for model in MODELS
+        for day in dates
+    ]
+    frame = pd.DataFrame(rows, columns=["ticker", "model", "evaluation_date"])
+    frame["prediction_id"] = np.arange(1, len(frame) + 1)
+    frame["correct"] = rng.random(len(frame)) < np.where(frame["ticker"] == "AAA", 0.8, 0.4)
+    frame["predicted_class"] = 1
+    frame["actual_class"] = frame["correct"].astype(int)
+    frame["actual_return"] = rng.normal(0, 0.01, len(frame))
+    regression = frame[["prediction_id", "ticker", "model", "evaluation_date", "actual_return"]].copy()
+    regression["predicted_return"] = rng.normal(0, 0.01, len(frame))
+    regression["error"] = regression["predicted_return"] - regression["actual_return"]
+    regression["abs_error"] = regression["error"].abs()
+    regression["squared_error"] = regression["error"] ** 2
+
+    sqlite_db.save_evaluations(frame, "classification")
+    sqlite_db.save_evaluations(regression, "regression")
+    for model_type in ("classification", "regression"):
+        sqlite_db.refresh_evaluation_aggregates(model_type)
+    return sqlite_db, frame, regression
+
+
+def test_rolling_metrics_pages_match_pandas(evaluated):
+    db, frame, regression = evaluated
+    series = frame[(frame["ticker"] == "BBB") & (frame["model"] == "Tree")]
+    expected = series["correct"].astype(float).rolling(10, min_periods=1).mean().to_numpy()[::-1]
+
+    pages, before = [], None
+    while True:
+        page = db.fetch_rolling_metrics("classification", "BBB", "Tree", window=10, limit=25, before=before)
+        if page.empty:
+            break
+        pages.append(page)
+        before = page["evaluation_date"].iloc[-1]
+    rolled = pd.concat(pages, ignore_index=True)
+
+    assert [len(p) for p in pages] == [25, 25, 10]
+    assert rolled["evaluation_date"].is_monotonic_decreasing
+    np.testing.assert_allclose(rolled["rolling_winrate"], expected)
+
+    mae = db.fetch_rolling_metrics("regression", "BBB", "Tree", window=5, limit=3)
+    series = regression[(regression["ticker"] == "BBB") & (regression["model"] == "Tree")]
+    np.testing.assert_allclose(
+        mae["rolling_mae"], series["abs_error"].rolling(5).mean().to_numpy()[::-1][:3]
+    )
+
+
+def test_rankings(evaluated):
+    db, frame, regression = evaluated
+
+    models = db.fetch_model_ranking("classification", recent_days=5)
+    assert sorted(models["model"]) == sorted(MODELS)
+    tree = frame[frame["model"] == "Tree"]
+    row = models.set_index("model").loc["Tree"]
+    assert row["n"] == len(tree)
+    assert row["winrate"] == pytest.approx(tree["correct"].mean())
+    recent = tree[tree["evaluation_date"] >= sorted(tree["evaluation_date"].unique())[-5]]
+    assert row["recent_winrate"] == pytest.approx(recent["correct"].mean())
+
+    best = db.fetch_ticker_ranking("classification", limit=2)
+    assert best["ticker"].tolist()[0] == "AAA"
+    assert db.fetch_ticker_ranking("classification", limit=2, offset=2)["ticker"].tolist() == [
+        t for t in TICKERS if t not in best["ticker"].tolist()
+    ]
+    worst = db.fetch_ticker_ranking("classification", model="Forest", worst=True, limit=1)
+    forest = frame[frame["model"] == "Forest"].groupby("ticker")["correct"].mean()
+    assert worst["ticker"].iloc[0] == forest.idxmin()
+
+    mae = db.fetch_ticker_ranking("regression", limit=3)
+    assert mae["mae"].is_monotonic_increasing
+    assert db.fetch_ticker_ranking("classification", min_evaluations=1000).empty
+
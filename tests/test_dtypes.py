@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from src.models.classifiers import ClassificationModel
+from src.pipeline import dtypes
+from src.pipeline.collector import add_features
+from src.pipeline.dtypes import FLOAT32_COLUMNS, compact_frame
+from src.pipeline.runner import predict_ticker, prepare_ticker_frame
+
+FEATURES = ["close", "rsi_14", "roc_10", "volume", "macd_hist", "bb_percent", "atr_14"]
+
+
+def test_working_frame_policy(ohlcv):
+    features = add_features(ohlcv)
+    columns, before = list(features.columns), features.dtypes.copy()
+    df = prepare_ticker_frame("AAA", features)
+
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert (df[FLOAT32_COLUMNS].dtypes == np.float32).all()
+    assert df["log_return"].dtype == np.float64 and df["close"].dtype == np.float64
+    # The caller's frame is left as it was.
+    assert list(features.columns) == columns
+    pd.testing.assert_series_equal(features.dtypes, before)
+
+
+def test_fetched_market_data_is_compact(sqlite_db, ohlcv):
+    sqlite_db.save_market_data(ohlcv.iloc[:20].set_index("date"), "AAA")
+    df = sqlite_db.fetch_market_data("AAA")
+    assert isinstance(df["ticker"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+
+    (ticker, chunk), = sqlite_db.iter_market_data(["AAA"])
+    assert ticker == "AAA" and isinstance(chunk["ticker"].dtype, pd.CategoricalDtype)
+
+
+def test_model_outputs_match_float64(ohlcv, monkeypatch):
+    features = add_features(ohlcv)
+    df = prepare_ticker_frame("AAA", features)
+    # The float64 kernel output as it was used before the policy.
+    monkeypatch.setattr(dtypes, "COMPACT_DTYPES", False)
+    wide = prepare_ticker_frame("AAA", features)
+    assert (wide[FLOAT32_COLUMNS].dtypes == np.float64).all()
+    assert not np.array_equal(wide["rsi_14"], df["rsi_14"].astype("float64"))
+    models = [
+        ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=4, random_state=0),
+        ClassificationModel("XGBClassifier", FEATURES, n_estimators=20, max_depth=3, random_state=0),
+    ]
+
+    _, y, _, _ = models[0]._design_matrix(df)
+    assert y.dtype == np.int8
+    assert predict_ticker("AAA", df, models) == predict_ticker("AAA", wide, models)
+
+
+def test_policy_can_be_disabled(ohlcv, monkeypatch):
+    monkeypatch.setattr(dtypes, "COMPACT_DTYPES", False)
+    features = add_features(ohlcv)
+    assert compact_frame(features) is features
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.pipeline.runner import TradingPipeline
+from src.pipeline.writer import BatchWriter
+
+
+class Model:
+    def __init__(self, name, model_type="classification", threshold=0.005):
+        self.name = name
+        self.model_type = model_type
+        self.classification_threshold = threshold
+
+
+def prediction(ticker, model, pred_date, target_date, **values):
+    return {
+        "ticker": ticker,
+        "model": model,
+        "prediction_date": pd.Timestamp(pred_date).date(),
+        "target_date": pd.Timestamp(target_date).date(),
+        **values,
+    }
+
+
+@pytest.fixture
+def market(sqlite_db, ohlcv):
+    bars = ohlcv.iloc[:10].set_index("date")
+    sqlite_db.save_market_data(bars, "AAA")
+    return sqlite_db, bars
+
+
+def test_pending_predictions_are_evaluated_in_bulk(market):
+    db, bars = market
+    dates = bars.index
+    # Targets of several past days, one without market data yet.
+    for i in (2, 5, 9):
+        db.save_prediction(
+            prediction("AAA", "Tree", dates[i - 1], dates[i], predicted_class=1, probability=0.9),
+            "classification",
+        )
+    db.save_prediction(
+        prediction("AAA", "Tree", dates[9], dates[9] + pd.offsets.BDay(1), predicted_class=0, probability=0.1),
+        "classification",
+    )
+    db.save_prediction(
+        prediction("AAA", "Ridge", dates[4], dates[5], predicted_return=0.01),
+        "regression",
+    )
+
+    writer = BatchWriter(db)
+    pipeline = TradingPipeline(db, writer=writer)
+    models = [Model("Tree", threshold=0.0), Model("Ridge", "regression")]
+    assert pipeline.evaluate_pending(models) == 4
+    writer.flush()
+
+    with db.engine.connect() as conn:
+        evaluations = pd.read_sql(
+            text("SELECT * FROM evaluations_classification ORDER BY evaluation_date"), conn
+        )
+        regression = pd.read_sql(text("SELECT * FROM evaluations_regression"), conn)
+
+    log_return = np.log(bars["close"] / bars["close"].shift(1))
+    expected = log_return.iloc[[2, 5, 9]].to_numpy()
+    np.testing.assert_allclose(evaluations["actual_return"], expected)
+    np.testing.assert_array_equal(evaluations["actual_class"], (expected > 0.0).astype(int))
+    np.testing.assert_array_equal(evaluations["correct"], expected > 0.0)
+    assert regression["error"].iloc[0] == pytest.approx(0.01 - log_return.iloc[5])
+
+    # Nothing left to evaluate until the next bar arrives.
+    assert pipeline.evaluate_pending(models) == 0
+
+
+def test_aggregates_are_folded_in_incrementally(market):
+    db, bars = market
+    dates = bars.index
+    writer = BatchWriter(db)
+    pipeline = TradingPipeline(db, writer=writer)
+    models = [Model("Tree"), Model("Forest"), Model("Ridge", "regression")]
+
+    def predict(days, ticker="AAA"):
+        for i in days:
+            for name in ("Tree", "Forest"):
+                db.save_prediction(
+                    prediction(ticker, name, dates[i - 1], dates[i], predicted_class=i % 2, probability=0.5),
+                    "classification",
+                )
+            db.save_prediction(
+                prediction(ticker, "Ridge", dates[i - 1], dates[i], predicted_return=0.001 * i),
+                "regression",
+            )
+        pipeline.evaluate_pending(models)
+        writer.flush()
+        return pipeline.refresh_aggregates()
+
+    def from_scratch(model_type):
+        evaluations = db.fetch_evaluations_for_type(model_type)
+        evaluations["evaluation_date"] = pd.to_datetime(evaluations["evaluation_date"])
+        if model_type == "classification":
+            agg = {"n": ("correct", "size"), "wins": ("correct", "sum")}
+        else:
+            agg = {"n": ("abs_error", "size"), "sum_abs_error": ("abs_error", "sum")}
+        return evaluations.groupby(["model", "evaluation_date"]).agg(**agg).reset_index()
+
+    assert predict(range(1, 5)) == 12
+    db.save_market_data(bars, "BBB")
+    assert predict(range(3, 8), ticker="BBB") == 15
+    # Nothing new: the watermark keeps a refresh from double counting.
+    assert pipeline.refresh_aggregates() == 0
+
+    for model_type in ("classification", "regression"):
+        daily = db.fetch_daily_aggregates(model_type)
+        daily["evaluation_date"] = pd.to_datetime(daily["evaluation_date"])
+        expected = from_scratch(model_type)
+        pd.testing.assert_frame_equal(
+            daily[expected.columns], expected, check_dtype=False
+        )
+
+    tickers = db.fetch_ticker_aggregates("classification")
+    tree = tickers[tickers["model"] == "Tree"].set_index("ticker")
+    assert tree.loc["AAA", "n"] == 4 and tree.loc["BBB", "n"] == 5
+    assert str(tree.loc["BBB", "first_date"])[:10] == str(dates[3].date())
+    assert str(tree.loc["BBB", "last_date"])[:10] == str(dates[7].date())
@@ -0,0 +1,69 @@
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline import indicators
+from src.pipeline.collector import add_features
+from src.pipeline.feature_store import FeatureStore, update_features
+from src.pipeline.indicators import FEATURE_COLUMNS
+
+
+def stored_history(store: FeatureStore, ohlcv: pd.DataFrame, ticker: str = "AAA"):
+    store.db_service.save_market_data(ohlcv, ticker)
+    _, new_rows, state = update_features(ohlcv, pd.DataFrame(), None)
+    store.save(ticker, new_rows, state)
+    return store.load_many([ticker])[ticker]
+
+
+def test_extended_features_match_full_recomputation(sqlite_db, ohlcv):
+    store = FeatureStore(sqlite_db)
+    stored, state = stored_history(store, ohlcv.iloc[:500])
+    assert state is not None
+
+    # Overlapping window, like the daily fetch.
+    features, new_rows, state = update_features(ohlcv.iloc[490:], stored, state)
+
+    expected = add_features(ohlcv.copy()).reset_index(drop=True)
+    assert new_rows["date"].tolist() == ohlcv["date"].iloc[500:].tolist()
+    assert state["last_date"] == ohlcv["date"].iloc[-1].strftime("%Y-%m-%d")
+    pd.testing.assert_series_equal(
+        features["date"].reset_index(drop=True), expected["date"], check_names=False
+    )
+    # Stored rows come back in the compact float32 policy.
+    np.testing.assert_allclose(
+        features[FEATURE_COLUMNS].to_numpy(dtype="float64"),
+        expected[FEATURE_COLUMNS].to_numpy(),
+        rtol=1e-6,
+        atol=1e-8,
+    )
+
+
+def test_version_change_forces_recomputation(sqlite_db, ohlcv):
+    store = FeatureStore(sqlite_db)
+    stored, state = stored_history(store, ohlcv)
+
+    store.version = "other"
+    assert store.load_many(["AAA"]) == {}
+
+    state = {**state, "feature_set_version": "other"}
+    features, new_rows, _ = update_features(ohlcv, stored, state)
+    assert len(new_rows) == len(features) == len(add_features(ohlcv.copy()))
+
+
+def test_version_covers_every_helper():
+    # Functions of the indicators module reachable from the batch kernel and
+    # the incremental step must all be part of FEATURE_SET_VERSION.
+    pending = [indicators.compute_indicators, indicators._step]
+    reachable = set()
+    while pending:
+        fn = pending.pop()
+        if fn in reachable:
+            continue
+        reachable.add(fn)
+        for name in fn.__code__.co_names:
+            obj = getattr(indicators, name, None)
+            if inspect.isfunction(obj) and obj.__module__ == indicators.__name__:
+                pending.append(obj)
+
+    assert reachable <= set(indicators._DEFINITIONS)
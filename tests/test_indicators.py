@@ -0,0 +1,168 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.collector import add_features, add_features_pandas_ta
+from src.pipeline.indicators import (
+    FEATURE_COLUMNS,
+    add_features_incremental,
+    compute_features,
+    compute_features_incremental,
+    compute_features_many,
+)
+from src.pipeline.data_sources import make_ohlcv
+
+
+def _ema(close: pd.Series, length: int) -> pd.Series:
+    seeded = close.copy()
+    seeded.iloc[: length - 1] = np.nan
+    seeded.iloc[length - 1] = close.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+def _rma(series: pd.Series, length: int) -> pd.Series:
+    return series.ewm(alpha=1 / length, min_periods=length).mean()
+
+
+def reference_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Full recomputation with pandas, following the pandas_ta definitions."""
+    df = df.copy()
+    close, high, low, volume = df["close"], df["high"], df["low"], df["volume"]
+
+    df["log_return"] = np.log(close / close.shift(1))
+    df["volumne_rolling_mean_20"] = volume.rolling(20).mean()
+
+    delta = close.diff()
+    gain, loss = _rma(delta.clip(lower=0), 14), _rma(delta.clip(upper=0), 14)
+    df["rsi_14"] = 100 * gain / (gain + loss.abs())
+    df["roc_10"] = 100 * (close - close.shift(10)) / close.shift(10)
+
+    prev_close = close.shift(1)
+    tr = pd.concat([high - low, high - prev_close, prev_close - low], axis=1)
+    tr = tr.abs().max(axis=1)
+    tr.iloc[0] = np.nan
+    df["atr_14"] = _rma(tr, 14)
+
+    tp = (high + low + close) / 3
+    flow = tp * volume
+    tp_diff = tp.diff()
+    pos = flow.where(tp_diff > 0, 0.0).rolling(14).sum()
+    neg = flow.where(tp_diff < 0, 0.0).rolling(14).sum()
+    df["mfi_14"] = 100 * pos / (pos + neg)
+
+    macd = _ema(close, 12) - _ema(close, 26)
+    signal = _ema(macd.loc[macd.first_valid_index():], 9)
+    df["macd_hist"] = macd - signal
+
+    mid = close.rolling(20).mean()
+    dev = 2 * close.rolling(20).std()
+    df["bb_percent"] = (close - (mid - dev)) / (2 * dev)
+
+    ema_200 = _ema(close, 200)
+    df["dist_ema_200"] = (close - ema_200) / ema_200
+    return df.dropna().reset_index(drop=True)
+
+
+def test_single_pass_matches_full_recomputation(ohlcv):
+    features, _ = compute_features_incremental(ohlcv)
+    features = features.dropna().reset_index(drop=True)
+    expected = reference_features(ohlcv)
+
+    pd.testing.assert_series_equal(features["date"], expected["date"])
+    np.testing.assert_allclose(
+        features[FEATURE_COLUMNS].to_numpy(),
+        expected[FEATURE_COLUMNS].to_numpy(),
+        rtol=1e-7,
+        atol=1e-9,
+    )
+
+
+def test_daily_increments_match_full_recomputation(ohlcv):
+    features, state = add_features_incremental(pd.DataFrame(), ohlcv.iloc[:400], None)
+
+    # Overlapping 7-day windows, like fetch_ticker_data(period="7d").
+    for end in range(405, len(ohlcv) + 1, 5):
+        window = ohlcv.iloc[end - 7 : end]
+        features, state = add_features_incremental(features, window, state)
+
+    expected = reference_features(ohlcv)
+    assert len(features) == len(expected)
+    np.testing.assert_allclose(
+        features[FEATURE_COLUMNS].to_numpy(),
+        expected[FEATURE_COLUMNS].to_numpy(),
+        rtol=1e-7,
+        atol=1e-9,
+    )
+
+
+def test_state_survives_json_round_trip(ohlcv):
+    head, state = compute_features_incremental(ohlcv.iloc[:300])
+    state = json.loads(json.dumps(state))
+    tail, _ = compute_features_incremental(ohlcv, state)
+
+    full, _ = compute_features_incremental(ohlcv)
+    np.testing.assert_allclose(
+        tail[FEATURE_COLUMNS].to_numpy(),
+        full[FEATURE_COLUMNS].iloc[300:].to_numpy(),
+        rtol=1e-9,
+        equal_nan=True,
+    )
+
+
+def test_incremental_matches_add_features(ohlcv):
+    expected = add_features(ohlcv.copy()).reset_index(drop=True)
+    features, _ = add_features_incremental(pd.DataFrame(), ohlcv, None)
+
+    np.testing.assert_allclose(
+        features[FEATURE_COLUMNS].to_numpy(),
+        expected[FEATURE_COLUMNS].to_numpy(),
+        rtol=1e-7,
+        atol=1e-9,
+    )
+
+
+def test_kernel_matches_full_recomputation(ohlcv):
+    features = add_features(ohlcv.copy()).reset_index(drop=True)
+    expected = reference_features(ohlcv)
+
+    assert list(features.columns) == list(expected.columns)
+    np.testing.assert_allclose(
+        features[FEATURE_COLUMNS].to_numpy(),
+        expected[FEATURE_COLUMNS].to_numpy(),
+        rtol=1e-7,
+        atol=1e-9,
+    )
+
+
+def test_batched_kernel_matches_per_ticker():
+    frames = {
+        "AAA": make_ohlcv(800, seed=1),
+        "BBB": make_ohlcv(250, seed=2),
+        "CCC": make_ohlcv(1200, seed=3),
+    }
+    batched = compute_features_many(frames)
+
+    for ticker, df in frames.items():
+        expected = compute_features(df)
+        np.testing.assert_allclose(
+            batched[ticker][FEATURE_COLUMNS].to_numpy(),
+            expected[FEATURE_COLUMNS].to_numpy(),
+            rtol=1e-10,
+            equal_nan=True,
+        )
+
+
+def test_kernel_matches_pandas_ta(ohlcv):
+    pytest.importorskip("pandas_ta")
+
+    expected = add_features_pandas_ta(ohlcv.copy()).reset_index(drop=True)
+    features = add_features(ohlcv.copy()).reset_index(drop=True)
+
+    np.testing.assert_allclose(
+        features[FEATURE_COLUMNS].to_numpy(),
+        expected[FEATURE_COLUMNS].to_numpy(),
+        rtol=1e-6,
+        atol=1e-8,
+    )
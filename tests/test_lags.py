@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from src.models.base import LagMatrix
+from src.models.classifiers import ClassificationModel
+from src.pipeline.collector import add_features
+
+FEATURES = ["close", "rsi_14", "roc_10", "volume", "macd_hist", "log_return"]
+
+
+def reference_design(df: pd.DataFrame, features: list, lags: int = 3):
+    """The former create_lags + _prepare_features, column by column in pandas."""
+    df_lags = df.copy()
+    for lag in range(1, lags + 1):
+        for col in features:
+            if col in df_lags.columns:
+                df_lags[f"{col}_lag{lag}"] = df_lags[col].shift(lag)
+    df_lags.dropna(inplace=True)
+
+    feature_cols = [
+        c for c in df_lags.columns if c in features and c not in ["log_return", "target"]
+    ] + [c for c in df_lags.columns if "_lag" in c]
+    return df_lags, feature_cols
+
+
+def feature_frame(ohlcv: pd.DataFrame) -> pd.DataFrame:
+    return add_features(ohlcv.set_index("date"))
+
+
+def test_design_matches_reference(ohlcv):
+    df = feature_frame(ohlcv)
+    df.iloc[40, df.columns.get_loc("rsi_14")] = np.nan
+
+    expected, expected_cols = reference_design(df, FEATURES)
+    X, feature_cols, rows = LagMatrix(df).design(FEATURES)
+
+    assert feature_cols == expected_cols
+    assert df.index[rows].equals(expected.index)
+    np.testing.assert_array_equal(X, expected[feature_cols].to_numpy(dtype="float64"))
+
+
+def test_design_is_shared_between_models(ohlcv):
+    df = feature_frame(ohlcv)
+    lag_matrix = LagMatrix(df)
+    first = ClassificationModel(DecisionTreeClassifier, FEATURES, max_depth=3)
+    second = ClassificationModel(DecisionTreeClassifier, FEATURES, max_depth=4)
+
+    X_first = first._design_matrix(df, lag_matrix)[0]
+    X_second = second._design_matrix(df, lag_matrix)[0]
+    assert X_first is X_second
+
+
+def test_targets_match_reference(ohlcv):
+    df = feature_frame(ohlcv)
+    model = ClassificationModel(DecisionTreeClassifier, FEATURES, max_depth=3)
+
+    expected, _ = reference_design(df, FEATURES)
+    expected_target = (
+        expected["log_return"].shift(-1) > model.classification_threshold
+    ).astype(int)
+    _, y, _, _ = model._design_matrix(df)
+
+    np.testing.assert_array_equal(y, expected_target.to_numpy())
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline import market_cache
+from src.pipeline.backtest import Backtester, load_frames
+from src.pipeline.collector import add_features
+from src.pipeline.data_sources import make_ohlcv
+from src.pipeline.market_cache import MarketDataCache
+
+from tests.test_backtest import tree_model
+
+
+@pytest.fixture
+def history():
+    return make_ohlcv(600)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MarketDataCache(str(tmp_path / "market_data"))
+
+
+def test_get_latest_dates(sqlite_db, history):
+    sqlite_db.save_market_data(history, "AAA")
+    sqlite_db.save_market_data(history.iloc[:100], "BBB")
+
+    latest = sqlite_db.get_latest_dates()
+
+    assert latest == {
+        "AAA": history["date"].iloc[-1].date(),
+        "BBB": history["date"].iloc[99].date(),
+    }
+    assert list(sqlite_db.get_latest_dates(["BBB", "CCC"])) == ["BBB"]
+    assert sqlite_db.get_latest_dates([]) == {}
+
+
+def test_sync_appends_only_new_bars(sqlite_db, cache, history):
+    sqlite_db.save_market_data(history.iloc[:500], "AAA")
+    assert cache.sync(sqlite_db)["created"] == 1
+    assert cache.sync(sqlite_db)["rows"] == 0
+
+    sqlite_db.save_market_data(history.iloc[500:], "AAA")
+    stats = cache.sync(sqlite_db)
+
+    assert (stats["updated"], stats["rows"]) == (1, 100)
+    assert cache.last_date("AAA") == history["date"].iloc[-1]
+    cached = cache.read("AAA")
+    np.testing.assert_array_equal(cached["close"], history["close"])
+    np.testing.assert_array_equal(cached["date"], history["date"])
+
+
+def test_reads_are_memory_mapped(sqlite_db, cache, history):
+    sqlite_db.save_market_data(history, "AAA")
+    cache.sync(sqlite_db)
+    cache.features("AAA")
+
+    bars = cache.read("AAA")
+    features = cache.features("AAA")
+
+    # Zero-copy columns are read-only views of the mapped file.
+    assert not bars["close"].to_numpy().flags.writeable
+    assert not features["rsi_14"].to_numpy().flags.writeable
+    expected = add_features(history.set_index("date"))
+    pd.testing.assert_index_equal(features.index, expected.index)
+    np.testing.assert_allclose(features["rsi_14"], expected["rsi_14"], rtol=1e-6)
+    np.testing.assert_array_equal(features["log_return"], expected["log_return"])
+
+
+def test_features_follow_synced_bars(sqlite_db, cache, history):
+    sqlite_db.save_market_data(history.iloc[:500], "AAA")
+    cache.sync(sqlite_db)
+    assert len(cache.features("AAA")) < 500
+
+    sqlite_db.save_market_data(history.iloc[500:], "AAA")
+    cache.sync(sqlite_db)
+
+    assert cache.features("AAA").index[-1] == history["date"].iloc[-1]
+
+
+def test_short_history_has_no_features(sqlite_db, cache):
+    sqlite_db.save_market_data(make_ohlcv(100), "AAA")
+    cache.sync(sqlite_db)
+
+    assert cache.read("AAA") is not None
+    assert cache.features("AAA") is None
+
+
+def test_schema_change_invalidates(sqlite_db, cache, history, monkeypatch, tmp_path):
+    sqlite_db.save_market_data(history, "AAA")
+    cache.sync(sqlite_db)
+    cache.features("AAA")
+
+    monkeypatch.setattr(market_cache, "CACHE_VERSION", market_cache.CACHE_VERSION + 1)
+    monkeypatch.setattr(market_cache, "FEATURE_SET_VERSION", "next")
+    changed = MarketDataCache(cache.directory)
+
+    assert changed.tickers() == []
+    assert changed.features("AAA") is None
+    assert sorted(changed.prune()) == sorted(
+        os.path.basename(path) for path in (cache.ohlcv_dir, cache.features_dir)
+    )
+    assert changed.sync(sqlite_db)["created"] == 1
+
+
+def test_backtest_reads_frames_from_cache(sqlite_db, cache, history, tmp_path):
+    sqlite_db.save_market_data(history, "AAA")
+    cache.sync(sqlite_db)
+
+    frames = load_frames(sqlite_db, ["AAA"], cache)
+    assert callable(frames["AAA"])
+
+    models = {"DecisionTree": tree_model()}
+    cached = Backtester(output_dir=str(tmp_path / "cached"), workers=0).run(frames, models)
+    direct = Backtester(output_dir=str(tmp_path / "direct"), workers=0).run(
+        load_frames(sqlite_db, ["AAA"]), models
+    )
+
+    pd.testing.assert_frame_equal(cached, direct)
@@ -0,0 +1,70 @@
+import numpy as np
+import optuna
+import pytest
+from joblib import Parallel, delayed
+
+from src.models.optuna_optimization import (
+    MODELS,
+    THRESHOLD,
+    get_storage,
+    tune_model,
+    walk_forward_score,
+)
+from src.models.walk_forward import FoldCache
+from src.pipeline.collector import add_features
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+MODEL_NAME = "DecisionTreeClassModel"
+
+
+@pytest.fixture
+def features(ohlcv):
+    return add_features(ohlcv.set_index("date")).dropna()
+
+
+def test_walk_forward_reports_splits_and_prunes(features):
+    study = optuna.create_study(
+        direction="maximize", pruner=optuna.pruners.ThresholdPruner(lower=2.0)
+    )
+    trial = study.ask()
+
+    with pytest.raises(optuna.TrialPruned):
+        walk_forward_score(
+            features, MODELS[MODEL_NAME], train_window=100, trial=trial
+        )
+    assert list(study.trials[0].intermediate_values) == [0]
+
+
+def test_workers_share_trial_budget(features, tmp_path):
+    url = f"journal:{tmp_path / 'optuna.log'}"
+
+    Parallel(n_jobs=2)(
+        delayed(tune_model)(
+            features, "TEST", MODEL_NAME, MODELS[MODEL_NAME], get_storage(url), 6
+        )
+        for _ in range(2)
+    )
+
+    study = optuna.load_study(
+        study_name=f"v2_TEST_{MODEL_NAME}", storage=get_storage(url)
+    )
+    finished = [t for t in study.trials if t.state.is_finished()]
+    # Each worker stops once the shared study holds 6 finished trials.
+    assert 6 <= len(finished) <= 7
+
+
+def test_cached_folds_are_shared_views(features):
+    cache = FoldCache()
+    model = MODELS[MODEL_NAME](max_depth=3)
+    folds = cache.get("TEST", features, model, THRESHOLD, train_window=100)
+
+    assert cache.get("TEST", features, MODELS[MODEL_NAME](), THRESHOLD, train_window=100) is folds
+    for X_train, _, X_test, _ in folds.splits():
+        assert np.shares_memory(X_train, folds.X) and np.shares_memory(X_test, folds.X)
+        assert not X_train.flags.writeable
+
+    factory = lambda: MODELS[MODEL_NAME](max_depth=3, random_state=0)
+    assert walk_forward_score(
+        features, factory, THRESHOLD, train_window=100, folds=folds
+    ) == walk_forward_score(features, factory, THRESHOLD, train_window=100)
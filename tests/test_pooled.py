@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.models.classifiers import ClassificationModel
+from src.models.pooled import PooledClassificationModel, predict_pooled
+from src.models.registry import params_fingerprint
+from src.models.training import TrainingPolicy
+from src.pipeline.collector import add_features
+from src.pipeline.data_sources import SyntheticDataSource, make_ohlcv
+from src.pipeline.runner import TradingPipeline
+from src.pipeline.scheduler import PipelineScheduler
+from src.pipeline.writer import BatchWriter
+
+FEATURES = ["close", "rsi_14", "roc_10", "macd_hist", "log_return"]
+
+
+@pytest.fixture
+def frames() -> dict[str, pd.DataFrame]:
+    return {
+        ticker: add_features(make_ohlcv(600, seed).set_index("date"))
+        for seed, ticker in enumerate(["AAA", "BBB", "CCC"])
+    }
+
+
+def pooled_model(policy=None, estimator="DecisionTreeClassifier", encodings=None, **params):
+    model = ClassificationModel(
+        estimator, FEATURES, training_policy=policy, max_depth=3, random_state=0, **params
+    )
+    return PooledClassificationModel(model, **(encodings or {}))
+
+
+def up_to(frames: dict[str, pd.DataFrame], end: int) -> dict[str, pd.DataFrame]:
+    return {ticker: df.iloc[:end] for ticker, df in frames.items()}
+
+
+def test_predict_pooled_scores_every_ticker(frames):
+    model = pooled_model()
+
+    records = predict_pooled(model, frames)
+
+    assert sorted(record["ticker"] for _, record in records) == sorted(frames)
+    for model_type, record in records:
+        assert model_type == "classification"
+        assert record["model"] == "DecisionTreeClassifier_Pooled"
+        assert record["prediction_date"] == frames[record["ticker"]].index[-1].strftime("%Y-%m-%d")
+        assert 0.0 <= record["probability"] <= 1.0
+
+
+def test_train_predict_next_pools_one_ticker(frames, tmp_path):
+    model = pooled_model(TrainingPolicy(refit_every=3, cache_dir=str(tmp_path)))
+
+    output = model.train_predict_next(frames["AAA"], "AAA")
+
+    assert output == model.predict_many({"AAA": frames["AAA"]})["AAA"]
+    assert model.train_predict_next(frames["AAA"]) == output
+
+
+def test_encodings_do_not_depend_on_the_universe(frames, tmp_path, count_fits):
+    # AAA is the only ticker of its sector and is missing on day 2.
+    model = pooled_model(
+        TrainingPolicy(refit_every=3, cache_dir=str(tmp_path)),
+        encodings={
+            "encode_ticker": True,
+            "sectors": {"AAA": "Tech", "BBB": "Energy", "CCC": "Energy"},
+        },
+    )
+    fits = count_fits(model.model)
+
+    model.predict_many(up_to(frames, 300))
+    day_2 = up_to(frames, 301)
+    del day_2["AAA"]
+    model.predict_many(day_2)
+
+    np.testing.assert_array_equal(
+        model._encodings(["AAA", "BBB", "CCC"])[1:], model._encodings(["BBB", "CCC"])
+    )
+    # Same columns on both days, so the cached estimator is reused.
+    assert fits == [3 * 252]
+
+    # A new sector changes the columns: the estimator has to be refitted.
+    other = pooled_model(
+        encodings={"encode_ticker": True, "sectors": {"AAA": "Tech", "BBB": "Utilities"}}
+    )
+    assert params_fingerprint(model.model, 10, model.encoding) != params_fingerprint(
+        other.model, 10, other.encoding
+    )
+
+
+def test_pooled_refits_every_n_trading_days(frames, tmp_path, count_fits):
+    # Each ticker contributes a fixed window of rows, so the row count of the
+    # stacked matrix never grows from day to day.
+    model = pooled_model(TrainingPolicy(refit_every=3, cache_dir=str(tmp_path)))
+    fits = count_fits(model.model)
+
+    outputs = [model.predict_many(up_to(frames, end)) for end in range(300, 307)]
+
+    assert fits == [3 * 252] * 3
+    assert all(sorted(output) == sorted(frames) for output in outputs)
+
+
+def test_pooled_warm_start_continues_on_new_days(frames, tmp_path, monkeypatch):
+    policy = TrainingPolicy(refit_every=10, warm_start=True, cache_dir=str(tmp_path))
+    model = pooled_model(policy, "RandomForestClassifier", n_estimators=5)
+    continued = []
+    continue_ = policy._continue
+
+    def spy(model, clf, X_recent, y_recent, y_train):
+        continued.append(X_recent)
+        return continue_(model, clf, X_recent, y_recent, y_train)
+
+    monkeypatch.setattr(policy, "_continue", spy)
+
+    model.predict_many(up_to(frames, 300))
+    model.predict_many(up_to(frames, 302))
+
+    # The two new training rows of every ticker, not the tail of the stack.
+    expected = np.vstack(
+        [model.model._design_matrix(df)[0][-3:-1] for df in up_to(frames, 302).values()]
+    )
+    assert len(continued) == 1
+    np.testing.assert_array_equal(continued[0], expected)
+
+
+def test_scheduler_refits_pooled_model_across_runs(sqlite_db, tmp_path, count_fits):
+    source = SyntheticDataSource(n_tickers=3, years=2)
+    model = pooled_model(TrainingPolicy(refit_every=2, cache_dir=str(tmp_path)))
+    fits = count_fits(model.model)
+    scheduler = PipelineScheduler(
+        TradingPipeline(sqlite_db, BatchWriter(sqlite_db)),
+        [model],
+        cpu_workers=0,
+        data_source=source,
+    )
+
+    days = source.trading_days("2024-12-24", "2024-12-31")
+    for day in days:
+        source.as_of = day
+        scheduler.run(source.get_tickers())
+
+    assert len(fits) == (len(days) + 1) // 2
+    with sqlite_db.engine.connect() as conn:
+        dates = conn.execute(
+            text(
+                "SELECT DISTINCT prediction_date FROM predictions_classification "
+                "WHERE model = 'DecisionTreeClassifier_Pooled'"
+            )
+        ).scalars().all()
+    assert len(dates) == len(days)
@@ -0,0 +1,76 @@
+import json
+import pickle
+import pstats
+
+from src.pipeline.scheduler import compute_ticker
+from src.utils.profiling import (
+    EventLog,
+    StageTimings,
+    collect,
+    prometheus_text,
+    stage,
+    write_json,
+)
+
+
+def test_nested_stages_carry_labels():
+    timings = StageTimings()
+    with stage("ignored"):
+        pass  # no collector: no-op
+
+    with collect(timings, ticker="AAA"):
+        for model in ("Tree", "Forest"):
+            with stage("train_predict", model=model):
+                with stage("fit"):
+                    pass
+    assert timings.counts == {"fit": 2, "train_predict": 2}
+    assert set(timings.breakdown("model")) == {"Tree", "Forest"}
+    assert set(timings.breakdown("model")["Tree"]) == {"fit", "train_predict"}
+    assert timings.slowest("ticker")[0]["ticker"] == "AAA"
+
+
+def test_worker_events_merge_with_ticker_label(ohlcv):
+    result = compute_ticker("AAA", ohlcv, [])
+    events = pickle.loads(pickle.dumps(result["timings"]))
+    assert [name for name, _, _ in events] == ["features", "predict"]
+
+    timings = StageTimings()
+    timings.merge(events, ticker="AAA")
+    timings.merge({"fetch": 0.5}, ticker="AAA")
+    assert set(timings.breakdown("ticker")["AAA"]) == {"features", "predict", "fetch"}
+    slowest = timings.slowest("ticker", stages=("fetch",))[0]
+    assert slowest["total_s"] == 0.5
+
+
+def test_profile_hook_writes_cprofile_stats(ohlcv, tmp_path):
+    compute_ticker("AAA", ohlcv, [], profile_dir=str(tmp_path))
+    stats = pstats.Stats(str(tmp_path / "AAA.prof"))
+    assert any("add_features" in func[2] for func in stats.stats)
+
+
+def test_summary_outputs(tmp_path):
+    log = EventLog()
+    with collect(log):
+        with stage("fit", model='Odd "name"'):
+            pass
+    timings = StageTimings()
+    timings.merge(log.events)
+    summary = {
+        "processed": 3,
+        "wall_s": 1.5,
+        "stages": timings.summary(),
+        "models": timings.breakdown("model"),
+        "counters": {"rows_fetched": 10},
+        "writes": {"market_data": {"written": 7, "skipped": 1, "failed": 0}},
+        "peak_memory_bytes": {"self": 1024, "children": 0},
+    }
+
+    write_json(summary, str(tmp_path / "run.json"))
+    assert json.loads((tmp_path / "run.json").read_text())["counters"] == {"rows_fetched": 10}
+
+    text = prometheus_text(summary)
+    assert 'pipeline_tickers{status="processed"} 3.0' in text
+    assert 'pipeline_counter_total{name="rows_fetched"} 10.0' in text
+    assert 'pipeline_rows_written_total{table="market_data",outcome="written"} 7.0' in text
+    assert 'model="Odd \\"name\\""' in text
+    assert text.count("# TYPE pipeline_stage_seconds_total gauge") == 1
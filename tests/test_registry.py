@@ -0,0 +1,104 @@
+import os
+import pickle
+
+import numpy as np
+
+from src.models.classifiers import ClassificationModel
+from src.models.registry import ModelRegistry, data_fingerprint, params_fingerprint
+
+FEATURES = ["close", "rsi_14"]
+
+
+def test_params_fingerprint():
+    model = ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=3)
+    same = ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=3)
+
+    assert params_fingerprint(model, 6) == params_fingerprint(same, 6)
+    assert params_fingerprint(model, 6) != params_fingerprint(model, 9)
+    assert params_fingerprint(model, 6) != params_fingerprint(
+        ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=4), 6
+    )
+    assert params_fingerprint(model, 6) != params_fingerprint(
+        ClassificationModel("DecisionTreeClassifier", FEATURES, 0.01, max_depth=3), 6
+    )
+    assert params_fingerprint(model, 6) != params_fingerprint(
+        ClassificationModel("RandomForestClassifier", FEATURES, max_depth=3), 6
+    )
+
+
+def test_data_fingerprint():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(50, 4)), rng.integers(0, 2, 50).astype(np.int8)
+
+    assert data_fingerprint(X, y) == data_fingerprint(X.copy(), y.copy())
+    assert data_fingerprint(X, y) != data_fingerprint(X[:-1], y[:-1])
+    assert data_fingerprint(X, y) != data_fingerprint(X.reshape(100, 2), y)
+    changed = y.copy()
+    changed[0] = 1 - changed[0]
+    assert data_fingerprint(X, y) != data_fingerprint(X, changed)
+    # Non-contiguous views hash like their contiguous copies.
+    assert data_fingerprint(X[:, :2], y) == data_fingerprint(np.ascontiguousarray(X[:, :2]), y)
+
+
+def test_get_put_and_stats(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+
+    assert registry.get("AAA", "Tree", "p", "d") is None
+    registry.put("AAA", "Tree", "p", "d", {"fitted": True})
+    assert registry.get("AAA", "Tree", "p", "d") == {"fitted": True}
+    assert registry.get("AAA", "Tree", "p", "other") is None
+
+    assert registry.pop_stats() == {"hits": 1, "misses": 2, "puts": 1, "evictions": 0}
+    assert registry.pop_stats() == {"hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_bytes=None, max_entries=2)
+
+    registry.put("AAA", "Tree", "p", "1", 1)
+    registry.put("AAA", "Tree", "p", "2", 2)
+    assert registry.get("AAA", "Tree", "p", "1") == 1
+    registry.put("AAA", "Tree", "p", "3", 3)
+
+    assert registry.get("AAA", "Tree", "p", "2") is None
+    assert registry.get("AAA", "Tree", "p", "1") == 1
+    assert registry.get("AAA", "Tree", "p", "3") == 3
+    assert registry.pop_stats()["evictions"] == 1
+
+
+def test_evicts_above_max_bytes(tmp_path):
+    payload = np.zeros(10_000)
+    registry = ModelRegistry(str(tmp_path), max_bytes=int(2.5 * payload.nbytes))
+
+    for key in "1234":
+        registry.put("AAA", "Tree", "p", key, payload)
+
+    remaining = [key for key in "1234" if registry.get("AAA", "Tree", "p", key) is not None]
+    assert remaining == ["3", "4"]
+
+
+def test_put_does_not_list_the_directory(tmp_path, monkeypatch):
+    registry = ModelRegistry(str(tmp_path), max_entries=1000, rescan_every=50)
+    scans = []
+    entries = registry._entries
+    monkeypatch.setattr(registry, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(120):
+        registry.put("AAA", "Tree", "p", str(i), i)
+
+    # The first put and every 50th put after it.
+    assert len(scans) == 3
+
+
+def test_rescan_sees_other_processes(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_bytes=None, max_entries=2)
+    other = pickle.loads(pickle.dumps(registry))
+    assert other._index is None
+
+    registry.put("AAA", "Tree", "p", "1", 1)
+    other.put("BBB", "Tree", "p", "2", 2)
+    other.put("BBB", "Tree", "p", "3", 3)
+    registry.evict(rescan=True)
+
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 2
@@ -0,0 +1,47 @@
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from src.models.classifiers import ClassificationModel
+from src.models.estimators import resolve_estimator
+
+HEAVY_MODULES = ["sklearn", "xgboost", "scipy", "finfetcher", "pandas_ta"]
+
+
+def loaded_after_import(module: str) -> list[str]:
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize("module", ["main", "src.pipeline.scheduler", "frontend.scripts.data"])
+def test_entry_points_import_without_model_libraries(module):
+    assert loaded_after_import(module) == []
+
+
+def test_estimators_resolve_by_name(ohlcv):
+    from sklearn.tree import DecisionTreeClassifier
+
+    from src.pipeline.collector import add_features
+
+    model = ClassificationModel("DecisionTreeClassifier", ["close", "rsi_14"], max_depth=3)
+    assert model.name == "DecisionTreeClassifier"
+    # Pickled for worker processes before the class was ever imported.
+    model = pickle.loads(pickle.dumps(model))
+    assert model.clf_class is DecisionTreeClassifier
+    assert model.train_predict_next(add_features(ohlcv.set_index("date")))["prediction"] in (0, 1)
+
+    with pytest.raises(ValueError, match="Unknown estimator"):
+        resolve_estimator("GradientBoostingMachine")
+
+
+def test_only_used_tables_are_reflected(sqlite_db, ohlcv):
+    assert sqlite_db.metadata.tables == {}
+    sqlite_db.save_market_data(ohlcv.iloc[:5].set_index("date"), "AAA")
+    assert set(sqlite_db.metadata.tables) == {"market_data"}
+    assert len(sqlite_db.fetch_market_data("AAA")) == 5
+
+    with pytest.raises(RuntimeError, match="no_such_table"):
+        sqlite_db.table("no_such_table")
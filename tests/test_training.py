@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from src.models.classifiers import ClassificationModel
+from src.models.training import TrainingPolicy
+
+FEATURES = ["close", "rsi_14"]
+
+
+def training_data(n_rows: int = 400, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 4))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=n_rows) > 0).astype(np.int8)
+    return X, y
+
+
+def test_refits_every_n_rows(tmp_path, count_fits):
+    policy = TrainingPolicy(refit_every=5, cache_dir=str(tmp_path))
+    model = ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=3, random_state=0)
+    fits = count_fits(model)
+    X, y = training_data()
+
+    for n_rows in range(300, 312):
+        policy.fitted_estimator(model, "AAA", X[:n_rows], y[:n_rows])
+
+    assert fits == [300, 305, 310]
+
+
+def test_cached_estimator_is_reused(tmp_path):
+    policy = TrainingPolicy(refit_every=5, cache_dir=str(tmp_path))
+    model = ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=3, random_state=0)
+    X, y = training_data()
+
+    first = policy.fitted_estimator(model, "AAA", X[:300], y[:300])
+    reused = policy.fitted_estimator(model, "AAA", X[:302], y[:302])
+
+    np.testing.assert_array_equal(first.predict_proba(X), reused.predict_proba(X))
+    assert reused.tree_.node_count == first.tree_.node_count
+
+
+def test_changes_invalidate_cache(tmp_path, count_fits):
+    policy = TrainingPolicy(refit_every=5, cache_dir=str(tmp_path))
+    X, y = training_data()
+    model = ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=3, random_state=0)
+    policy.fitted_estimator(model, "AAA", X[:300], y[:300])
+
+    # Other parameters under the same model name.
+    deeper = ClassificationModel("DecisionTreeClassifier", FEATURES, max_depth=5, random_state=0)
+    fits = count_fits(deeper)
+    policy.fitted_estimator(deeper, "AAA", X[:301], y[:301])
+    # Other number of features.
+    policy.fitted_estimator(deeper, "AAA", X[:302, :3], y[:302])
+    # Shorter history, e.g. after a backfill was removed.
+    policy.fitted_estimator(deeper, "AAA", X[:200, :3], y[:200])
+    # Other ticker.
+    policy.fitted_estimator(deeper, "BBB", X[:201, :3], y[:201])
+
+    assert fits == [301, 302, 200, 201]
+
+
+def test_xgboost_continues_boosting(tmp_path):
+    pytest.importorskip("xgboost")
+    policy = TrainingPolicy(
+        refit_every=100, warm_start=True, warm_start_estimators=7, cache_dir=str(tmp_path)
+    )
+    model = ClassificationModel("XGBClassifier", FEATURES, n_estimators=20, max_depth=2)
+    X, y = training_data()
+
+    first = policy.fitted_estimator(model, "AAA", X[:300], y[:300])
+    continued = policy.fitted_estimator(model, "AAA", X[:301], y[:301])
+    again = policy.fitted_estimator(model, "AAA", X[:302], y[:302])
+
+    assert first.get_booster().num_boosted_rounds() == 20
+    assert continued.get_booster().num_boosted_rounds() == 27
+    assert again.get_booster().num_boosted_rounds() == 34
+
+
+def test_xgboost_continuation_weights_full_history(tmp_path):
+    pytest.importorskip("xgboost")
+    policy = TrainingPolicy(
+        refit_every=100, warm_start=True, warm_start_window=10, cache_dir=str(tmp_path)
+    )
+    model = ClassificationModel("XGBClassifier", FEATURES, n_estimators=5, max_depth=2)
+    X, y = training_data()
+    # A recent window far more imbalanced than the history.
+    y[300:310] = [1, 1, 1, 1, 1, 1, 1, 1, 1, 0]
+
+    policy.fitted_estimator(model, "AAA", X[:300], y[:300])
+    continued = policy.fitted_estimator(model, "AAA", X[:310], y[:310])
+
+    expected = (y[:310] == 0).sum() / (y[:310] == 1).sum()
+    assert continued.get_params()["scale_pos_weight"] == pytest.approx(expected)
+
+
+def test_random_forest_grows_trees(tmp_path):
+    policy = TrainingPolicy(
+        refit_every=100, warm_start=True, warm_start_estimators=5, cache_dir=str(tmp_path)
+    )
+    model = ClassificationModel(
+        "RandomForestClassifier", FEATURES, n_estimators=10, max_depth=3, random_state=0
+    )
+    X, y = training_data()
+
+    first = policy.fitted_estimator(model, "AAA", X[:300], y[:300])
+    assert len(first.estimators_) == 10
+    continued = policy.fitted_estimator(model, "AAA", X[:301], y[:301])
+    assert len(continued.estimators_) == 15
+
+    # Unchanged rows reuse the continued forest without growing it.
+    reused = policy.fitted_estimator(model, "AAA", X[:301], y[:301])
+    assert len(reused.estimators_) == 15
+    # The full refit starts again from n_estimators.
+    refit = policy.fitted_estimator(model, "AAA", X[:400], y[:400])
+    assert len(refit.estimators_) == 10
+
+
+def test_without_warm_start_cached_model_is_served(tmp_path):
+    policy = TrainingPolicy(refit_every=100, cache_dir=str(tmp_path))
+    model = ClassificationModel(
+        "RandomForestClassifier", FEATURES, n_estimators=10, max_depth=3, random_state=0
+    )
+    X, y = training_data()
+
+    policy.fitted_estimator(model, "AAA", X[:300], y[:300])
+    served = policy.fitted_estimator(model, "AAA", X[:310], y[:310])
+
+    assert len(served.estimators_) == 10